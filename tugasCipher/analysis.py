@@ -0,0 +1,413 @@
+"""
+Kriptanalisis untuk cipher klasik di app: cari key dari ciphertext saja.
+
+- shift & affine: brute force semua key
+- vigenere: panjang key dari index of coincidence (IoC) dan Kasiski,
+  lalu setiap kolom dipecahkan sebagai shift (chi-squared)
+- substitution: hill-climbing dengan skor quadgram, restart acak
+  dijalankan paralel di beberapa process
+
+Skor kandidat = jumlah log10 probabilitas quadgram (tabel 26^4 di memory,
+dihitung sekali), jadi menilai satu kandidat hanya beberapa operasi NumPy.
+Hasil: top-k key, diurutkan dari skor tertinggi, dengan plaintext dari
+fungsi cipher di app (shift_text, affine, vigenere_text, substitution).
+
+Contoh:
+    python analysis.py vigenere < ciphertext.txt
+    python analysis.py substitution --top 3 --restarts 16 < ciphertext.txt
+    python analysis.py build-ngrams corpus.txt -o data/indonesian_quadgrams.txt.gz
+"""
+import argparse
+import gzip
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from string import ascii_uppercase
+
+import numpy as np
+
+import app
+
+NGRAM_FILE = os.environ.get("CIPHER_NGRAM_FILE",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         "data", "english_quadgrams.txt.gz"))
+PREVIEW = 200           # panjang plaintext di hasil
+MAX_KEY_LENGTH = 20     # panjang key vigenere maksimum yang dicoba (default)
+KEY_LENGTH_LIMIT = 100  # batas atas max_length, berapa pun yang diminta
+AFFINE_A = [a for a in range(26) if app.gcd(a, 26) == 1]
+
+# Frekuensi huruf bahasa Inggris (A-Z), untuk chi-squared
+ENGLISH_FREQ = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]) / 100
+ENGLISH_IOC = float((ENGLISH_FREQ ** 2).sum())   # ~0.066, text acak ~0.038
+
+
+# ===== N-gram Tables =====
+def build_ngram_file(paths, out, n=4):
+    """Hitung n-gram huruf dari file corpus, tulis format 'NGRAM COUNT' per baris (gzip)"""
+    counts = Counter()
+    for path in paths:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            # Huruf beraksen jadi huruf dasarnya (é -> e), huruf non-latin dibuang
+            text = unicodedata.normalize("NFKD", f.read()).encode("ascii", "ignore").decode("ascii")
+            letters = app.letters_only(text).decode("ascii")
+        counts.update(letters[i:i + n] for i in range(len(letters) - n + 1))
+    with gzip.open(out, "wt", encoding="ascii") as f:
+        for gram, count in counts.most_common():
+            f.write(f"{gram} {count}\n")
+    return len(counts)
+
+@lru_cache(maxsize=4)
+def quadgram_table(path=NGRAM_FILE) -> np.ndarray:
+    """
+    Array float32 26^4: log10 probabilitas setiap quadgram (index = AAAA..ZZZZ
+    dalam basis 26). Quadgram yang tidak ada di corpus mendapat floor log10(0.01/N).
+    Menerima file 'NGRAM COUNT' biasa atau .gz.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    grams, counts = [], []
+    with opener(path, "rt", encoding="ascii") as f:
+        for line in f:
+            gram, _, count = line.partition(" ")
+            if len(gram) == 4 and gram.isalpha():
+                grams.append(gram.upper())
+                counts.append(int(count))
+    if not grams:
+        raise ValueError(f"No quadgrams in {path}")
+    total = sum(counts)
+    table = np.full(26 ** 4, math.log10(0.01 / total), dtype=np.float32)
+    codes = np.frombuffer("".join(grams).encode("ascii"), dtype=np.uint8).reshape(-1, 4).astype(np.intp) - 65
+    table[quad_index(codes.T)] = np.log10(np.asarray(counts, dtype=np.float64) / total)
+    return table
+
+def quad_index(codes):
+    """Index quadgram dari kode huruf 0-25: array 1D (semua quadgram berurutan) atau 4 baris"""
+    if isinstance(codes, np.ndarray) and codes.ndim == 1:
+        c = codes.astype(np.intp)
+        return ((c[:-3] * 26 + c[1:-2]) * 26 + c[2:-1]) * 26 + c[3:]
+    return ((codes[0] * 26 + codes[1]) * 26 + codes[2]) * 26 + codes[3]
+
+
+# ===== Scoring =====
+def letter_codes(text) -> np.ndarray:
+    """Huruf A-Z dari text sebagai array kode 0-25 (selain huruf dibuang)"""
+    return np.frombuffer(app.letters_only(text), dtype=np.uint8) - 65
+
+def quadgram_score(codes, table=None) -> float:
+    """Skor log10 kemiripan dengan bahasa corpus (makin besar makin mirip)"""
+    if len(codes) < 4:
+        return 0.0
+    table = quadgram_table() if table is None else table
+    return float(table[quad_index(codes)].sum())
+
+def index_of_coincidence(codes) -> float:
+    n = len(codes)
+    if n < 2:
+        return 0.0
+    counts = np.bincount(codes, minlength=26).astype(np.int64)
+    return float((counts * (counts - 1)).sum() / (n * (n - 1)))
+
+def chi_squared(counts) -> float:
+    """Chi-squared hitungan huruf (26) terhadap frekuensi bahasa Inggris"""
+    expected = ENGLISH_FREQ * max(counts.sum(), 1)
+    return float(((counts - expected) ** 2 / expected).sum())
+
+def frequency_analysis(text):
+    """Hitungan dan frekuensi huruf, IoC dan chi-squared dari text"""
+    codes = letter_codes(text)
+    counts = np.bincount(codes, minlength=26)
+    total = int(counts.sum())
+    return {
+        "letters": total,
+        "counts": dict(zip(ascii_uppercase, counts.tolist())),
+        "frequency": dict(zip(ascii_uppercase, (counts / max(total, 1)).round(4).tolist())),
+        "ioc": round(index_of_coincidence(codes), 5),
+        "english_ioc": round(ENGLISH_IOC, 5),
+        "chi_squared": round(chi_squared(counts), 2),
+    }
+
+def candidate(key, score, plaintext):
+    return {"key": key, "score": round(score, 2), "plaintext": plaintext[:PREVIEW]}
+
+def rank(candidates, top):
+    return sorted(candidates, key=lambda c: c["score"], reverse=True)[:top]
+
+
+# ===== Shift & Affine (brute force) =====
+def break_shift(text, top=5):
+    codes = letter_codes(text)
+    table = quadgram_table()
+    scores = [(quadgram_score((codes - k) % 26, table), k) for k in range(26)]
+    best = sorted(scores, reverse=True)[:top]
+    return [candidate(k, s, app.shift_text(text, k, enc=False)) for s, k in best]
+
+def break_affine(text, top=5):
+    codes = letter_codes(text)
+    table = quadgram_table()
+    scores = []
+    for a in AFFINE_A:
+        a_inv = app.mod_inverse(a, 26)
+        for b in range(26):
+            scores.append((quadgram_score(a_inv * (codes.astype(np.intp) - b) % 26, table), a, b))
+    best = sorted(scores, reverse=True)[:top]
+    return [candidate({"a": a, "b": b}, s, app.affine(text, a, b, enc=False)) for s, a, b in best]
+
+
+# ===== Vigenere (IoC / Kasiski) =====
+def key_length_limit(codes, max_length):
+    """Panjang key terbesar yang dicoba: paling banyak setengah text dan KEY_LENGTH_LIMIT"""
+    return max(min(max_length, len(codes) // 2, KEY_LENGTH_LIMIT), 1)
+
+def kasiski(codes, max_length=MAX_KEY_LENGTH):
+    """
+    Jarak antar trigram yang berulang; untuk setiap panjang key L,
+    berapa banyak jarak yang habis dibagi L. Returns: {L: count}
+    """
+    if len(codes) < 4:
+        return {}
+    c = codes.astype(np.intp)
+    grams = (c[:-2] * 26 + c[1:-1]) * 26 + c[2:]
+    order = np.argsort(grams, kind="stable")
+    same = grams[order][1:] == grams[order][:-1]
+    distances = (order[1:] - order[:-1])[same]
+    # Satu panjang per iterasi: memory tetap O(jumlah jarak), bukan jarak x panjang
+    return {L: int(np.count_nonzero(distances % L == 0))
+            for L in range(2, key_length_limit(codes, max_length) + 1)}
+
+def key_length_scores(codes, max_length=MAX_KEY_LENGTH):
+    """Rata-rata IoC kolom untuk setiap panjang key (makin dekat ENGLISH_IOC makin mungkin)"""
+    return {L: float(np.mean([index_of_coincidence(codes[i::L]) for i in range(L)]))
+            for L in range(1, key_length_limit(codes, max_length) + 1)}
+
+def column_shifts(codes, length):
+    """Shift terbaik (chi-squared) untuk setiap kolom, dihitung untuk 26 shift sekaligus"""
+    shifts = np.arange(26)
+    # rotations[k] = index hitungan huruf plaintext bila kolom digeser k
+    rotations = (shifts[None, :] + shifts[:, None]) % 26
+    expected = ENGLISH_FREQ[None, :]
+    key = []
+    for i in range(length):
+        counts = np.bincount(codes[i::length], minlength=26)[rotations]
+        e = expected * max(counts[0].sum(), 1)
+        key.append(int(((counts - e) ** 2 / e).sum(axis=1).argmin()))
+    return key
+
+def minimal_period(key):
+    """'ABCABC' -> 'ABC': key yang berulang memberi dekripsi yang sama"""
+    for p in range(1, len(key) + 1):
+        if len(key) % p == 0 and key[:p] * (len(key) // p) == key:
+            return key[:p]
+    return key
+
+def break_vigenere(text, top=5, max_length=MAX_KEY_LENGTH):
+    codes = letter_codes(text)
+    if len(codes) < 4:
+        raise ValueError("Text too short to analyze")
+    table = quadgram_table()
+    ioc = key_length_scores(codes, max_length)
+    kas = kasiski(codes, max_length)
+    # Panjang kandidat: IoC kolom tertinggi, ditambah yang paling didukung Kasiski
+    lengths = sorted(ioc, key=ioc.get, reverse=True)[:max(top, 5)]
+    lengths += sorted(kas, key=kas.get, reverse=True)[:3]
+
+    results = {}
+    for length in lengths:
+        shifts = column_shifts(codes, length)
+        key = minimal_period("".join(ascii_uppercase[s] for s in shifts))
+        if key in results:
+            continue
+        k = np.frombuffer(key.encode("ascii"), dtype=np.uint8).astype(np.intp) - 65
+        plain = (codes - np.resize(k, len(codes))) % 26
+        c = candidate(key, quadgram_score(plain, table), app.vigenere_text(text, key, enc=False))
+        c["ioc"] = round(ioc.get(len(key), 0.0), 5)
+        c["kasiski"] = kas.get(len(key), 0)
+        results[key] = c
+    return rank(results.values(), top)
+
+
+# ===== Substitution (hill-climbing) =====
+def climb(codes, table, seed, rounds=5):
+    """
+    Satu restart hill-climbing. dec[c] = huruf plaintext untuk huruf cipher c.
+    Mulai dari urutan frekuensi (restart > 0: diacak), lalu coba tukar setiap
+    pasangan huruf dan simpan kalau skornya naik, sampai satu putaran penuh
+    tanpa perbaikan. Hasilnya diacak sedikit dan di-climb ulang `rounds` kali.
+    Returns: (skor, dec)
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.bincount(codes, minlength=26)
+    dec = np.empty(26, dtype=np.intp)
+    dec[np.argsort(-counts, kind="stable")] = np.argsort(-ENGLISH_FREQ, kind="stable")
+    if seed:
+        rng.shuffle(dec)
+    # Hanya huruf yang muncul di ciphertext yang perlu ditukar
+    present = np.flatnonzero(counts).tolist()
+    pairs = [(i, j) for i in present for j in range(26) if j != i and (j not in present or j > i)]
+
+    best_dec, best = dec.copy(), quadgram_score(dec[codes], table)
+    for _ in range(rounds):
+        score = quadgram_score(dec[codes], table)
+        improved = True
+        while improved:
+            improved = False
+            for k in rng.permutation(len(pairs)).tolist():
+                i, j = pairs[k]
+                dec[i], dec[j] = dec[j], dec[i]
+                s = quadgram_score(dec[codes], table)
+                if s > score:
+                    score, improved = s, True
+                else:
+                    dec[i], dec[j] = dec[j], dec[i]
+        if score > best:
+            best_dec, best = dec.copy(), score
+        # Keluar dari optimum lokal: acak beberapa huruf dari hasil terbaik
+        dec = best_dec.copy()
+        for _ in range(3):
+            i, j = rng.choice(present, 2, replace=False) if len(present) > 1 else (0, 1)
+            dec[i], dec[j] = dec[j], dec[i]
+    return best, best_dec
+
+def _climb_worker(codes, seed, rounds, path):
+    score, dec = climb(codes, quadgram_table(path), seed, rounds)
+    return score, dec.tolist()
+
+def substitution_key(dec):
+    """dec (cipher -> plain) menjadi key substitution app (plain -> cipher)"""
+    key = [""] * 26
+    for c, p in enumerate(dec):
+        key[p] = ascii_uppercase[c]
+    return "".join(key)
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+def climb_pool(workers) -> ProcessPoolExecutor:
+    """
+    Process pool bersama untuk break_substitution, satu per jumlah worker (dibuat
+    saat pertama dipakai); tabel quadgram tetap ter-cache di setiap process antar
+    panggilan. spawn seperti app.get_pool: aman dipakai dari server yang multi-thread.
+    """
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+def reset_climb_pool(workers):
+    """Buang pool yang rusak (process worker mati); panggilan berikutnya membuat yang baru"""
+    with _pool_lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+def break_substitution(text, top=5, restarts=8, rounds=5, workers=None, seed=0):
+    codes = letter_codes(text)
+    if len(codes) < 4:
+        raise ValueError("Text too short to analyze")
+    workers = workers or os.cpu_count() or 1
+    seeds = [seed + i for i in range(restarts)]
+    if min(workers, restarts) > 1:
+        try:
+            runs = list(climb_pool(workers).map(_climb_worker, [codes] * restarts, seeds,
+                                                [rounds] * restarts, [NGRAM_FILE] * restarts))
+        except BrokenProcessPool:
+            reset_climb_pool(workers)
+            raise
+    else:
+        runs = [_climb_worker(codes, s, rounds, NGRAM_FILE) for s in seeds]
+
+    results = {}
+    for score, dec in runs:
+        key = substitution_key(dec)
+        if key not in results:
+            results[key] = candidate(key, score, app.substitution(text, key, enc=False))
+    return rank(results.values(), top)
+
+
+BREAKERS = {
+    "shift": break_shift,
+    "affine": break_affine,
+    "vig": break_vigenere,
+    "sub": break_substitution,
+}
+
+# Option yang diterima setiap breaker (selain top)
+OPTIONS = {
+    "shift": (),
+    "affine": (),
+    "vig": ("max_length",),
+    "sub": ("restarts", "rounds", "workers"),
+}
+
+def check_options(cipher, options) -> str:
+    """Nama cipher internal; ValueError kalau cipher atau salah satu option tidak didukung"""
+    cipher = app.API_CIPHERS.get(cipher, cipher)
+    if cipher not in BREAKERS:
+        raise ValueError(f"Analysis not supported for '{cipher}'")
+    unknown = sorted(set(options) - set(OPTIONS[cipher]))
+    if unknown:
+        supported = ", ".join(OPTIONS[cipher]) or "none"
+        raise ValueError(f"Option '{unknown[0]}' is not supported for '{cipher}' (supported: {supported})")
+    return cipher
+
+def analyze(cipher, text, top=5, **options):
+    """Top-k key untuk ciphertext; cipher memakai nama API (shift, vigenere, ...)"""
+    cipher = check_options(cipher, options)
+    return {
+        "cipher": cipher,
+        "frequency": frequency_analysis(text),
+        "candidates": BREAKERS[cipher](text, top=top, **options),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recover keys of classical ciphers from ciphertext")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("shift", "affine", "vigenere", "substitution"):
+        p = sub.add_parser(name, help=f"break {name} (ciphertext dari file atau stdin)")
+        p.add_argument("input", nargs="?", default="-")
+        p.add_argument("--top", type=int, default=5)
+        if name == "vigenere":
+            p.add_argument("--max-length", type=int, default=MAX_KEY_LENGTH)
+        if name == "substitution":
+            p.add_argument("--restarts", type=int, default=8)
+            p.add_argument("--rounds", type=int, default=5)
+            p.add_argument("--workers", type=int)
+    p = sub.add_parser("build-ngrams", help="buat tabel quadgram dari corpus text")
+    p.add_argument("corpus", nargs="+")
+    p.add_argument("-o", "--output", required=True)
+    opts = parser.parse_args(argv)
+
+    if opts.command == "build-ngrams":
+        count = build_ngram_file(opts.corpus, opts.output)
+        print(f"{count} quadgrams -> {opts.output}", file=sys.stderr)
+        return 0
+
+    if opts.input == "-":
+        text = sys.stdin.read()
+    else:
+        with open(opts.input, encoding="utf-8") as f:
+            text = f.read()
+    options = {k: v for k, v in vars(opts).items()
+               if k in ("max_length", "restarts", "rounds", "workers")}
+    try:
+        result = analyze(opts.command, text, opts.top, **options)
+    except ValueError as e:
+        parser.error(str(e))
+    for c in result["candidates"]:
+        print(f"{c['score']:>12.2f}  {c['key']}  {c['plaintext'][:60]!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,112 @@
-from flask import Flask, render_template, request, send_file, redirect, url_for, flash
+from __future__ import annotations
+from flask import Flask, render_template, request, send_file, redirect, url_for, flash, jsonify, g
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 import os
 import io
-import numpy as np
-from string import ascii_uppercase
+from string import ascii_uppercase, ascii_lowercase, digits
 import base64
+import codecs
+import itertools
+import math
+import tempfile
+import shutil
+import secrets
+import threading
+import time
+import json
+import hashlib
+import mmap
+import struct
+import zlib
+import bisect
+import cProfile
+import importlib
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from contextlib import contextmanager
+from types import MappingProxyType
+try:
+    import fcntl
+except ImportError:  # Windows: hanya lock antar thread
+    fcntl = None
 
 app = Flask(__name__)
 app.secret_key = "change-this"
+# Upload file >= threshold ini (untuk cipher yang bisa di-stream) diproses per chunk
+app.config["STREAM_THRESHOLD"] = 8 * 1024 * 1024
+# Directory pad OTP di server (satu file per pad, nama file = pad ID)
+app.config["OTP_PAD_DIR"] = os.environ.get("OTP_PAD_DIR", os.path.join(app.root_path, "pads"))
+
+# ===== Lazy Imports =====
+class LazyModule:
+    """
+    Pengganti modul yang baru di-import saat atributnya pertama kali dipakai,
+    lalu menggantikan dirinya di globals() dengan modul asli, jadi setelah itu
+    tidak ada overhead. Cold start (serverless) tidak membayar import NumPy
+    kalau request-nya tidak butuh (shift, substitution, affine).
+    """
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+    
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+np = LazyModule("numpy", "np")
+# Hanya dipakai mode parallel (multi-core)
+multiprocessing = LazyModule("multiprocessing", "multiprocessing")
+shared_memory = LazyModule("multiprocessing.shared_memory", "shared_memory")
 
 # ===== Utility Functions =====
 ALPHA = ascii_uppercase.replace("J", "")  
 A2I = {c: i for i, c in enumerate(ascii_uppercase)}
 
+NON_LETTERS = bytes(b for b in range(256) if not 65 <= b <= 90)
+# Tabel statis, dihitung sekali saat module load:
+# SHIFT_TABLES[k] = tabel str.translate untuk geser A-Z sejauh k,
+# BYTE_ROTATIONS[k] = LUT 256 byte untuk x -> (x + k) % 256
+SHIFT_TABLES = tuple(str.maketrans(ascii_uppercase, ascii_uppercase[k:] + ascii_uppercase[:k])
+                     for k in range(26))
+IDENTITY_LUT = bytes(range(256))
+BYTE_ROTATIONS = tuple(IDENTITY_LUT[k:] + IDENTITY_LUT[:k] for k in range(256))
+
 def char_to_num(c): return A2I[c.upper()]
 def num_to_char(n): return ascii_uppercase[n % 26]
 
+def letters_only(text) -> bytes:
+    """Ambil huruf A-Z saja (uppercase) dari text, sebagai bytes ASCII"""
+    text = text.upper()
+    if not text.isascii():
+        text = ''.join([c for c in text if c.isalpha()])
+        if not text.isascii():
+            raise ValueError("Only letters A-Z are supported")
+    return text.encode('ascii').translate(None, NON_LETTERS)
+
+def upper_checked(text):
+    """text.upper(), dengan error kalau ada huruf di luar A-Z (tidak bisa dienkripsi)"""
+    text = text.upper()
+    if not text.isascii() and any(c.isalpha() and not c.isascii() for c in text):
+        raise ValueError("Only letters A-Z are supported")
+    return text
+
+def alphabet_table(fn):
+    """Tabel str.translate untuk A-Z: huruf ke-i menjadi huruf ke-(fn(i) % 26)"""
+    return str.maketrans(ascii_uppercase, ''.join(num_to_char(fn(i)) for i in range(26)))
+
+def text_codes(text):
+    """
+    Copy text sebagai array kode karakter yang bisa diubah in-place:
+    uint8 untuk text ASCII, uint32 (UTF-32) kalau ada karakter lain.
+    Returns: (array, encoding untuk decode balik)
+    """
+    if text.isascii():
+        return np.frombuffer(bytearray(text.encode('ascii')), dtype=np.uint8), 'ascii'
+    return np.frombuffer(bytearray(text.encode('utf-32-le')), dtype=np.uint32), 'utf-32-le'
+
 def gcd(a,b):
     while b: a,b = b,a%b
     return a
@@ -37,357 +128,1027 @@ def mod_inverse(a,m):
     _, x, _ = extended_gcd(a % m, m)
     return (x % m + m) % m
 
+def key_matrix(M, m) -> np.ndarray:
+    """Validasi matriks key n×n dan reduksi entri-nya ke mod m"""
+    rows = [[int(x) % m for x in row] for row in M]
+    n = len(rows)
+    if n == 0 or any(len(row) != n for row in rows):
+        raise ValueError("Key matrix must be square (n x n)")
+    return np.array(rows, dtype=np.int64)
+
+def parse_matrix(text):
+    """Parse matriks dari text: baris dipisah ';' atau newline, angka dipisah spasi"""
+    rows = [row.split() for row in text.replace(";", "\n").splitlines() if row.strip()]
+    try:
+        M = [[int(x) for x in row] for row in rows]
+    except ValueError:
+        raise ValueError("Matrix entries must be integers")
+    if not M or any(len(row) != len(M) for row in M):
+        raise ValueError("Key matrix must be square (n x n)")
+    return M
+
+def matrix_inverse_mod(M, m):
+    """
+    Inverse matriks n×n mod m dengan eliminasi Gauss-Jordan integer (exact).
+    Karena m boleh komposit (26, 256), pivot dibentuk dengan reduksi Euclid
+    antar baris sampai elemen pivot = gcd kolom, lalu dicek invertible mod m.
+    Return None kalau matriks tidak invertible.
+    """
+    A = key_matrix(M, m).tolist()
+    n = len(A)
+    aug = [A[i] + [int(i == j) for j in range(n)] for i in range(n)]
+    
+    for col in range(n):
+        for r in range(col + 1, n):
+            while aug[r][col]:
+                q = aug[col][col] // aug[r][col]
+                aug[col] = [(x - q * y) % m for x, y in zip(aug[col], aug[r])]
+                aug[col], aug[r] = aug[r], aug[col]
+        
+        pivot_inv = mod_inverse(aug[col][col], m)
+        if pivot_inv is None:
+            return None
+        aug[col] = [(x * pivot_inv) % m for x in aug[col]]
+        
+        for r in range(n):
+            f = aug[r][col]
+            if r != col and f:
+                aug[r] = [(x - f * y) % m for x, y in zip(aug[r], aug[col])]
+    
+    return np.array([row[n:] for row in aug], dtype=np.int64)
+
 def matrix_inverse_mod26(M):
-    det = int(np.round(np.linalg.det(M))) % 26
-    det_inv = mod_inverse(det,26)
-    if det_inv is None: return None
-    adj = np.array([[M[1][1], -M[0][1]], [-M[1][0], M[0][0]]])
-    return (det_inv*adj) % 26
-
-def format_output(text, fmt):
-    if fmt == "nospace":
-        return ''.join(text.split())
-    elif fmt == "groups":
-        clean = ''.join(text.split())
-        return ' '.join([clean[i:i+5] for i in range(0,len(clean),5)])
-    return text
+    return matrix_inverse_mod(M, 26)
+
+HILL_BATCH = 1 << 18  # jumlah blok per matmul, membatasi memory int64 sementara
+
+def hill_blocks(nums: np.ndarray, K: np.ndarray, m: int, out=None) -> np.ndarray:
+    """
+    Hill untuk seluruh pesan: nums (panjang kelipatan n) di-reshape ke (N, n),
+    lalu setiap batch dikalikan dengan K sekaligus: W = V @ K^T mod m.
+    out (array uint8 sepanjang nums, boleh nums sendiri) diisi langsung.
+    """
+    n = len(K)
+    blocks = nums.reshape(-1, n)
+    out = np.empty(blocks.shape, dtype=np.uint8) if out is None else out.reshape(-1, n)
+    for i in range(0, len(blocks), HILL_BATCH):
+        batch = blocks[i:i + HILL_BATCH].astype(np.int64)
+        out[i:i + HILL_BATCH] = (batch @ K.T) % m
+    return out.reshape(-1)
+
+FORMAT_CHUNK = 64 * 1024
+
+def format_output(text, fmt, chunk_size=FORMAT_CHUNK):
+    """Format hasil text per potongan chunk_size karakter (generator, lihat format_stream)"""
+    return format_stream((text[i:i + chunk_size] for i in range(0, len(text), chunk_size)), fmt)
+
+# Karakter ASCII yang dianggap whitespace oleh str.split()
+ASCII_WHITESPACE = b"\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+
+def strip_whitespace(text) -> str:
+    if text.isascii():
+        return text.encode('ascii').translate(None, ASCII_WHITESPACE).decode('ascii')
+    return ''.join(text.split())
+
+def group_letters(text) -> str:
+    """text (panjang kelipatan 5) sebagai grup 5 karakter dipisah spasi"""
+    if not text.isascii():
+        return ' '.join([text[j:j+5] for j in range(0, len(text), 5)])
+    # ASCII: setiap baris 5 byte diberi kolom spasi, lalu spasi terakhir dibuang
+    groups = np.empty((len(text) // 5, 6), dtype=np.uint8)
+    groups[:, :5] = np.frombuffer(text.encode('ascii'), dtype=np.uint8).reshape(-1, 5)
+    groups[:, 5] = ord(' ')
+    return groups.tobytes()[:-1].decode('ascii')
+
+def format_stream(chunks, fmt):
+    """
+    Format aliran chunk text: normal apa adanya, nospace tanpa whitespace,
+    groups per 5 huruf dipisah spasi. Sisa huruf yang belum genap 5 dibawa
+    ke chunk berikutnya.
+    """
+    if fmt not in ("nospace", "groups"):
+        yield from chunks
+        return
+    carry = ""
+    sep = ""
+    for chunk in chunks:
+        clean = strip_whitespace(chunk)
+        if fmt == "nospace":
+            if clean:
+                yield clean
+            continue
+        clean = carry + clean
+        full = len(clean) - len(clean) % 5
+        if full:
+            yield sep + group_letters(clean[:full])
+            sep = " "
+        carry = clean[full:]
+    if carry:
+        yield sep + carry
+
+# ===== Metrics & Profiling =====
+# Setiap request (dan job background) punya StageTimer di thread-local.
+# Kode hot path menandai tahapnya dengan stage("read"/"cipher"/...): waktunya
+# eksklusif, jadi waktu tahap yang bersarang (mis. read di dalam store) tidak
+# dihitung dua kali. Di akhir request hasilnya masuk ke histogram per
+# tahap/cipher/arah, yang bisa dibaca di /metrics (format Prometheus).
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Profiling cProfile per request: header X-Profile harus sama dengan secret ini
+app.config["PROFILE_SECRET"] = os.environ.get("PROFILE_SECRET")
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "cipher-profiles"))
+
+class StageTimer:
+    """Waktu (detik, eksklusif) dan jumlah byte per tahap untuk satu request"""
+    def __init__(self, cipher=None, direction=None):
+        self.cipher = cipher
+        self.direction = direction
+        self.seconds = defaultdict(float)
+        self.bytes = defaultdict(int)
+        self.start = time.perf_counter()
+        self._stack = []
+        self._mark = self.start
+    
+    def enter(self, name):
+        now = time.perf_counter()
+        if self._stack:
+            self.seconds[self._stack[-1]] += now - self._mark
+        self._stack.append(name)
+        self._mark = now
+    
+    def exit(self):
+        now = time.perf_counter()
+        self.seconds[self._stack.pop()] += now - self._mark
+        self._mark = now
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+class Metrics:
+    """Histogram waktu dan counter byte per (tahap, cipher, arah)"""
+    def __init__(self, buckets=METRIC_BUCKETS):
+        self.buckets = buckets
+        self._seconds = {}
+        self._bytes = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def record(self, timer):
+        labels = (timer.cipher, timer.direction)
+        with self._lock:
+            for name, seconds in timer.seconds.items():
+                hist = self._seconds.get((name,) + labels)
+                if hist is None:
+                    hist = self._seconds[(name,) + labels] = Histogram(self.buckets)
+                hist.observe(seconds)
+            for name, n in timer.bytes.items():
+                self._bytes[(name,) + labels] += n
+    
+    def render(self) -> str:
+        """Format text exposition Prometheus"""
+        def label_text(key, **extra):
+            pairs = dict(zip(("stage", "cipher", "direction"), key), **extra)
+            return "{" + ",".join(f'{k}="{label_value(v)}"' for k, v in pairs.items()) + "}"
+        
+        lines = ["# HELP cipher_stage_seconds Time spent in each processing stage",
+                 "# TYPE cipher_stage_seconds histogram"]
+        with self._lock:
+            for key, hist in sorted(self._seconds.items()):
+                cumulative = 0
+                for le, count in zip(self.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"cipher_stage_seconds_bucket{label_text(key, le=le)} {cumulative}")
+                lines.append(f'cipher_stage_seconds_bucket{label_text(key, le="+Inf")} {hist.total}')
+                lines.append(f"cipher_stage_seconds_sum{label_text(key)} {hist.sum}")
+                lines.append(f"cipher_stage_seconds_count{label_text(key)} {hist.total}")
+            lines += ["# HELP cipher_stage_bytes_total Bytes handled by each processing stage",
+                      "# TYPE cipher_stage_bytes_total counter"]
+            for key, n in sorted(self._bytes.items()):
+                lines.append(f"cipher_stage_bytes_total{label_text(key)} {n}")
+        return "\n".join(lines) + "\n"
+
+def label_value(value) -> str:
+    """Escape nilai label Prometheus: backslash, petik dua dan newline"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+METRICS = Metrics()
+_timing = threading.local()
+
+def current_timer():
+    return getattr(_timing, "timer", None)
+
+@contextmanager
+def timing(cipher=None, direction=None):
+    """Catat tahap-tahap di dalam blok ini sebagai satu request/job"""
+    timer = StageTimer(cipher, direction)
+    previous = current_timer()
+    _timing.timer = timer
+    try:
+        yield timer
+    finally:
+        _timing.timer = previous
+        finish_timer(timer)
+
+def finish_timer(timer):
+    """Masukkan hasil timer ke METRICS (hanya kalau cipher-nya diketahui)"""
+    if timer.cipher is not None:
+        timer.seconds["total"] = time.perf_counter() - timer.start
+        METRICS.record(timer)
+
+@contextmanager
+def stage(name):
+    """Tandai blok sebagai tahap name pada timer request ini (no-op tanpa timer)"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+    timer.enter(name)
+    try:
+        yield
+    finally:
+        timer.exit()
+
+def count_bytes(name, n):
+    timer = current_timer()
+    if timer is not None:
+        timer.bytes[name] += n
 
 # ===== File Metadata Handling =====
-def create_cipher_file(original_filename: str, cipher_data: bytes) -> bytes:
+# Format file cipher v2:
+#   [magic "\x89CPH"][1 byte versi]
+#   [1 byte panjang][ID cipher][2 bytes panjang][nama file asli]
+#   [2 bytes panjang][parameter JSON (bukan key)]
+#   [8 bytes ukuran asli][8 bytes ukuran data cipher][4 bytes ukuran frame]
+#   [4 bytes CRC32 header]
+#   lalu frame: [4 bytes panjang][4 bytes CRC32][data], ditutup frame panjang 0.
+# Semua frame berukuran sama kecuali yang terakhir, jadi frame ke-i berisi
+# data asli mulai byte i * ukuran frame (bisa didekripsi sendiri-sendiri).
+# Format lama (v1): [4 bytes panjang nama file][nama file][data terenkripsi]
+CONTAINER_MAGIC = b"\x89CPH"
+CONTAINER_VERSION = 2
+FRAME_SIZE = 1024 * 1024
+FRAME_HEAD = struct.Struct(">II")
+HEADER_TAIL = struct.Struct(">QQI")
+CIPHER_SIZE_UNKNOWN = (1 << 64) - 1   # hasil streaming yang panjangnya baru diketahui di akhir (playfair)
+
+CipherHeader = namedtuple("CipherHeader", "version cipher params filename size cipher_size frame_size")
+
+def container_header(original_filename, cipher, size, cipher_size, frame_size=FRAME_SIZE, params=None) -> bytes:
+    """Header file cipher v2. params hanya untuk info yang tidak rahasia (bukan key)"""
+    cipher_bytes = cipher.encode('ascii')
+    name_bytes = original_filename.encode('utf-8')
+    params_bytes = json.dumps(params or {}, separators=(',', ':')).encode('utf-8')
+    header = b''.join([
+        CONTAINER_MAGIC, bytes([CONTAINER_VERSION]),
+        bytes([len(cipher_bytes)]), cipher_bytes,
+        len(name_bytes).to_bytes(2, 'big'), name_bytes,
+        len(params_bytes).to_bytes(2, 'big'), params_bytes,
+        HEADER_TAIL.pack(size, cipher_size, frame_size),
+    ])
+    return header + zlib.crc32(header).to_bytes(4, 'big')
+
+def write_frames(chunks, frame_size=FRAME_SIZE):
+    """Potong aliran chunk menjadi frame [panjang][CRC32][data], diakhiri frame kosong"""
+    pending = b''
+    for chunk in chunks:
+        if pending:
+            chunk = pending + chunk
+        full = len(chunk) - len(chunk) % frame_size
+        for i in range(0, full, frame_size):
+            with stage("container"):
+                payload = chunk[i:i+frame_size]
+                head = FRAME_HEAD.pack(len(payload), zlib.crc32(payload))
+            count_bytes("container", len(payload))
+            yield head
+            yield payload
+        pending = chunk[full:]
+    if pending:
+        with stage("container"):
+            head = FRAME_HEAD.pack(len(pending), zlib.crc32(pending))
+        count_bytes("container", len(pending))
+        yield head
+        yield pending
+    yield FRAME_HEAD.pack(0, 0)
+
+def create_cipher_file(original_filename: str, cipher_data: bytes, cipher="", size=None,
+                       frame_size=FRAME_SIZE, params=None) -> bytes:
+    """Membuat file cipher v2 dari data terenkripsi (size = ukuran data asli)"""
+    size = len(cipher_data) if size is None else size
+    header = container_header(original_filename, cipher, size, len(cipher_data), frame_size, params)
+    return header + b''.join(write_frames([cipher_data], frame_size))
+
+def read_cipher_header(f) -> CipherHeader:
     """
-    Membuat file cipher dengan format:
-    [4 bytes: panjang nama file][nama file][data terenkripsi]
+    Baca header file cipher (v2 atau format lama) langsung dari stream.
+    Setelah ini posisi stream berada di awal data terenkripsi (frame pertama
+    untuk v2). Format lama: version 1, cipher/size/frame_size None.
     """
-    filename_bytes = original_filename.encode('utf-8')
-    length_bytes = len(filename_bytes).to_bytes(4, 'big')
-    return length_bytes + filename_bytes + cipher_data
+    head = f.read(4)
+    if len(head) < 4:
+        raise ValueError("Invalid cipher file format")
+    
+    if head != CONTAINER_MAGIC:
+        filename_length = int.from_bytes(head, 'big')
+        filename_bytes = f.read(filename_length)
+        if len(filename_bytes) < filename_length:
+            raise ValueError("Invalid cipher file format")
+        return CipherHeader(1, None, {}, filename_bytes.decode('utf-8'), None, None, None)
+    
+    parts = [head]
+    def take(n):
+        data = f.read(n)
+        if len(data) < n:
+            raise ValueError("Cipher file is truncated")
+        parts.append(data)
+        return data
+    
+    version = take(1)[0]
+    if version != CONTAINER_VERSION:
+        raise ValueError(f"Unsupported cipher file version {version}")
+    cipher = take(take(1)[0]).decode('ascii')
+    filename = take(int.from_bytes(take(2), 'big')).decode('utf-8')
+    params = json.loads(take(int.from_bytes(take(2), 'big')))
+    size, cipher_size, frame_size = HEADER_TAIL.unpack(take(HEADER_TAIL.size))
+    crc = int.from_bytes(f.read(4), 'big')
+    if crc != zlib.crc32(b''.join(parts)):
+        raise ValueError("Cipher file header is corrupted")
+    return CipherHeader(version, cipher, params, filename, size, cipher_size, frame_size)
+
+def container_data_size(header) -> int:
+    """Jumlah byte setelah header v2 (semua frame + frame penutup)"""
+    frames = -(-header.cipher_size // header.frame_size) if header.frame_size else 0
+    return header.cipher_size + FRAME_HEAD.size * (frames + 1)
+
+def check_container_size(f, header):
+    """Deteksi upload yang terpotong sebelum mulai dekripsi (stream harus bisa di-seek)"""
+    if header.cipher_size == CIPHER_SIZE_UNKNOWN:
+        return  # terpotong terdeteksi saat frame penutup tidak ditemukan
+    if header.version >= 2 and remaining_size(f) < container_data_size(header):
+        raise ValueError("Cipher file is truncated")
+
+def read_frames(f, header):
+    """Baca frame v2 satu per satu; CRC32 dan panjang setiap frame dicek"""
+    while True:
+        with stage("read"):
+            head = f.read(FRAME_HEAD.size)
+            if len(head) < FRAME_HEAD.size:
+                raise ValueError("Cipher file is truncated")
+            length, crc = FRAME_HEAD.unpack(head)
+            if length == 0:
+                return
+            if length > header.frame_size:
+                raise ValueError("Cipher file is corrupted (invalid frame length)")
+            payload = f.read(length)
+            if len(payload) < length:
+                raise ValueError("Cipher file is truncated")
+            if zlib.crc32(payload) != crc:
+                raise ValueError("Cipher file is corrupted (CRC mismatch)")
+        count_bytes("read", length)
+        yield payload
 
 def extract_from_cipher_file(cipher_file: bytes) -> tuple:
     """
-    Mengextract nama file asli dan data dari file cipher
+    Mengextract nama file asli dan data dari file cipher (v2 atau format lama)
     Returns: (original_filename, cipher_data)
     """
-    if len(cipher_file) < 4:
-        raise ValueError("Invalid cipher file format")
+    f = io.BytesIO(cipher_file)
+    header = read_cipher_header(f)
+    if header.version == 1:
+        return header.filename, cipher_file[f.tell():]
+    return header.filename, b''.join(read_frames(f, header))
+
+# ===== Compiled Keys (LRU cache) =====
+# Key material turunan (tabel Playfair, LUT substitusi, inverse matrix Hill,
+# urutan permutasi) dihitung sekali per (cipher, key, arah) lalu di-cache.
+# Hasilnya read-only supaya aman dipakai bersama antar request.
+KEY_CACHE_SIZE = 256
+
+PlayfairKey = namedtuple("PlayfairKey", "table pos cells digraphs")
+PermutationKey = namedtuple("PermutationKey", "order scatter")
+
+def readonly(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+def hashable_matrix(M):
+    """Matriks (list/ndarray) -> tuple of tuple, supaya bisa jadi key cache"""
+    return tuple(tuple(int(x) for x in row) for row in M)
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_playfair(key, enc=True):
+    """
+    Tabel 5x5 Playfair beserta:
+    - pos: huruf -> (baris, kolom)
+    - cells: LUT 256 byte ASCII -> index sel 0..24 (J ikut sel I)
+    - digraphs: hasil substitusi untuk semua 25x25 pasangan sel, sesuai arah
+    """
+    table = tuple(tuple(row) for row in generate_playfair_table(key))
+    pos = {ch: (r, c) for r, row in enumerate(table) for c, ch in enumerate(row)}
     
-    filename_length = int.from_bytes(cipher_file[:4], 'big')
-    if len(cipher_file) < 4 + filename_length:
-        raise ValueError("Invalid cipher file format")
+    cells = np.full(256, 255, dtype=np.uint8)
+    for ch, (r, c) in pos.items():
+        cells[ord(ch)] = r * 5 + c
+    cells[ord('J')] = cells[ord('I')]
+    
+    step = 1 if enc else -1
+    digraphs = np.empty((625, 2), dtype=np.uint8)
+    for r1, c1 in pos.values():
+        for r2, c2 in pos.values():
+            if r1 == r2:
+                pair = table[r1][(c1+step)%5] + table[r2][(c2+step)%5]
+            elif c1 == c2:
+                pair = table[(r1+step)%5][c1] + table[(r2+step)%5][c2]
+            else:
+                pair = table[r1][c2] + table[r2][c1]
+            digraphs[(r1*5 + c1) * 25 + r2*5 + c2] = list(pair.encode('ascii'))
+    
+    return PlayfairKey(table, MappingProxyType(pos), readonly(cells), readonly(digraphs))
+
+# Playfair mode binary: grid 5x13 berisi 64 simbol base64 dan filler '='.
+# Data base64 (tanpa padding) tidak pernah mengandung '=', jadi filler yang
+# disisipkan (pengganti 'X' di Playfair text) bisa dibuang lagi dengan pasti.
+PLAYFAIR_B64_SYMBOLS = ascii_uppercase + ascii_lowercase + digits + "+/="
+PLAYFAIR_B64_FILLER = "="
+PLAYFAIR_B64_GRID = (5, 13)
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_playfair_binary(key, enc=True):
+    """
+    Seperti compiled_playfair, untuk grid base64 5x13: diisi simbol key dulu
+    (case-sensitive, duplikat dibuang) lalu sisa simbol. cells memetakan
+    byte ASCII ke index sel 0..64 (255 = bukan simbol), digraphs berisi
+    hasil untuk semua 65x65 pasangan sel.
+    """
+    symbols = ''.join(dict.fromkeys(c for c in key + PLAYFAIR_B64_SYMBOLS if c in PLAYFAIR_B64_SYMBOLS))
+    rows, cols = PLAYFAIR_B64_GRID
+    table = tuple(tuple(symbols[r*cols:(r+1)*cols]) for r in range(rows))
+    pos = {ch: divmod(i, cols) for i, ch in enumerate(symbols)}
+    
+    cells = np.full(256, 255, dtype=np.uint8)
+    for i, ch in enumerate(symbols):
+        cells[ord(ch)] = i
+    
+    step = 1 if enc else -1
+    digraphs = np.empty((len(symbols) ** 2, 2), dtype=np.uint8)
+    for r1, c1 in pos.values():
+        for r2, c2 in pos.values():
+            if r1 == r2:
+                pair = table[r1][(c1+step)%cols] + table[r2][(c2+step)%cols]
+            elif c1 == c2:
+                pair = table[(r1+step)%rows][c1] + table[(r2+step)%rows][c2]
+            else:
+                pair = table[r1][c2] + table[r2][c1]
+            digraphs[(r1*cols + c1) * len(symbols) + r2*cols + c2] = list(pair.encode('ascii'))
+    
+    return PlayfairKey(table, MappingProxyType(pos), readonly(cells), readonly(digraphs))
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_substitution(key, enc=True):
+    """LUT 256 byte untuk substitution_binary (key sudah uppercase)"""
+    if len(key) != 26 or len(set(key)) != 26:
+        raise ValueError("Key must be 26 unique letters")
+    
+    if enc:
+        # Enkripsi: setiap byte dipetakan ke posisi alphabet (i % 26), lalu disubstitusi
+        new_pos = [char_to_num(c) for c in key]
+    else:
+        # Dekripsi: reverse mapping
+        new_pos = [0] * 26
+        for i, c in enumerate(key):
+            new_pos[char_to_num(c)] = i
+    return build_lut(lambda i: (i // 26) * 26 + new_pos[i % 26])
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_hill(M, m, enc=True):
+    """Matriks Hill mod m siap pakai; untuk dekripsi sudah berupa inverse-nya"""
+    K = key_matrix(M, m)
+    if not enc:
+        K = matrix_inverse_mod(K, m)
+        if K is None:
+            raise ValueError(f"Matrix not invertible mod {m}")
+    return readonly(K)
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_permutation(key_nums, enc=True):
+    """
+    Enkripsi memindahkan elemen ke-j dari setiap blok ke posisi key_nums[j]-1,
+    dekripsi mengembalikannya. Disimpan dua bentuk yang setara:
+    order (gather, out[i] = block[order[i]]) untuk text dan
+    scatter (out[scatter[j]] = block[j]) untuk NumPy, yang lebih cepat.
+    """
+    n = len(key_nums)
+    if n == 0 or sorted(key_nums) != list(range(1, n + 1)):
+        raise ValueError("Permutation key must contain each number 1..n exactly once")
     
-    filename = cipher_file[4:4+filename_length].decode('utf-8')
-    cipher_data = cipher_file[4+filename_length:]
-    return filename, cipher_data
+    dest = [k-1 for k in key_nums]
+    inv = [0] * n
+    for j, d in enumerate(dest):
+        inv[d] = j
+    order, scatter = (inv, dest) if enc else (dest, inv)
+    return PermutationKey(tuple(order), readonly(np.array(scatter, dtype=np.intp)))
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_affine(a, b, m, enc=True):
+    """Tabel affine: str.translate untuk text (m=26) atau LUT 256 byte untuk binary (m=256)"""
+    if gcd(a, m) != 1:
+        raise ValueError(f"a must be coprime with {m}")
+    if enc:
+        fn = lambda x: a * x + b
+    else:
+        a_inv = mod_inverse(a, m)
+        fn = lambda x: a_inv * (x - b)
+    return alphabet_table(fn) if m == 26 else build_lut(fn)
+
+KEY_CACHES = {
+    "playfair": compiled_playfair,
+    "playfair_binary": compiled_playfair_binary,
+    "substitution": compiled_substitution,
+    "affine": compiled_affine,
+    "hill": compiled_hill,
+    "permutation": compiled_permutation,
+}
+
+def key_cache_stats():
+    """Hit/miss counter dan ukuran setiap cache key"""
+    return {name: fn.cache_info()._asdict() for name, fn in KEY_CACHES.items()}
 
 # ===== Cipher Functions - Text Mode =====
 def shift_text(text, key, enc=True):
     """Shift cipher untuk text (huruf A-Z saja)"""
-    res = ""
-    for ch in text.upper():
-        if ch.isalpha():
-            res += num_to_char(char_to_num(ch) + (key if enc else -key))
-        else: 
-            res += ch
-    return res
+    shift = key if enc else -key
+    return upper_checked(text).translate(SHIFT_TABLES[shift % 26])
 
 def vigenere_text(text, key, enc=True):
     """Vigenere cipher untuk text"""
     if not key.isalpha(): 
         raise ValueError("Key must be letters")
-    res = ""; j = 0
-    for ch in text.upper():
-        if ch.isalpha():
-            shift_val = char_to_num(key[j % len(key)].upper())
-            res += num_to_char(char_to_num(ch) + (shift_val if enc else -shift_val))
-            j += 1
-        else: 
-            res += ch
-    return res
+    codes, encoding = text_codes(upper_checked(text))
+    # Hanya huruf yang memakai (dan memajukan) posisi key
+    letters = np.flatnonzero((codes >= 65) & (codes <= 90))
+    if len(letters) == 0:
+        return text.upper()
+    
+    key_nums = np.array([char_to_num(c) for c in key], dtype=np.uint8)
+    if not enc:
+        key_nums = (26 - key_nums) % 26
+    shifts = np.tile(key_nums, -(-len(letters) // len(key_nums)))[:len(letters)]
+    codes[letters] = (codes[letters] - 65 + shifts) % 26 + 65
+    return codes.tobytes().decode(encoding)
 
 def substitution(text,key,enc=True):
     key=key.upper()
     if len(key)!=26 or len(set(key))!=26:
         raise ValueError("Key must be 26 unique letters")
     if enc:
-        table={ascii_uppercase[i]:key[i] for i in range(26)}
+        table=str.maketrans(ascii_uppercase,key)
     else:
-        table={key[i]:ascii_uppercase[i] for i in range(26)}
-    return ''.join(table.get(ch,ch) for ch in text.upper())
+        table=str.maketrans(key,ascii_uppercase)
+    return text.upper().translate(table)
 
 def affine(text,a,b,enc=True):
-    if gcd(a,26)!=1: raise ValueError("a must be coprime with 26")
-    if enc:
-        return ''.join(num_to_char(a*char_to_num(ch)+b) if ch.isalpha() else ch for ch in text.upper())
-    else:
-        ainv=mod_inverse(a,26)
-        return ''.join(num_to_char(ainv*(char_to_num(ch)-b)) if ch.isalpha() else ch for ch in text.upper())
+    return upper_checked(text).translate(compiled_affine(a%26,b%26,26,enc))
 
 def hill(text,M,enc=True):
-    t=''.join([c for c in text.upper() if c.isalpha()])
-    if len(t)%2: t+='X'
-    if not enc:
-        M=matrix_inverse_mod26(M)
-        if M is None: raise ValueError("Matrix not invertible mod 26")
-    res=""
-    for i in range(0,len(t),2):
-        v=np.array([char_to_num(t[i]),char_to_num(t[i+1])])
-        w=np.dot(M,v)%26
-        res+=num_to_char(int(w[0]))+num_to_char(int(w[1]))
-    return res
+    K=compiled_hill(hashable_matrix(M),26,enc)
+    n=len(K)
+    t=letters_only(text)
+    if len(t)%n: t+=b'X'*(n-len(t)%n)
+    nums=np.frombuffer(t,dtype=np.uint8)-65
+    return (hill_blocks(nums,K,26)+65).tobytes().decode('ascii')
 
 def permutation(text,key_nums,enc=True):
+    order=compiled_permutation(tuple(key_nums),enc).order
     t=''.join([c for c in text.upper() if c.isalpha()])
-    n=len(key_nums)
-    while len(t)%n: t+='X'
-    if enc:
-        out=[]
-        for i in range(0,len(t),n):
-            block=t[i:i+n]; e=['']*n
-            for j in range(n): e[key_nums[j]-1]=block[j]
-            out.append(''.join(e))
-        return ''.join(out)
-    else:
-        inv=[0]*n
-        for i,k in enumerate(key_nums): inv[k-1]=i
-        out=[]
-        for i in range(0,len(t),n):
-            block=t[i:i+n]; d=['']*n
-            for j in range(n): d[j]=block[inv[j]]
-            out.append(''.join(d))
-        return ''.join(out)
+    n=len(order)
+    if len(t)%n: t+='X'*(n-len(t)%n)
+    return ''.join([t[i+o] for i in range(0,len(t),n) for o in order])
 
 def generate_playfair_table(key):
     key = key.upper().replace("J", "I")
-    table = ""
-    for c in key:
-        if c not in table and c in ascii_uppercase.replace("J",""):
-            table+=c
-    for c in ascii_uppercase.replace("J",""):
-        if c not in table:
-            table+=c
+    # dict.fromkeys menjaga urutan dan membuang huruf duplikat
+    table = ''.join(dict.fromkeys(c for c in key + ALPHA if c in ALPHA))
     return [list(table[i*5:(i+1)*5]) for i in range(5)]
 
-def find_position(table, ch):
-    for r in range(5):
-        for c in range(5):
-            if table[r][c]==ch: return r,c
-    return None,None
+def playfair_pairs(cells):
+    """
+    Bentuk digraph Playfair dari array index sel: huruf kembar dalam satu
+    pasangan dan huruf terakhir yang sendirian dipasangkan dengan 'X'.
+    Hanya posisi huruf kembar yang dicek di loop Python, sisanya vectorized.
+    Returns: (first, second, pad_x) - second tidak berlaku jika pad_x True
+    """
+    n = len(cells)
+    # Setiap huruf kembar di awal pasangan menyisipkan 'X', sehingga
+    # pasangan berikutnya mulai di p+1 dan paritas posisi awal pasangan berbalik
+    flips = np.zeros(n + 1, dtype=np.uint8)
+    s = 0
+    for p in np.flatnonzero(cells[:-1] == cells[1:]).tolist():
+        if p >= s and (p - s) % 2 == 0:
+            flips[p + 1] = 1
+            s = p + 1
+    parity = np.cumsum(flips[:n], dtype=np.uint8) & 1
+    first_pos = np.flatnonzero((np.arange(n, dtype=np.uint8) & 1) == parity)
+    
+    second_pos = np.minimum(first_pos + 1, n - 1)
+    first, second = cells[first_pos], cells[second_pos]
+    pad_x = (first_pos + 1 >= n) | (first == second)
+    return first, second, pad_x
 
 def playfair(text,key,enc=True):
-    table=generate_playfair_table(key)
-    t=''.join([c for c in text.upper() if c.isalpha()]).replace("J","I")
-    pairs=[]
-    i=0
-    while i<len(t):
-        a=t[i]
-        b=t[i+1] if i+1<len(t) else 'X'
-        if a==b: 
-            pairs.append((a,'X'))
-            i+=1
-        else:
-            pairs.append((a,b))
-            i+=2
-    res=""
-    for a,b in pairs:
-        r1,c1=find_position(table,a)
-        r2,c2=find_position(table,b)
-        if r1==r2:
-            if enc:
-                res+=table[r1][(c1+1)%5]+table[r2][(c2+1)%5]
-            else:
-                res+=table[r1][(c1-1)%5]+table[r2][(c2-1)%5]
-        elif c1==c2:
-            if enc:
-                res+=table[(r1+1)%5][c1]+table[(r2+1)%5][c2]
-            else:
-                res+=table[(r1-1)%5][c1]+table[(r2-1)%5][c2]
-        else:
-            res+=table[r1][c2]+table[r2][c1]
-    return res
+    pk=compiled_playfair(key,enc)
+    cells=pk.cells[np.frombuffer(letters_only(text),dtype=np.uint8)]
+    first,second,pad_x=playfair_pairs(cells)
+    second=np.where(pad_x,pk.cells[ord('X')],second)
+    pairs=first.astype(np.intp)*25+second
+    return pk.digraphs[pairs].tobytes().decode('ascii')
 
 def otp(text,key,enc=True):
-    t=''.join([c for c in text.upper() if c.isalpha()])
-    k=''.join([c for c in key.upper() if c.isalpha()])
+    """key: string, atau bytes/memoryview huruf A-Z (potongan pad dari PadStore)"""
+    t=np.frombuffer(letters_only(text),dtype=np.uint8)
+    if isinstance(key,str):
+        k=np.frombuffer(letters_only(key),dtype=np.uint8)
+    else:
+        k=np.frombuffer(key,dtype=np.uint8)
     if len(k)<len(t): raise ValueError("OTP key too short")
-    res=""
-    for i,ch in enumerate(t):
-        shift_val=char_to_num(k[i])
-        if enc:
-            res+=num_to_char(char_to_num(ch)+shift_val)
-        else:
-            res+=num_to_char(char_to_num(ch)-shift_val)
-    return res
+    k=k[:len(t)]
+    if not isinstance(key,str) and ((k<65)|(k>90)).any():
+        raise ValueError("OTP pad must contain only letters A-Z for text mode")
+    k=k-65
+    if enc:
+        res=(t-65+k)%26+65
+    else:
+        res=(t-65+26-k)%26+65
+    return res.tobytes().decode('ascii')
+
+# ===== Binary Engine (NumPy) =====
+def as_u8(data) -> np.ndarray:
+    """View bytes/bytearray/memoryview sebagai array uint8 tanpa copy"""
+    return np.frombuffer(data, dtype=np.uint8)
+
+def build_lut(fn) -> bytes:
+    """Lookup table 256 byte: lut[x] = fn(x) % 256 (dihitung dengan int Python)"""
+    return bytes(fn(x) % 256 for x in range(256))
+
+def apply_lut(data, lut: bytes) -> bytes:
+    """Terapkan lookup table 256 byte ke seluruh data sekaligus"""
+    # bytes.translate adalah table lookup di C, lebih cepat dari fancy indexing NumPy
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    return data.translate(lut)
+
+def add_key_stream(data, key_vec: np.ndarray, enc=True, out=None) -> bytes:
+    """
+    Tambah/kurangi key yang berulang (periodik) ke setiap byte, mod 256.
+    Data di-reshape menjadi (N, len(key)) supaya key cukup di-broadcast,
+    sisa ekor diproses dengan potongan key.
+    Dengan out (array uint8, boleh data itu sendiri) hasil ditulis ke sana.
+    """
+    arr = as_u8(data)
+    k = len(key_vec)
+    full = len(arr) - len(arr) % k
+    dst = np.empty_like(arr) if out is None else out
+    op = np.add if enc else np.subtract
+    op(arr[:full].reshape(-1, k), key_vec, out=dst[:full].reshape(-1, k))
+    op(arr[full:], key_vec[:len(arr) - full], out=dst[full:len(arr)])
+    return dst.tobytes() if out is None else dst
 
 # ===== Cipher Functions - Binary Mode =====
 def shift_binary(data: bytes, key: int, enc=True) -> bytes:
     """Shift cipher untuk data binary"""
-    result = []
-    for byte_val in data:
-        if enc:
-            new_val = (byte_val + key) % 256
-        else:
-            new_val = (byte_val - key) % 256
-        result.append(new_val)
-    return bytes(result)
+    return apply_lut(data, BYTE_ROTATIONS[(key if enc else -key) % 256])
 
-def vigenere_binary(data: bytes, key: str, enc=True) -> bytes:
-    """Vigenere cipher untuk data binary"""
+def vigenere_key_bytes(key: str) -> list:
+    """Nilai byte yang ditambahkan untuk setiap huruf key vigenere binary (A=0 .. Z=255)"""
     if not key.isalpha():
         raise ValueError("Key must be letters")
-    
-    key_nums = [char_to_num(c) for c in key.upper()]
-    result = []
-    
-    for i, byte_val in enumerate(data):
-        key_val = key_nums[i % len(key_nums)]
-        key_scaled = int((key_val / 25) * 255)
-        
-        if enc:
-            new_val = (byte_val + key_scaled) % 256
-        else:
-            new_val = (byte_val - key_scaled) % 256
-        result.append(new_val)
-    
-    return bytes(result)
+    return [int((char_to_num(c) / 25) * 255) for c in key.upper()]
+
+def vigenere_binary(data: bytes, key: str, enc=True, offset=0) -> bytes:
+    """Vigenere cipher untuk data binary (offset = posisi byte pertama dalam file)"""
+    key_vec = np.array(vigenere_key_bytes(key), dtype=np.uint8)
+    out = bytearray(len(data))
+    add_key_stream(data, np.roll(key_vec, -(offset % len(key_vec))), enc, out=as_u8(out))
+    return out
 
 def substitution_binary(data: bytes, key: str, enc=True) -> bytes:
     """Substitution cipher untuk data binary"""
-    key = key.upper()
-    if len(key) != 26 or len(set(key)) != 26:
-        raise ValueError("Key must be 26 unique letters")
-    
-    # Buat lookup table 256 byte berdasarkan key 26 huruf
-    if enc:
-        # Enkripsi: buat mapping byte -> byte berdasarkan pattern key
-        table = {}
-        for i in range(256):
-            # Map setiap byte ke posisi dalam alphabet, lalu substitute
-            alpha_pos = i % 26
-            key_char = key[alpha_pos]
-            new_pos = char_to_num(key_char)
-            table[i] = (i // 26) * 26 + new_pos
-        return bytes([table[b] % 256 for b in data])
-    else:
-        # Dekripsi: reverse mapping
-        reverse_key = [''] * 26
-        for i, c in enumerate(key):
-            reverse_key[char_to_num(c)] = ascii_uppercase[i]
-        
-        table = {}
-        for i in range(256):
-            alpha_pos = i % 26
-            orig_char = reverse_key[alpha_pos] if alpha_pos < len(reverse_key) else ascii_uppercase[alpha_pos]
-            new_pos = char_to_num(orig_char)
-            table[i] = (i // 26) * 26 + new_pos
-        return bytes([table[b] % 256 for b in data])
+    # Lookup table 256 byte berdasarkan key 26 huruf (lihat compiled_substitution)
+    return apply_lut(data, compiled_substitution(key.upper(), enc))
 
 def affine_binary(data: bytes, a: int, b: int, enc=True) -> bytes:
     """Affine cipher untuk data binary (mod 256)"""
-    if gcd(a, 256) != 1:
-        raise ValueError("a must be coprime with 256")
-    
-    result = []
-    if enc:
-        for byte_val in data:
-            new_val = (a * byte_val + b) % 256
-            result.append(new_val)
-    else:
-        a_inv = mod_inverse(a, 256)
-        if a_inv is None:
-            raise ValueError("Cannot find modular inverse")
-        for byte_val in data:
-            new_val = (a_inv * (byte_val - b)) % 256
-            result.append(new_val)
-    
-    return bytes(result)
+    return apply_lut(data, compiled_affine(a % 256, b % 256, 256, enc))
 
 def hill_binary(data: bytes, M, enc=True) -> bytes:
-    """Hill cipher untuk data binary (2x2 matrix, mod 256)"""
-    original_length = len(data)
-    padded_data = data
-
-    if len(data) % 2:
-        padded_data += b'\x00'  
-
-    if not enc:
-        # Hitung inverse matrix mod 256
-        det = int(np.round(np.linalg.det(M))) % 256
-        det_inv = mod_inverse(det, 256)
-        if det_inv is None:
-            raise ValueError("Matrix not invertible mod 256")
-        adj = np.array([[M[1][1], -M[0][1]], [-M[1][0], M[0][0]]])
-        M = (det_inv * adj) % 256
-    
-    result = []
-    for i in range(0, len(padded_data), 2):
-        v = np.array([padded_data[i], padded_data[i+1]])
-        w = np.dot(M, v) % 256
-        result.extend([int(w[0]), int(w[1])])
-    
-    return bytes(result[:original_length])
+    """
+    Hill cipher untuk data binary (matriks n×n, mod 256).
+    Sisa ekor yang kurang dari satu blok (len % n byte) tidak dienkripsi,
+    supaya panjang file tetap sama dan dekripsi bisa mengembalikan semuanya.
+    Hasil berupa bytearray yang diisi langsung (tanpa copy tambahan).
+    """
+    out = bytearray(len(data))
+    hill_into(as_u8(data), as_u8(out), compiled_hill(hashable_matrix(M), 256, enc))
+    return out
 
 def permutation_binary(data: bytes, key_nums, enc=True) -> bytes:
-    """Permutation cipher untuk data binary"""
-    n = len(key_nums)
-    while len(data) % n:
-        data = data + b'\x00'
-    
-    if enc:
-        result = []
-        for i in range(0, len(data), n):
-            block = data[i:i+n]
-            encrypted_block = [0] * n
-            for j in range(n):
-                encrypted_block[key_nums[j]-1] = block[j]
-            result.extend(encrypted_block)
-        return bytes(result)
-    else:
-        # Buat inverse permutation
-        inv = [0] * n
-        for i, k in enumerate(key_nums):
-            inv[k-1] = i
-        
-        result = []
-        for i in range(0, len(data), n):
-            block = data[i:i+n]
-            decrypted_block = [0] * n
-            for j in range(n):
-                decrypted_block[j] = block[inv[j]]
-            result.extend(decrypted_block)
-        return bytes(result)
+    """Permutation cipher untuk data binary (blok terakhir di-pad dengan byte 0)"""
+    scatter = compiled_permutation(tuple(key_nums), enc).scatter
+    out = bytearray(len(data) + (-len(data) % len(scatter)))
+    permutation_into(as_u8(data), as_u8(out), scatter)
+    return out
 
 def playfair_binary(data: bytes, key: str, enc=True) -> bytes:
     """
-    Playfair untuk binary - convert bytes ke base64, 
-    lalu apply playfair text, lalu convert balik
+    Playfair untuk binary - bytes di-encode base64, lalu Playfair pada grid
+    base64 (lihat compiled_playfair_binary). Diproses per potongan
+    STREAM_CHUNK lewat stream_playfair, hasilnya sama dengan mode streaming.
     """
-    if enc:
-        # Convert binary -> base64 -> playfair encrypt
-        b64_data = base64.b64encode(data).decode('ascii')
-        encrypted_text = playfair(b64_data, key, enc=True)
-        return encrypted_text.encode('ascii')
-    else:
-        # playfair decrypt -> base64 decode -> binary
-        try:
-            decrypted_text = playfair(data.decode('ascii'), key, enc=False)
-            return base64.b64decode(decrypted_text)
-        except Exception as e:
-            raise ValueError(f"Playfair binary decryption failed: {e}")
+    view = memoryview(data)
+    chunks = (view[i:i + STREAM_CHUNK] for i in range(0, len(view), STREAM_CHUNK))
+    return b''.join(stream_playfair(chunks, key, enc))
 
 def otp_binary(data: bytes, key_data: bytes, enc=True) -> bytes:
     """One-Time Pad untuk data binary"""
     if len(key_data) < len(data):
         raise ValueError("OTP key too short for binary data")
     
-    result = []
-    for i, byte_val in enumerate(data):
-        key_byte = key_data[i]
-        if enc:
-            new_val = (byte_val + key_byte) % 256
+    out = bytearray(len(data))
+    op = np.add if enc else np.subtract
+    op(as_u8(data), as_u8(key_data)[:len(data)], out=as_u8(out))
+    return out
+
+# ===== In-place Binary Mode =====
+# Varian zero-copy untuk buffer yang bisa ditulis (bytearray, memoryview,
+# mmap ACCESS_WRITE): hasil ditulis ke out, atau langsung ke data itu sendiri
+# kalau out tidak diberikan. Buffer sementara dibatasi per potongan/batch,
+# jadi peak memory sekitar 1x ukuran data. Blok terakhir permutation yang
+# tidak penuh di-pad lewat buffer satu blok, bukan dengan meng-copy data;
+# buffer output harus cukup untuk padding itu (lihat cipher_output_size).
+INPLACE_CHUNK = 1024 * 1024   # ukuran potongan bytes.translate / batch permutation
+
+def writable_u8(buf) -> np.ndarray:
+    """View buffer yang bisa ditulis sebagai array uint8 tanpa copy"""
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    if not arr.flags.writeable:
+        raise ValueError("Buffer is read-only (use bytearray, writable memoryview or mmap)")
+    return arr
+
+def translate_into(src: np.ndarray, dst: np.ndarray, lut: bytes):
+    """dst[i] = lut[src[i]], per potongan INPLACE_CHUNK (src dan dst boleh sama)"""
+    for i in range(0, len(src), INPLACE_CHUNK):
+        dst[i:i + INPLACE_CHUNK] = as_u8(src[i:i + INPLACE_CHUNK].tobytes().translate(lut))
+
+def hill_into(src: np.ndarray, dst: np.ndarray, K: np.ndarray):
+    """Hill mod 256 dari src ke dst; sisa ekor (< n byte) dicopy apa adanya"""
+    n = len(src)
+    full = n - n % len(K)
+    hill_blocks(src[:full], K, 256, out=dst[:full])
+    if not np.shares_memory(src, dst):
+        dst[full:n] = src[full:]
+
+def permutation_into(src: np.ndarray, dst: np.ndarray, scatter: np.ndarray):
+    """
+    Permutation dari src ke dst per batch blok (src dan dst boleh sama).
+    Blok terakhir yang tidak penuh di-pad 0 di buffer satu blok, jadi
+    dst harus punya ruang len(src) dibulatkan ke atas kelipatan blok.
+    """
+    k = len(scatter)
+    n = len(src)
+    full = n - n % k
+    rows = INPLACE_CHUNK // k * k
+    for i in range(0, full, rows):
+        end = min(i + rows, full)
+        # Copy batch dulu: dst bisa menimpa src di tempat yang sama
+        block = src[i:end].reshape(-1, k).copy()
+        dst[i:end].reshape(-1, k)[:, scatter] = block
+    if full < n:
+        tail = np.zeros(k, dtype=np.uint8)
+        tail[:n - full] = src[full:]
+        dst[full:full + k][scatter] = tail
+
+def cipher_into(data, cipher, args, enc=True, out=None, pos=0) -> int:
+    """
+    Versi in-place dari apply_binary untuk cipher di STREAM_CIPHERS: hasil
+    ditulis ke out (atau ke data kalau out None). data boleh berada di awal
+    out yang sama (mis. memoryview(buf)[:n] dengan out=buf untuk padding).
+    Returns: jumlah byte hasil yang ditulis
+    """
+    if cipher not in STREAM_CIPHERS:
+        raise ValueError("Cipher does not support in-place mode")
+    src = as_u8(data)
+    size = cipher_output_size(cipher, args, len(src))
+    dst = writable_u8(data if out is None else out)
+    if len(dst) < size:
+        raise ValueError(f"Output buffer too small ({size} bytes needed)")
+    dst = dst[:size]
+    
+    if cipher in ("shift", "sub", "affine"):
+        translate_into(src, dst, stage_luts(cipher, args, enc)[0])
+    elif cipher == "vig":
+        key_vec = np.array(vigenere_key_bytes(args[0]), dtype=np.uint8)
+        add_key_stream(src, np.roll(key_vec, -(pos % len(key_vec))), enc, out=dst)
+    elif cipher == "otp":
+        if len(args[0]) < len(src):
+            raise ValueError("OTP key too short for binary data")
+        op = np.add if enc else np.subtract
+        op(src, as_u8(args[0])[:len(src)], out=dst)
+    elif cipher == "hill":
+        hill_into(src, dst, compiled_hill(hashable_matrix(args[0]), 256, enc))
+    elif cipher == "perm":
+        permutation_into(src, dst, compiled_permutation(tuple(args[0]), enc).scatter)
+    else:
+        pipeline_into(src, dst, args[0], enc, pos)
+    return size
+
+# ===== Cipher Pipeline =====
+# Beberapa cipher dijalankan berurutan dalam satu request (misalnya
+# substitution -> vigenere -> permutation). Stage byte-wise yang berdekatan
+# (shift, affine, substitution, vigenere) digabung menjadi satu LUT 256 byte,
+# atau satu LUT per posisi kalau ada vigenere (periode = KPK panjang key),
+# jadi data hanya dilewati sekali. Stage blok (hill, permutation) bekerja di
+# buffer kerja yang sama. Dekripsi menjalankan stage terbalik dari belakang.
+# Kalau ada permutation, data di-pad sekali di awal ke kelipatan KPK ukuran
+# bloknya, supaya setiap stage melihat panjang data yang sama saat enkripsi
+# maupun dekripsi.
+PIPELINE_CIPHERS = {"shift", "vig", "sub", "affine", "hill", "perm"}
+PIPELINE_MAX_PERIOD = 4096   # LUT per posisi lebih panjang dari ini tidak digabung
+
+PipelineKey = namedtuple("PipelineKey", "ops block pad")
+
+def parse_pipeline(spec, is_binary=True) -> tuple:
+    """
+    Spec pipeline: satu stage per baris (atau dipisah '|'), "<cipher> <key>":
+      sub QWERTYUIOPASDFGHJKLZXCVBNM | vig LEMON | perm 3 1 2
+    affine "affine <a> <b>", hill "hill 3 3; 2 5" (baris matriks dipisah ';').
+    sub hanya untuk mode text.
+    Returns: tuple (cipher, args) yang hashable (bisa jadi key cache)
+    """
+    stages = []
+    for line in spec.replace("|", "\n").splitlines():
+        name, _, key = line.strip().partition(" ")
+        if not name:
+            continue
+        cipher = API_CIPHERS.get(name.lower())
+        if cipher not in PIPELINE_CIPHERS:
+            raise ValueError(f"Cipher '{name}' cannot be used in a pipeline")
+        if cipher == "sub" and is_binary:
+            # LUT substitution binary tidak bijektif (byte 234..255), hasil pipeline tidak bisa didekripsi
+            raise ValueError("Cipher 'sub' cannot be used in a binary pipeline")
+        key = key.strip()
+        if cipher == "affine":
+            values = dict(zip("ab", key.split()))
+        elif cipher == "hill":
+            values = {"matrix": key}
+        else:
+            values = {"key": key}
+        args = parse_api_args(cipher, values.get, is_binary)
+        if cipher == "hill":
+            args = (hashable_matrix(args[0]),)
+        elif cipher == "perm":
+            args = (tuple(args[0]),)
+        stages.append((cipher, args))
+    if not stages:
+        raise ValueError("Pipeline is empty")
+    return tuple(stages)
+
+def pipeline_names(stages) -> list:
+    return [cipher for cipher, _ in stages]
+
+def stage_luts(cipher, args, enc=True) -> list:
+    """LUT 256 byte stage byte-wise: satu LUT, atau satu per posisi key (vigenere)"""
+    if cipher == "shift":
+        return [BYTE_ROTATIONS[(args[0] if enc else -args[0]) % 256]]
+    elif cipher == "affine":
+        return [compiled_affine(args[0] % 256, args[1] % 256, 256, enc)]
+    elif cipher == "sub":
+        return [compiled_substitution(args[0].upper(), enc)]
+    elif cipher == "vig":
+        return [BYTE_ROTATIONS[(k if enc else -k) % 256] for k in vigenere_key_bytes(args[0])]
+    raise ValueError(f"'{cipher}' is not a byte-wise cipher")
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_pipeline(stages, enc=True) -> PipelineKey:
+    """
+    Compile stage menjadi daftar operasi untuk pipeline_binary:
+    ("lut", LUT), ("luts", tuple LUT per posisi), ("hill", K), ("perm", scatter).
+    block = KPK ukuran blok hill/permutation, pad = KPK ukuran blok permutation.
+    """
+    ops = []
+    run = None
+    
+    def flush():
+        if run is not None:
+            ops.append(("lut", run[0]) if len(run) == 1 else ("luts", tuple(run)))
+    
+    block = pad = 1
+    for cipher, args in (stages if enc else reversed(stages)):
+        if cipher in ("hill", "perm"):
+            flush()
+            run = None
+            n = len(args[0])
+            block = math.lcm(block, n)
+            if cipher == "hill":
+                ops.append(("hill", compiled_hill(hashable_matrix(args[0]), 256, enc)))
+            else:
+                pad = math.lcm(pad, n)
+                ops.append(("perm", compiled_permutation(tuple(args[0]), enc).scatter))
+            continue
+        
+        luts = stage_luts(cipher, args, enc)
+        period = math.lcm(len(run), len(luts)) if run is not None else len(luts)
+        if run is None or period > PIPELINE_MAX_PERIOD:
+            flush()
+            run = luts
         else:
-            new_val = (byte_val - key_byte) % 256
-        result.append(new_val)
+            # Komposisi: byte x -> luts[i](run[i](x)), translate memakai LUT sebagai tabel
+            run = [run[i % len(run)].translate(luts[i % len(luts)]) for i in range(period)]
+    flush()
+    return PipelineKey(tuple(ops), block, pad)
+
+KEY_CACHES["pipeline"] = compiled_pipeline
+
+def pipeline_into(src: np.ndarray, buf: np.ndarray, stages, enc=True, pos=0):
+    """
+    Jalankan pipeline dari src ke buf (pos = posisi byte pertama dalam file,
+    harus di batas blok). buf sepanjang src + padding, boleh berbagi memory
+    dengan src; semua stage bekerja in-place di buf.
+    """
+    pk = compiled_pipeline(stages, enc)
+    n, total = len(src), len(buf)
+    if not np.shares_memory(src, buf):
+        buf[:n] = src
+    buf[n:] = 0
     
-    return bytes(result)
+    for kind, key in pk.ops:
+        # LUT diterapkan dengan bytes.translate (lebih cepat dari np.take), lalu ditulis balik
+        if kind == "lut":
+            translate_into(buf, buf, key)
+        elif kind == "luts":
+            period = len(key)
+            shift = pos % period
+            rows = key[shift:] + key[:shift]
+            full = total - total % period
+            cols = buf[:full].reshape(-1, period)
+            step = max(INPLACE_CHUNK // period, 1)
+            for r in range(0, len(cols), step):
+                part = cols[r:r + step]
+                for i in range(period):
+                    part[:, i] = as_u8(part[:, i].tobytes().translate(rows[i]))
+            for i in range(total - full):
+                buf[full + i] = rows[i][buf[full + i]]
+        elif kind == "hill":
+            hill_into(buf, buf, key)
+        else:
+            permutation_into(buf, buf, key)
+
+def pipeline_binary(data, stages, enc=True, pos=0) -> bytes:
+    """Pipeline pada data binary; data di-pad ke kelipatan blok permutation (kalau ada)"""
+    out = bytearray(cipher_output_size("pipe", (stages,), len(data)))
+    pipeline_into(as_u8(data), as_u8(out), stages, enc, pos)
+    return out
+
+def pipeline_text_block(stages) -> int:
+    """KPK ukuran blok stage hill/permutation (juga di pipeline bersarang)"""
+    block = 1
+    for cipher, args in stages:
+        if cipher in ("hill", "perm"):
+            block = math.lcm(block, len(args[0]))
+        elif cipher == "pipe":
+            block = math.lcm(block, pipeline_text_block(args[0]))
+    return block
+
+def padded_letters(chunks, block):
+    """Huruf A-Z dari chunks text, huruf terakhir di-pad 'X' sampai kelipatan block"""
+    count = 0
+    for chunk in chunks:
+        letters = letters_only(chunk).decode('ascii')
+        count += len(letters)
+        if letters:
+            yield letters
+    if count % block:
+        yield 'X' * (block - count % block)
+
+def pipeline_text(text, stages, enc=True) -> str:
+    """
+    Pipeline mode text: stage dijalankan berurutan dengan fungsi text masing-masing.
+    Enkripsi dengan stage hill/permutation mem-pad text sekali di awal (KPK ukuran
+    blok), jadi stage di tengah tidak menambah padding sendiri dan dekripsi membalik
+    setiap stage dengan tepat. Seperti hill/permutation biasa, padding 'X' tetap ada
+    di akhir hasil dekripsi.
+    """
+    if enc and pipeline_text_block(stages) > 1:
+        text = ''.join(padded_letters([text], pipeline_text_block(stages)))
+    for cipher, args in (stages if enc else reversed(stages)):
+        text = PROCESSORS[cipher](text, *args, enc=enc, is_binary=False)
+    return text
 
 # ===== Unified Cipher Functions =====
 def process_shift(data, key, enc=True, is_binary=False):
@@ -451,186 +1212,2218 @@ def process_otp(data, key, enc=True, is_binary=False):
     else:
         return otp(data, key, enc)
 
-# ===== Main Route =====
-@app.route("/", methods=["GET","POST"])
-def index():
-    output = None
-    prev_input = None
-    prev_key_shift = prev_key_vig = prev_key_sub = None
-    prev_key_affine_a = prev_key_affine_b = None
-    prev_key_hill = None
-    prev_key_perm = None
-    prev_key_playfair = None
-    prev_key_otp = None
-    
-    if request.method == "POST":
-        cipher = request.form["cipher"]
-        action = request.form["action"]
-        input_type = request.form.get("input_type", "text")
-        fmt = request.form.get("format", "normal")
-        
-        try:
-            # Determine input source and type
-            if input_type == "file":
-                if "file_input" not in request.files:
-                    raise ValueError("No file uploaded")
-                f = request.files["file_input"]
-                if not f or f.filename == "":
-                    raise ValueError("No file selected")
-                
-                original_filename = secure_filename(f.filename)
-                data = f.read()
-                is_binary = True
-                prev_input = None
-                
-            else:
-                data = request.form.get("input_text", "")
-                if not data:
-                    raise ValueError("No text input provided")
-                is_binary = False
-                original_filename = None
-                prev_input = data
+def process_pipeline(data, stages, enc=True, is_binary=False):
+    """Unified function untuk pipeline (stages dari parse_pipeline)"""
+    if is_binary:
+        return pipeline_binary(data, stages, enc)
+    else:
+        return pipeline_text(data, stages, enc)
 
-            # Process with appropriate cipher
-            if cipher == "shift":
-                key = int(request.form["shift_key"])
-                result = process_shift(data, key, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_shift = key
-                    
-            elif cipher == "vig":
-                key = request.form["vig_key"]
-                result = process_vigenere(data, key, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_vig = key
-
-            elif cipher == "sub":
-                key = request.form["sub_key"]
-                result = process_substitution(data, key, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_sub = key
-
-            elif cipher == "affine":
-                a = int(request.form["a"]); b = int(request.form["b"])
-                result = process_affine(data, a, b, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_affine_a = a
-                prev_key_affine_b = b
-
-            elif cipher == "hill":
-                M = np.array([
-                    [int(request.form["m00"]),int(request.form["m01"])],
-                    [int(request.form["m10"]),int(request.form["m11"])]
-                ])
-                result = process_hill(data, M, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_hill = M.tolist()
-
-            elif cipher == "perm":
-                key_nums = list(map(int, request.form["perm_key"].split()))
-                result = process_permutation(data, key_nums, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_perm = " ".join(map(str, key_nums))
-
-            elif cipher == "playfair":
-                key = request.form["playfair_key"]
-                result = process_playfair(data, key, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_playfair = key
-
-            elif cipher == "otp":
-                if is_binary:
-                    if "otp_key_file" in request.files:
-                        f = request.files["otp_key_file"]
-                        key = f.read()  
-                    else:
-                        raise ValueError("OTP key file required for binary mode")
-                else:
-                    if "otp_key_file" in request.files:
-                        f = request.files["otp_key_file"]
-                        key = f.read().decode("utf-8")
-                    else:
-                        raise ValueError("OTP key file required")
-                result = process_otp(data, key, enc=(action=="Encrypt"), is_binary=is_binary)
-                prev_key_otp = key if not is_binary else None
+PROCESSORS = {
+    "shift": process_shift,
+    "vig": process_vigenere,
+    "sub": process_substitution,
+    "affine": process_affine,
+    "hill": process_hill,
+    "perm": process_permutation,
+    "playfair": process_playfair,
+    "otp": process_otp,
+    "pipe": process_pipeline,
+}
 
-            else:
-                raise ValueError("Unknown cipher")
+def run_cipher(cipher, args, data, enc=True, is_binary=False):
+    """Jalankan cipher lewat process_*; binary besar otomatis memakai mode parallel"""
+    count_bytes("cipher", len(data))
+    with stage("cipher"):
+        if is_binary and cipher in STREAM_CIPHERS:
+            return parallel_binary(data, cipher, args, enc)
+        return PROCESSORS[cipher](data, *args, enc=enc, is_binary=is_binary)
 
-            if is_binary:
-                if action == "Encrypt":
-                    # Create cipher file with metadata
-                    cipher_file_data = create_cipher_file(original_filename, result)
-                    download_filename = original_filename + ".dat"
-                    
-                    # Store binary data for download
-                    output = {
-                        'type': 'binary',
-                        'message': f"File '{original_filename}' berhasil dienkripsi!",
-                        'filename': download_filename,
-                        'data': base64.b64encode(cipher_file_data).decode('utf-8')
-                    }
-                else:  # Decrypt
-                    # Extract original filename and data from encrypted file
-                    original_filename, result = extract_from_cipher_file(data)
-                    download_filename = "DECRYPTED_" + original_filename
-                    
-                    output = {
-                        'type': 'binary',
-                        'message': f"File berhasil didekripsi menjadi '{original_filename}'!",
-                        'filename': download_filename,
-                        'data': base64.b64encode(result).decode('utf-8')
-                    }
-                
-            else:
-                # Text output
-                output = {
+def inplace_enabled(cipher, size) -> bool:
+    """File non-streaming diproses in-place, kecuali kalau mode parallel yang dipakai"""
+    return cipher in STREAM_CIPHERS and not (parallel_enabled() and size >= PARALLEL_THRESHOLD)
+
+def run_cipher_into(cipher, args, data, enc=True, out=None):
+    """run_cipher versi in-place (lihat cipher_into). Returns: buffer hasil (out atau data)"""
+    count_bytes("cipher", len(data))
+    with stage("cipher"):
+        cipher_into(data, cipher, args, enc, out)
+    return data if out is None else out
+
+# ===== Streaming Mode (file besar) =====
+STREAM_CHUNK = 1024 * 1024
+STREAM_CIPHERS = {"shift", "vig", "sub", "affine", "hill", "perm", "otp", "pipe"}
+# Bisa di-stream tapi hasilnya tidak sejajar per posisi byte (tanpa parallel/range)
+SEQUENTIAL_CIPHERS = {"playfair"}
+
+def streams(cipher, size) -> bool:
+    """File sebesar size diproses per chunk (bukan dibaca ke memory sekaligus)?"""
+    streamable = cipher in STREAM_CIPHERS or cipher in SEQUENTIAL_CIPHERS
+    return streamable and size >= app.config["STREAM_THRESHOLD"]
+
+def remaining_size(f) -> int:
+    """Jumlah byte yang tersisa di stream dari posisi sekarang"""
+    pos = f.tell()
+    end = f.seek(0, 2)
+    f.seek(pos)
+    return end - pos
+
+def read_into(f, view):
+    """Isi memoryview view dari stream f (readinto sampai penuh)"""
+    with stage("read"):
+        pos = 0
+        while pos < len(view):
+            n = f.readinto(view[pos:])
+            if not n:
+                raise ValueError("Unexpected end of file")
+            pos += n
+    count_bytes("read", len(view))
+
+def iter_chunks(f, size=STREAM_CHUNK):
+    while True:
+        with stage("read"):
+            chunk = f.read(size)
+        if not chunk:
+            break
+        count_bytes("read", len(chunk))
+        yield chunk
+
+def apply_binary(data, cipher, args, enc=True, pos=0):
+    """
+    Jalankan cipher binary pada potongan data yang berada di posisi pos dalam
+    file. Untuk OTP, args[0] adalah potongan key yang sejajar dengan data.
+    Potongan harus dimulai di batas blok (hill/permutation).
+    """
+    if cipher == "shift":
+        return shift_binary(data, *args, enc)
+    elif cipher == "vig":
+        return vigenere_binary(data, *args, enc, offset=pos)
+    elif cipher == "sub":
+        return substitution_binary(data, *args, enc)
+    elif cipher == "affine":
+        return affine_binary(data, *args, enc)
+    elif cipher == "hill":
+        return hill_binary(data, *args, enc)
+    elif cipher == "perm":
+        return permutation_binary(data, *args, enc)
+    elif cipher == "otp":
+        return otp_binary(data, *args, enc)
+    elif cipher == "pipe":
+        return pipeline_binary(data, *args, enc, pos=pos)
+    raise ValueError("Cipher does not support streaming")
+
+def block_size(cipher, args) -> int:
+    """Ukuran blok cipher: potongan data harus kelipatan ini (kecuali yang terakhir)"""
+    if cipher == "pipe":
+        return compiled_pipeline(args[0]).block
+    return len(args[0]) if cipher in ("hill", "perm") else 1
+
+def stream_binary(chunks, cipher, args, enc=True, parallel=False):
+    """
+    Terapkan cipher binary ke aliran chunk. Posisi key (vigenere/otp) dan sisa
+    blok (permutation/hill) dibawa antar chunk, sehingga gabungan hasilnya sama
+    persis dengan memanggil *_binary pada seluruh data.
+    Key divalidasi di awal, sebelum ada output yang dikirim.
+    parallel=True memproses setiap chunk dengan parallel_binary (multi-core).
+    """
+    if cipher == "otp":
+        key = args[0]
+        if hasattr(key, "read"):
+            # Key file juga dibaca per chunk, sejalan dengan data
+            chunk_args = lambda d, pos: (key.read(len(d)),)
+        else:
+            chunk_args = lambda d, pos: (key[pos:pos+len(d)],)
+    else:
+        chunk_args = lambda d, pos: args
+    run = parallel_binary if parallel else apply_binary
+    
+    apply_binary(b'', cipher, chunk_args(b'', 0), enc)
+    block = block_size(cipher, args)
+    
+    def generate():
+        pos = 0
+        carry = b''
+        for chunk in chunks:
+            if carry:
+                chunk = carry + chunk
+            full = len(chunk) - len(chunk) % block
+            carry = chunk[full:]
+            if full:
+                data = chunk[:full]
+                with stage("cipher"):
+                    out = run(data, cipher, chunk_args(data, pos), enc, pos)
+                count_bytes("cipher", full)
+                yield out
+                pos += full
+        if carry:
+            # Blok terakhir yang tidak penuh: permutation di-pad, hill dilewatkan
+            with stage("cipher"):
+                out = run(carry, cipher, chunk_args(carry, pos), enc, pos)
+            count_bytes("cipher", len(carry))
+            yield out
+    return generate()
+
+def playfair_digraphs(cells, pk, final=True, filler=PLAYFAIR_B64_FILLER):
+    """
+    Enkripsi digraph untuk simbol (index sel) grid Playfair: base64 5x13, atau
+    5x5 untuk text dengan filler 'X'. Simbol kembar dalam satu pasangan diberi
+    filler. Kalau bukan bagian terakhir (final=False), simbol terakhir yang
+    belum punya pasangan dikembalikan sebagai carry.
+    Returns: (bytes hasil, carry)
+    """
+    if len(cells) == 0:
+        return b'', cells
+    first, second, pad = playfair_pairs(cells)
+    carry = cells[:0]
+    if pad[-1] and not final:
+        # Pasangan terakhir hanya bisa di-pad kalau simbolnya sendirian di ujung
+        carry = first[-1:]
+        first, second, pad = first[:-1], second[:-1], pad[:-1]
+    second = np.where(pad, pk.cells[ord(filler)], second)
+    pairs = first.astype(np.intp) * len(pk.pos) + second
+    return pk.digraphs[pairs].tobytes(), carry
+
+def stream_playfair(chunks, key, enc=True):
+    """
+    Playfair binary per chunk dengan memory konstan. Enkripsi: base64 per
+    kelipatan 3 byte, simbol tanpa pasangan dan sisa byte dibawa ke chunk
+    berikutnya, sehingga penyisipan filler sama persis dengan memproses
+    seluruh file sekaligus. Dekripsi: digraph dibalik, filler dibuang, lalu
+    base64 di-decode per kelipatan 4 simbol.
+    """
+    pk = compiled_playfair_binary(key, enc)
+    width = len(PLAYFAIR_B64_SYMBOLS)
+    
+    def encrypt():
+        pending = b''
+        carry = np.empty(0, dtype=np.uint8)
+        for chunk in chunks:
+            data = pending + bytes(chunk) if pending else chunk
+            full = len(data) - len(data) % 3
+            pending = bytes(data[full:])
+            if not full:
+                continue
+            with stage("cipher"):
+                cells = pk.cells[as_u8(base64.b64encode(data[:full]))]
+                out, carry = playfair_digraphs(np.concatenate([carry, cells]), pk, final=False)
+            count_bytes("cipher", full)
+            yield out
+        with stage("cipher"):
+            cells = pk.cells[as_u8(base64.b64encode(pending).rstrip(b"="))]
+            out, _ = playfair_digraphs(np.concatenate([carry, cells]), pk)
+        count_bytes("cipher", len(pending))
+        if out:
+            yield out
+    
+    def decrypt():
+        odd = b''
+        pending = b''
+        for chunk in chunks:
+            data = odd + bytes(chunk) if odd else bytes(chunk)
+            even = len(data) - len(data) % 2
+            odd = data[even:]
+            with stage("cipher"):
+                cells = pk.cells[as_u8(data[:even])]
+                if (cells == 255).any():
+                    raise ValueError("Playfair binary decryption failed: invalid ciphertext")
+                pairs = cells[0::2].astype(np.intp) * width + cells[1::2]
+                text = pending + pk.digraphs[pairs].tobytes().translate(None, PLAYFAIR_B64_FILLER.encode())
+                full = len(text) - len(text) % 4
+                pending = text[full:]
+                out = base64.b64decode(text[:full])
+            count_bytes("cipher", even)
+            yield out
+        if odd or len(pending) % 4 == 1:
+            raise ValueError("Playfair binary decryption failed: truncated ciphertext")
+        if pending:
+            yield base64.b64decode(pending + b"=" * (-len(pending) % 4))
+    
+    return encrypt() if enc else decrypt()
+
+def frame_size_for(cipher, args) -> int:
+    """Ukuran frame file cipher v2: kelipatan ukuran blok, supaya setiap frame bisa didekripsi sendiri"""
+    block = block_size(cipher, args)
+    return FRAME_SIZE - FRAME_SIZE % block
+
+def cipher_output_size(cipher, args, size) -> int:
+    """Ukuran hasil cipher di STREAM_CIPHERS (permutation dan pipeline mem-pad blok terakhir)"""
+    if cipher == "perm":
+        return size + (-size % len(args[0]))
+    if cipher == "pipe":
+        return size + (-size % compiled_pipeline(args[0]).pad)
+    return size
+
+def write_cipher_file(original_filename, cipher, args, size, cipher_size, chunks, params=None):
+    """Header file cipher v2 diikuti chunk hasil enkripsi dalam bentuk frame"""
+    frame_size = frame_size_for(cipher, args)
+    params = dict(params or {})
+    if cipher in ("hill", "perm"):
+        params["block"] = len(args[0])
+    elif cipher == "pipe":
+        # Urutan stage (tanpa key), dicek saat dekripsi
+        params["pipeline"] = pipeline_names(args[0])
+        params["block"] = compiled_pipeline(args[0]).block
+    header = container_header(original_filename, cipher, size, cipher_size, frame_size, params)
+    return itertools.chain([header], write_frames(chunks, frame_size))
+
+def open_cipher_file(f, cipher, args=None) -> CipherHeader:
+    """
+    Baca header file cipher untuk didekripsi dengan cipher ini. File v2 yang
+    lebih pendek dari seharusnya langsung ditolak sebelum ada yang diproses.
+    """
+    header = read_cipher_header(f)
+    if header.cipher and header.cipher != cipher:
+        raise ValueError(f"File was encrypted with the '{header.cipher}' cipher")
+    recorded = header.params.get("pipeline")
+    if cipher == "pipe" and args and recorded and recorded != pipeline_names(args[0]):
+        raise ValueError(f"File was encrypted with the pipeline {' > '.join(recorded)}")
+    check_container_size(f, header)
+    return header
+
+def group_chunks(chunks, size):
+    """Gabungkan chunk kecil (frame) menjadi potongan sekitar size byte"""
+    parts, total = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        total += len(chunk)
+        if total >= size:
+            yield b''.join(parts)
+            parts, total = [], 0
+    if parts:
+        yield b''.join(parts)
+
+def limit_chunks(chunks, limit):
+    """Potong aliran chunk setelah limit byte (buang padding blok terakhir)"""
+    for chunk in chunks:
+        if limit <= 0:
+            break
+        if len(chunk) > limit:
+            chunk = chunk[:limit]
+        limit -= len(chunk)
+        yield chunk
+
+def stream_cipher_file(f, original_filename, cipher, args, enc=True, params=None):
+    """
+    Proses upload file per chunk. Enkripsi menghasilkan file cipher v2
+    (header + frame); dekripsi membaca header dan frame langsung dari stream,
+    format lama juga masih bisa dibaca.
+    Returns: (original_filename, iterator chunk hasil)
+    """
+    parallel = parallel_enabled() and cipher in STREAM_CIPHERS
+    window = PARALLEL_WINDOW if parallel else STREAM_CHUNK
+    if enc:
+        size = remaining_size(f)
+        source = iter_chunks(f, window)
+    else:
+        header = open_cipher_file(f, cipher, args)
+        original_filename = header.filename
+        if header.version == 1:
+            size = remaining_size(f)
+            source = iter_chunks(f, window)
+        else:
+            size = header.cipher_size
+            source = read_frames(f, header)
+            if parallel:
+                source = group_chunks(source, window)
+    
+    if cipher == "otp":
+        key = args[0]
+        key_size = remaining_size(key) if hasattr(key, "read") else len(key)
+        if key_size < size:
+            raise ValueError("OTP key too short for binary data")
+    
+    if cipher == "playfair":
+        chunks = stream_playfair(source, *args, enc)
+        # Jumlah filler baru diketahui setelah selesai
+        cipher_size = CIPHER_SIZE_UNKNOWN
+    else:
+        chunks = stream_binary(source, cipher, args, enc, parallel=parallel)
+        cipher_size = cipher_output_size(cipher, args, size)
+    if enc:
+        chunks = write_cipher_file(original_filename, cipher, args, size, cipher_size, chunks, params)
+    elif header.version >= 2:
+        chunks = limit_chunks(chunks, header.size)
+    return original_filename, chunks
+
+def decrypt_range(f, cipher, args, start, end) -> bytes:
+    """
+    Dekripsi byte start..end-1 (posisi di data asli) dari file cipher v2,
+    hanya membaca frame yang mencakup range itu. Stream harus bisa di-seek.
+    """
+    if cipher not in STREAM_CIPHERS:
+        raise ValueError("Cipher does not support range decryption")
+    header = open_cipher_file(f, cipher, args)
+    if header.version < 2:
+        raise ValueError("Range decryption needs a v2 cipher file")
+    end = min(end, header.size)
+    if start >= end:
+        return b''
+    
+    frame_size = header.frame_size
+    first, last = start // frame_size, (end - 1) // frame_size
+    f.seek(first * (FRAME_HEAD.size + frame_size), 1)
+    frames = read_frames(f, header)
+    parts = []
+    for i in range(first, last + 1):
+        payload = next(frames, None)
+        if payload is None:
+            raise ValueError("Cipher file is truncated")
+        pos = i * frame_size
+        part_args = (args[0][pos:pos+len(payload)],) if cipher == "otp" else args
+        parts.append(apply_binary(payload, cipher, part_args, False, pos))
+    data = b''.join(parts)
+    return data[start - first * frame_size:end - first * frame_size]
+
+# ===== Text File Mode (streaming) =====
+# Upload .txt bisa diproses dengan cipher huruf (mode text) per chunk: file
+# di-decode UTF-8 secara incremental, setiap cipher menjadi transform
+# chunk -> chunk yang membawa state-nya ke chunk berikutnya (posisi key
+# vigenere/OTP, sisa blok hill/permutation, huruf playfair yang belum punya
+# pasangan), lalu format output diterapkan sambil jalan. Hasilnya sama dengan
+# memproses seluruh text sekaligus, dengan memory konstan.
+TEXT_CHUNK = STREAM_CHUNK
+
+def decode_chunks(f, size=TEXT_CHUNK):
+    """Isi file sebagai chunk str (UTF-8, BOM dibuang); karakter multi-byte tidak terpotong"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for chunk in iter_chunks(f, size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValueError("Text file must be UTF-8 encoded") from None
+    if text:
+        yield text
+
+def count_letters(f) -> int:
+    """Jumlah huruf A-Z di file text (untuk ukuran potongan pad OTP); posisi stream dikembalikan"""
+    pos = f.tell()
+    n = sum(len(letters_only(chunk)) for chunk in decode_chunks(f))
+    f.seek(pos)
+    return n
+
+def charwise(fn):
+    """Transform untuk cipher per karakter (tanpa state): setiap chunk diproses sendiri"""
+    def stream(chunks, *args, enc=True):
+        for chunk in chunks:
+            yield fn(chunk, *args, enc)
+    return stream
+
+def stream_vigenere_text(chunks, key, enc=True):
+    """Vigenere text per chunk; posisi key dibawa sesuai jumlah huruf yang sudah diproses"""
+    if not key.isalpha():
+        raise ValueError("Key must be letters")
+    pos = 0
+    for chunk in chunks:
+        out = vigenere_text(chunk, key[pos:] + key[:pos], enc)
+        pos = (pos + len(letters_only(out))) % len(key)
+        yield out
+
+def stream_otp_text(chunks, key, enc=True):
+    """OTP text per chunk; setiap chunk memakai potongan key berikutnya sepanjang jumlah hurufnya"""
+    key = letters_only(key) if isinstance(key, str) else key
+    pos = 0
+    for chunk in chunks:
+        n = len(letters_only(chunk))
+        if pos + n > len(key):
+            raise ValueError("OTP key too short")
+        yield otp(chunk, key[pos:pos + n], enc)
+        pos += n
+
+def stream_blocks_text(chunks, n, letters, fn):
+    """
+    Cipher blok n huruf: letters(chunk) mengambil huruf yang dipakai cipher,
+    fn memproses kelipatan n huruf; sisa huruf dibawa ke chunk berikutnya dan
+    blok terakhir di-pad oleh fn sendiri.
+    """
+    carry = ""
+    for chunk in chunks:
+        buf = carry + letters(chunk)
+        full = len(buf) - len(buf) % n
+        carry = buf[full:]
+        if full:
+            yield fn(buf[:full])
+    if carry:
+        yield fn(carry)
+
+def stream_hill_text(chunks, M, enc=True):
+    compiled_hill(hashable_matrix(M), 26, enc)   # validasi key sebelum chunk pertama
+    return stream_blocks_text(chunks, len(M), lambda c: letters_only(c).decode('ascii'),
+                              lambda t: hill(t, M, enc))
+
+def stream_permutation_text(chunks, key_nums, enc=True):
+    compiled_permutation(tuple(key_nums), enc)
+    return stream_blocks_text(chunks, len(key_nums), lambda c: ''.join([ch for ch in c.upper() if ch.isalpha()]),
+                              lambda t: permutation(t, key_nums, enc))
+
+def stream_playfair_text(chunks, key, enc=True):
+    """Playfair text per chunk; huruf terakhir yang belum punya pasangan dibawa ke chunk berikutnya"""
+    pk = compiled_playfair(key, enc)
+    carry = np.empty(0, dtype=np.uint8)
+    for chunk in chunks:
+        cells = np.concatenate([carry, pk.cells[np.frombuffer(letters_only(chunk), dtype=np.uint8)]])
+        out, carry = playfair_digraphs(cells, pk, final=False, filler="X")
+        if out:
+            yield out.decode('ascii')
+    out, _ = playfair_digraphs(carry, pk, final=True, filler="X")
+    if out:
+        yield out.decode('ascii')
+
+def stream_pipeline_text(chunks, stages, enc=True):
+    """Pipeline text: transform setiap stage dirangkai (dekripsi dari stage terakhir), padding seperti pipeline_text"""
+    if enc and pipeline_text_block(stages) > 1:
+        chunks = padded_letters(chunks, pipeline_text_block(stages))
+    for cipher, args in (stages if enc else reversed(stages)):
+        chunks = TEXT_STREAMS[cipher](chunks, *args, enc=enc)
+    return chunks
+
+TEXT_STREAMS = {
+    "shift": charwise(shift_text),
+    "vig": stream_vigenere_text,
+    "sub": charwise(substitution),
+    "affine": charwise(affine),
+    "hill": stream_hill_text,
+    "perm": stream_permutation_text,
+    "playfair": stream_playfair_text,
+    "otp": stream_otp_text,
+    "pipe": stream_pipeline_text,
+}
+
+def staged(chunks, name):
+    """Catat waktu menghasilkan setiap chunk sebagai tahap name"""
+    chunks = iter(chunks)
+    while True:
+        with stage(name):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+def text_result_filename(original_filename, enc=True) -> str:
+    return ("ENCRYPTED_" if enc else "DECRYPTED_") + original_filename
+
+def process_text_file(f, original_filename, cipher, args, enc=True, fmt="normal"):
+    """
+    Enkripsi/dekripsi file text (stream f) dengan cipher huruf, per chunk.
+    Returns: (nama file hasil, iterator chunk hasil UTF-8)
+    """
+    if cipher not in TEXT_STREAMS:
+        raise ValueError("Unknown cipher")
+    chunks = staged(TEXT_STREAMS[cipher](decode_chunks(f), *args, enc=enc), "cipher")
+    formatted = staged(format_stream(chunks, fmt), "format")
+    return text_result_filename(original_filename, enc), (chunk.encode('utf-8') for chunk in formatted)
+
+# ===== Parallel Mode (multi-core) =====
+# Cipher di STREAM_CIPHERS hanya bergantung pada posisi byte, jadi data besar
+# bisa dipotong per batas blok dan diproses di beberapa proses sekaligus.
+# Input, key OTP dan output dibagi lewat shared memory, bukan di-pickle.
+PARALLEL_WORKERS = os.cpu_count() or 1
+PARALLEL_THRESHOLD = 32 * 1024 * 1024   # data lebih kecil dari ini diproses langsung
+PARALLEL_WINDOW = 256 * 1024 * 1024     # ukuran chunk streaming saat mode parallel
+_pool = None
+_pool_lock = threading.Lock()
+
+def parallel_enabled() -> bool:
+    return PARALLEL_WORKERS > 1
+
+def get_pool():
+    """ProcessPoolExecutor bersama untuk mode parallel (dibuat saat pertama dipakai)"""
+    global _pool
+    from concurrent.futures import ProcessPoolExecutor
+    with _pool_lock:
+        if _pool is None:
+            # spawn: aman dipakai dari server yang multi-thread
+            _pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _parallel_part(in_name, out_name, key_name, start, end, cipher, args, enc, pos):
+    """Worker: proses data[start:end] dari shared memory, tulis hasilnya di posisi yang sama"""
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    shm_key = shared_memory.SharedMemory(name=key_name) if key_name else None
+    try:
+        # Hasil ditulis langsung ke shared memory output, tanpa bytes sementara
+        with shm_in.buf[start:end] as data, shm_out.buf[start:] as out:
+            if shm_key is not None:
+                with shm_key.buf[start:end] as key:
+                    cipher_into(data, cipher, (key,), enc, out, pos)
+            else:
+                cipher_into(data, cipher, args, enc, out, pos)
+    finally:
+        for shm in (shm_in, shm_out, shm_key):
+            if shm is not None:
+                shm.close()
+
+def to_shared(data) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    shm.buf[:len(data)] = data
+    return shm
+
+def parallel_binary(data, cipher, args, enc=True, pos=0) -> bytes:
+    """
+    Versi multi-core dari apply_binary: data dipotong menjadi satu bagian per
+    worker (kelipatan ukuran blok) dan diproses di process pool.
+    Data di bawah PARALLEL_THRESHOLD langsung diproses di proses ini.
+    """
+    n = len(data)
+    if not parallel_enabled() or n < PARALLEL_THRESHOLD or cipher not in STREAM_CIPHERS:
+        return apply_binary(data, cipher, args, enc, pos)
+    
+    if cipher == "otp" and len(args[0]) < n:
+        raise ValueError("OTP key too short for binary data")
+    block = block_size(cipher, args)
+    part = -(-n // PARALLEL_WORKERS)
+    part += -part % block
+    # Permutation mem-pad blok terakhir, jadi output bisa sedikit lebih panjang
+    out_size = cipher_output_size(cipher, args, n)
+    
+    shm_in = to_shared(data)
+    shm_key = to_shared(memoryview(args[0])[:n]) if cipher == "otp" else None
+    shm_out = shared_memory.SharedMemory(create=True, size=max(out_size, 1))
+    try:
+        key_name = shm_key.name if shm_key else None
+        part_args = () if cipher == "otp" else args
+        futures = [
+            get_pool().submit(_parallel_part, shm_in.name, shm_out.name, key_name,
+                              start, min(start + part, n), cipher, part_args, enc, pos + start)
+            for start in range(0, n, part)
+        ]
+        for fut in futures:
+            fut.result()
+        return bytes(shm_out.buf[:out_size])
+    finally:
+        for shm in (shm_in, shm_key, shm_out):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+# ===== Result Store =====
+class ResultStore:
+    """
+    Penyimpanan hasil binary di server, diakses lewat token pendek.
+    Hasil kecil disimpan di memory, hasil yang lebih besar dari spill_size
+    ditulis ke disk. Entry dibuang setelah ttl detik, atau yang paling lama
+    tidak dipakai (LRU) kalau batas memory/disk terlampaui.
+    """
+    def __init__(self, max_memory, max_disk, ttl, spill_size, directory=None):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.ttl = ttl
+        self.spill_size = spill_size
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = 0
+        self._lock = threading.Lock()
+    
+    def put(self, chunks, filename) -> str:
+        """Simpan hasil (iterable of bytes) dan return token untuk download"""
+        with stage("store"):
+            parts, size, path = [], 0, None
+            out = None
+            try:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if out is None and size > self.spill_size:
+                        out, path = self._open_spill_file()
+                        out.writelines(parts)
+                        parts = []
+                    if out is None:
+                        parts.append(chunk)
+                    else:
+                        out.write(chunk)
+            except Exception:
+                if out is not None:
+                    out.close()
+                    os.remove(path)
+                raise
+            if out is not None:
+                out.close()
+        
+            entry = {
+                'filename': filename,
+                'data': None if path else b''.join(parts),
+                'path': path,
+                'size': size,
+                'expires': time.monotonic() + self.ttl,
+            }
+        count_bytes("store", size)
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._entries[token] = entry
+            if path:
+                self._disk_used += size
+            else:
+                self._memory_used += size
+            self._evict()
+        return token
+    
+    def get(self, token):
+        """Return entry (dict) untuk token, atau None kalau tidak ada/expired"""
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._entries.move_to_end(token)
+            return entry
+    
+    def _open_spill_file(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="cipher-results-")
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".bin")
+        return os.fdopen(fd, "wb"), path
+    
+    def _evict(self):
+        now = time.monotonic()
+        for token in [t for t, e in self._entries.items() if e['expires'] <= now]:
+            self._drop(token)
+        # OrderedDict urut dari yang paling lama tidak dipakai
+        while self._memory_used > self.max_memory:
+            self._drop(next(t for t, e in self._entries.items() if e['path'] is None))
+        while self._disk_used > self.max_disk:
+            self._drop(next(t for t, e in self._entries.items() if e['path']))
+    
+    def _drop(self, token):
+        entry = self._entries.pop(token)
+        if entry['path']:
+            self._disk_used -= entry['size']
+            try:
+                os.remove(entry['path'])
+            except OSError:
+                pass
+        else:
+            self._memory_used -= entry['size']
+
+RESULTS = ResultStore(
+    max_memory=256 * 1024 * 1024,
+    max_disk=4 * 1024 * 1024 * 1024,
+    ttl=30 * 60,
+    spill_size=16 * 1024 * 1024,
+)
+
+# ===== Result Cache =====
+# Request yang sama (file dan key yang sama: retry, download ulang, CI) tidak
+# diproses ulang. Hasil disimpan dengan key BLAKE2b dari isi input ditambah
+# cipher, key yang sudah dinormalisasi, arah dan mode, jadi key yang setara
+# (mis. shift 29 dan 3 di mode text) memakai entry yang sama. OTP tidak
+# pernah di-cache: enkripsi dengan pad selalu memakai bagian pad yang baru.
+CACHE_CIPHERS = {"shift", "vig", "sub", "affine", "hill", "perm", "playfair", "pipe"}
+
+class ResultCache:
+    """
+    Cache hasil content-addressed dengan dua tier: hasil sampai spill_size di
+    memory, yang lebih besar di disk. Total ukuran setiap tier dibatasi dan
+    entry yang paling lama tidak dipakai (LRU) dibuang lebih dulu. Hasil yang
+    lebih besar dari max_item tidak disimpan.
+    """
+    def __init__(self, max_memory, max_disk, max_item, spill_size, directory=None):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.max_item = max_item
+        self.spill_size = spill_size
+        self.directory = directory
+        self.hits = self.misses = 0
+        self.bytes_saved = 0
+        self._entries = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns: (filename, chunks hasil) atau None. File tier disk dibuka di
+        sini, jadi tetap bisa dibaca walaupun entry-nya dibuang setelahnya.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += entry['size']
+            chunks = [entry['data']] if entry['path'] is None else read_file_chunks(open(entry['path'], "rb"))
+        count_bytes("cache_hit", entry['size'])
+        return entry['filename'], chunks
+
+    def tee(self, key, chunks, filename=None):
+        """Teruskan chunks sambil menyimpan salinannya; masuk cache hanya kalau chunks habis tanpa error"""
+        parts, size, path, out = [], 0, None, None
+        complete = False
+        try:
+            for chunk in chunks:
+                if size is not None:
+                    size += len(chunk)
+                    if size > self.max_item:
+                        # Terlalu besar untuk di-cache: berhenti menyalin, hasil tetap diteruskan
+                        if out is not None:
+                            out.close()
+                            os.remove(path)
+                        parts, size, path, out = [], None, None, None
+                    elif out is None and size > self.spill_size:
+                        out, path = self._open_spill_file()
+                        out.writelines(parts)
+                        out.write(chunk)
+                        parts = []
+                    elif out is None:
+                        parts.append(bytes(chunk))
+                    else:
+                        out.write(chunk)
+                yield chunk
+            complete = size is not None
+        finally:
+            if out is not None:
+                out.close()
+            if complete:
+                self._add(key, {
+                    'filename': filename,
+                    'data': None if path else b''.join(parts),
+                    'path': path,
+                    'size': size,
+                })
+            elif path:
+                os.remove(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self._entries),
+                'memory_used': self._memory_used,
+                'disk_used': self._disk_used,
+            }
+
+    def render(self) -> str:
+        """Counter cache dalam format text exposition Prometheus"""
+        stats = self.stats()
+        lines = []
+        for metric, kind, name, help_text in (
+                ("cipher_result_cache_hits_total", "counter", "hits", "Lookups that found a cached result"),
+                ("cipher_result_cache_misses_total", "counter", "misses", "Lookups that had to run the cipher"),
+                ("cipher_result_cache_saved_bytes_total", "counter", "bytes_saved", "Result bytes served from the cache"),
+                ("cipher_result_cache_memory_bytes", "gauge", "memory_used", "Bytes held in the memory tier"),
+                ("cipher_result_cache_disk_bytes", "gauge", "disk_used", "Bytes held in the disk tier")):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", f"{metric} {stats[name]}"]
+        return "\n".join(lines) + "\n"
+
+    def _add(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                # Request lain dengan input yang sama sudah selesai lebih dulu
+                if entry['path']:
+                    os.remove(entry['path'])
+                return
+            self._entries[key] = entry
+            if entry['path']:
+                self._disk_used += entry['size']
+            else:
+                self._memory_used += entry['size']
+            while self._memory_used > self.max_memory:
+                self._drop(next(k for k, e in self._entries.items() if e['path'] is None))
+            while self._disk_used > self.max_disk:
+                self._drop(next(k for k, e in self._entries.items() if e['path']))
+
+    def _open_spill_file(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="cipher-cache-")
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".bin")
+        return os.fdopen(fd, "wb"), path
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        if entry['path']:
+            self._disk_used -= entry['size']
+            try:
+                os.remove(entry['path'])
+            except OSError:
+                pass
+        else:
+            self._memory_used -= entry['size']
+
+RESULT_CACHE = ResultCache(
+    max_memory=128 * 1024 * 1024,
+    max_disk=2 * 1024 * 1024 * 1024,
+    max_item=64 * 1024 * 1024,
+    spill_size=16 * 1024 * 1024,
+)
+
+def read_file_chunks(file, size=STREAM_CHUNK):
+    """Isi file (sudah dibuka) per chunk, file ditutup setelah selesai"""
+    with file:
+        while True:
+            chunk = file.read(size)
+            if not chunk:
+                break
+            yield chunk
+
+def stream_digest(f) -> bytes:
+    """BLAKE2b isi stream dari posisi sekarang; posisi stream dikembalikan"""
+    pos = f.tell()
+    h = hashlib.blake2b(digest_size=32)
+    buf = bytearray(STREAM_CHUNK)
+    view = memoryview(buf)
+    with stage("digest"):
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    f.seek(pos)
+    return h.digest()
+
+def normalized_key(cipher, args, is_binary):
+    """Bentuk kanonik key: key yang menghasilkan cipher sama punya bentuk yang sama"""
+    m = 256 if is_binary else 26
+    if cipher == "shift":
+        return args[0] % m
+    elif cipher in ("vig", "sub"):
+        return args[0].upper()
+    elif cipher == "affine":
+        return [args[0] % m, args[1] % m]
+    elif cipher == "hill":
+        return [[x % m for x in row] for row in hashable_matrix(args[0])]
+    elif cipher == "perm":
+        return list(args[0])
+    elif cipher == "playfair":
+        table = (compiled_playfair_binary if is_binary else compiled_playfair)(args[0]).table
+        return ''.join(itertools.chain.from_iterable(table))
+    elif cipher == "pipe":
+        return [[c, normalized_key(c, a, is_binary)] for c, a in args[0]]
+    raise ValueError(f"Results of '{cipher}' cannot be cached")
+
+def cache_key(digest, cipher, args, enc, is_binary, *extra) -> str:
+    """Key RESULT_CACHE: digest input + cipher, key (dinormalisasi), arah, mode dan info tambahan"""
+    settings = json.dumps([cipher, normalized_key(cipher, args, is_binary), enc, is_binary, *extra])
+    return hashlib.blake2b(digest + settings.encode('utf-8'), digest_size=32).hexdigest()
+
+def cached_cipher_file(f, original_filename, cipher, args, enc=True, params=None, fmt=None):
+    """
+    process_cipher_file (atau process_text_file kalau fmt diisi) lewat
+    RESULT_CACHE: hit langsung mengembalikan file hasil (sudah termasuk
+    header), tanpa cipher maupun write_cipher_file.
+    Returns: (nama file, iterable chunk hasil)
+    """
+    if fmt is None:
+        process = lambda: process_cipher_file(f, original_filename, cipher, args, enc, params)
+    else:
+        process = lambda: process_text_file(f, original_filename, cipher, args, enc, fmt)
+    if cipher not in CACHE_CIPHERS or remaining_size(f) > RESULT_CACHE.max_item:
+        return process()
+    # Nama file hanya ada di header hasil enkripsi biner; saat dekripsi nama diambil dari input
+    key = cache_key(stream_digest(f), cipher, args, enc, fmt is None, "file",
+                    original_filename if enc or fmt is not None else None, params, fmt)
+    hit = RESULT_CACHE.get(key)
+    if hit is not None:
+        return hit
+    filename, chunks = process()
+    return filename, RESULT_CACHE.tee(key, chunks, filename)
+
+def cached_run_cipher(cipher, args, data, enc=True, is_binary=False):
+    """run_cipher lewat RESULT_CACHE (hasil text disimpan sebagai UTF-8)"""
+    if cipher not in CACHE_CIPHERS or len(data) > RESULT_CACHE.max_item:
+        return run_cipher(cipher, args, data, enc, is_binary)
+    with stage("digest"):
+        digest = hashlib.blake2b(data if is_binary else data.encode('utf-8'), digest_size=32).digest()
+    key = cache_key(digest, cipher, args, enc, is_binary, "raw")
+    hit = RESULT_CACHE.get(key)
+    if hit is not None:
+        result = b''.join(hit[1])
+        return result if is_binary else result.decode('utf-8')
+    result = run_cipher(cipher, args, data, enc, is_binary)
+    stored = result if is_binary else result.encode('utf-8')
+    for _ in RESULT_CACHE.tee(key, [stored]):
+        pass
+    return result
+
+# ===== OTP Pad Store =====
+class PadStore:
+    """
+    Pad OTP yang disimpan di server: satu file per pad di directory, nama file
+    adalah pad ID. Pad dibuka dengan mmap, jadi key tidak perlu di-upload dan
+    tidak pernah dibaca utuh ke memory; setiap operasi mendapat memoryview
+    (tanpa copy) dari bagian pad yang dipakai.
+    Enkripsi selalu memakai bagian pad berikutnya yang belum terpakai. Offset
+    yang sudah terpakai disimpan di file state, sehingga bagian pad tidak
+    pernah dipakai dua kali, juga setelah restart atau dari proses lain.
+    Dekripsi membaca pad di offset yang dicatat saat enkripsi.
+    """
+    STATE_FILE = ".offsets.json"
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self._maps = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, pad_id):
+        # secure_filename juga menolak nama yang diawali '.', termasuk file state
+        if not pad_id or secure_filename(pad_id) != pad_id:
+            raise ValueError("Invalid pad ID")
+        return os.path.join(self.directory, pad_id)
+    
+    def _map(self, pad_id) -> mmap.mmap:
+        m = self._maps.get(pad_id)
+        if m is None:
+            path = self._path(pad_id)
+            if not os.path.isfile(path):
+                raise ValueError(f"Unknown OTP pad '{pad_id}'")
+            if os.path.getsize(path) == 0:
+                raise ValueError(f"OTP pad '{pad_id}' is empty")
+            with open(path, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[pad_id] = m
+        return m
+    
+    def _read_used(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, self.STATE_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def _write_used(self, used):
+        path = os.path.join(self.directory, self.STATE_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(used, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def _locked_state(self):
+        """Lock file untuk file state, supaya aman dipakai beberapa proses server"""
+        lock = open(os.path.join(self.directory, self.STATE_FILE + ".lock"), "a")
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+    
+    def reserve(self, pad_id, length):
+        """
+        Ambil length byte pad berikutnya untuk enkripsi.
+        Returns: (offset, memoryview pad[offset:offset+length])
+        """
+        with self._lock:
+            m = self._map(pad_id)
+            with self._locked_state():
+                used = self._read_used()
+                offset = used.get(pad_id, 0)
+                if offset + length > len(m):
+                    raise ValueError(f"OTP pad '{pad_id}' has only {len(m) - offset} unused bytes left")
+                # Dicatat sebelum dipakai: kalau enkripsi gagal, bagian ini hangus, tidak dipakai ulang
+                used[pad_id] = offset + length
+                self._write_used(used)
+        return offset, memoryview(m)[offset:offset + length]
+    
+    def view(self, pad_id, offset, length):
+        """
+        memoryview pad[offset:offset+length] untuk dekripsi. Hanya bagian pad
+        yang sudah dipakai enkripsi (sudah di-reserve) yang bisa dibaca, supaya
+        bagian pad yang belum terpakai tidak pernah keluar dari server.
+        """
+        with self._lock:
+            m = self._map(pad_id)
+            with self._locked_state():
+                used = self._read_used().get(pad_id, 0)
+        if not (0 <= offset and 0 <= length and offset + length <= used):
+            raise ValueError("OTP pad offset out of range")
+        return memoryview(m)[offset:offset + length]
+    
+    def stats(self, pad_id):
+        """Ukuran, byte terpakai dan sisa satu pad"""
+        with self._lock:
+            m = self._map(pad_id)
+            with self._locked_state():
+                used = self._read_used().get(pad_id, 0)
+        return {'size': len(m), 'used': used, 'remaining': len(m) - used}
+
+PADS = PadStore(app.config["OTP_PAD_DIR"])
+
+def otp_pad_key(pad_id, offset, size, enc=True):
+    """
+    Key OTP dari pad store. Enkripsi memakai size byte pad berikutnya,
+    dekripsi membaca size byte pad mulai dari offset yang dicatat saat enkripsi
+    (size = panjang data asli, lihat cipher_payload_size).
+    Returns: (offset, memoryview key)
+    """
+    if enc:
+        return PADS.reserve(pad_id, size)
+    if offset is None or offset == "":
+        raise ValueError("OTP pad offset required for decryption")
+    offset = int(offset)
+    return offset, PADS.view(pad_id, offset, size)
+
+def cipher_payload_size(f):
+    """
+    Baca header file cipher tanpa memindah posisi stream.
+    Returns: (header, panjang data asli tanpa header dan frame)
+    """
+    pos = f.tell()
+    try:
+        header = read_cipher_header(f)
+        return header, remaining_size(f) if header.size is None else header.size
+    finally:
+        f.seek(pos)
+
+# ===== Admission Control =====
+# Setiap request (dan job) memperkirakan memory dan waktu CPU yang dibutuhkan
+# dari ukuran input dan cipher-nya, lalu mengambil bagian dari budget global.
+# Kalau budget sedang penuh, request menunggu sebentar di antrean; kalau tetap
+# tidak muat ditolak dengan 429 + Retry-After. Request yang sendirian pun tidak
+# akan muat di budget memory langsung ditolak dengan 413.
+MB = 1024 * 1024
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("CIPHER_MAX_UPLOAD", 4 * 1024 * MB))
+
+def default_memory_budget() -> int:
+    """Setengah RAM fisik (1 GB kalau tidak bisa dibaca)"""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (ValueError, OSError, AttributeError):
+        return 1024 * MB
+
+app.config["MEMORY_BUDGET"] = int(os.environ.get("CIPHER_MEMORY_BUDGET", default_memory_budget()))
+CPU_BUDGET_PER_CORE = 30.0   # detik kerja cipher (estimasi) yang boleh antre/berjalan per core
+ADMISSION_QUEUE_TIMEOUT = 10.0
+ADMISSION_MAX_WAITING = 32
+
+# (MB/s, kelipatan ukuran input di memory) per cipher, kira-kira dari bench.py
+# (satu core). Pipeline memakai angka stage yang paling berat (hill/perm).
+CIPHER_COST = {
+    "binary": {
+        "shift": (1000, 2), "vig": (700, 2), "sub": (1000, 2), "affine": (900, 2),
+        "hill": (60, 5), "perm": (1000, 3), "playfair": (30, 7), "otp": (2000, 3),
+        "pipe": (60, 5),
+    },
+    "text": {
+        "shift": (500, 3), "vig": (75, 13), "sub": (500, 3), "affine": (500, 3),
+        "hill": (60, 7), "perm": (10, 11), "playfair": (40, 17), "otp": (170, 6),
+        "pipe": (10, 17),
+    },
+}
+
+RequestCost = namedtuple("RequestCost", "memory cpu")
+NO_COST = RequestCost(0, 0.0)
+
+def estimate_cost(cipher, size, is_binary=True, buffered=False, text_file=False) -> RequestCost:
+    """
+    Estimasi memory (byte) dan waktu CPU (detik) untuk memproses size byte.
+    cipher None = cipher paling berat. buffered: input sudah dibaca utuh ke
+    memory (body request API), jadi tidak bisa di-stream. text_file: file
+    text yang diproses per TEXT_CHUNK.
+    """
+    table = CIPHER_COST["binary" if is_binary else "text"]
+    rate, factor = table.get(cipher) or (min(r for r, _ in table.values()), max(f for _, f in table.values()))
+    if text_file:
+        memory = min(TEXT_CHUNK, size) * factor
+    elif is_binary and not buffered and streams(cipher, size):
+        # Streaming: satu window (parallel) atau beberapa chunk di memory, berapa pun ukuran file
+        window = 2 * PARALLEL_WINDOW if parallel_enabled() and cipher in STREAM_CIPHERS else 4 * STREAM_CHUNK
+        memory = min(window, size * factor)
+    else:
+        memory = size * (factor + buffered)
+    return RequestCost(memory, size / (rate * MB))
+
+class Overloaded(Exception):
+    """Request ditolak admission control: 429 (coba lagi setelah retry_after detik) atau 413"""
+    def __init__(self, message, status=429, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+    
+    def headers(self) -> dict:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+
+class Ticket:
+    """Bagian budget yang sedang dipakai satu request; release() boleh dipanggil berkali-kali"""
+    def __init__(self, admission, cost):
+        self._admission = admission
+        self.cost = cost
+    
+    def release(self):
+        if self._admission is not None:
+            self._admission.release(self.cost)
+            self._admission = None
+
+class AdmissionControl:
+    """
+    Budget global memory (byte) dan CPU (detik) untuk semua request dan job
+    yang sedang berjalan. acquire() menunggu sampai cost muat di budget,
+    paling lama timeout detik (None = tanpa batas, untuk job background).
+    """
+    def __init__(self, max_memory, max_cpu, queue_timeout, max_waiting):
+        self.max_memory = max_memory
+        self.max_cpu = max_cpu
+        self.queue_timeout = queue_timeout
+        self.max_waiting = max_waiting
+        self.memory_used = 0
+        self.cpu_used = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = self.queued = 0
+        self.rejected = defaultdict(int)
+        self._cond = threading.Condition()
+    
+    def acquire(self, cost, timeout=-1) -> Ticket:
+        """Ambil budget untuk cost; Overloaded kalau ditolak. timeout -1 = queue_timeout"""
+        if timeout == -1:
+            timeout = self.queue_timeout
+        if cost.memory > self.max_memory:
+            self._reject("too_large")
+            raise Overloaded(f"Request needs about {cost.memory // MB} MB of memory, "
+                             f"more than the server budget of {self.max_memory // MB} MB", 413)
+        # Satu request yang sangat lama boleh memakai seluruh budget CPU, tapi tidak lebih
+        cost = RequestCost(cost.memory, min(cost.cpu, self.max_cpu))
+        with self._cond:
+            if not self._fits(cost):
+                if self.waiting >= self.max_waiting:
+                    self._reject("queue_full")
+                    raise Overloaded("Server is busy, please try again later", 429, self.retry_after())
+                self.waiting += 1
+                self.queued += 1
+                try:
+                    if not self._cond.wait_for(lambda: self._fits(cost), timeout):
+                        self._reject("timeout")
+                        raise Overloaded("Server is busy, please try again later", 429, self.retry_after())
+                finally:
+                    self.waiting -= 1
+            self.memory_used += cost.memory
+            self.cpu_used += cost.cpu
+            self.in_flight += 1
+            self.admitted += 1
+        return Ticket(self, cost)
+    
+    def release(self, cost):
+        with self._cond:
+            self.memory_used -= cost.memory
+            self.cpu_used -= cost.cpu
+            self.in_flight -= 1
+            self._cond.notify_all()
+    
+    @contextmanager
+    def admit(self, cost, timeout=-1):
+        ticket = self.acquire(cost, timeout)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+    
+    def retry_after(self) -> int:
+        """Perkiraan detik sampai kerja yang sedang berjalan selesai"""
+        return max(1, math.ceil(self.cpu_used / (os.cpu_count() or 1)))
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'memory_used': self.memory_used,
+                'memory_budget': self.max_memory,
+                'cpu_used': round(self.cpu_used, 3),
+                'cpu_budget': self.max_cpu,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': dict(self.rejected),
+            }
+    
+    def render(self) -> str:
+        """Pemakaian budget dalam format text exposition Prometheus"""
+        stats = self.stats()
+        lines = []
+        for metric, kind, name, help_text in (
+                ("cipher_admission_memory_bytes", "gauge", "memory_used", "Estimated memory of admitted work"),
+                ("cipher_admission_memory_budget_bytes", "gauge", "memory_budget", "Memory budget for in-flight work"),
+                ("cipher_admission_cpu_seconds", "gauge", "cpu_used", "Estimated CPU seconds of admitted work"),
+                ("cipher_admission_cpu_budget_seconds", "gauge", "cpu_budget", "CPU budget for in-flight work"),
+                ("cipher_admission_in_flight", "gauge", "in_flight", "Requests and jobs holding budget"),
+                ("cipher_admission_waiting", "gauge", "waiting", "Requests waiting for budget")):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", f"{metric} {stats[name]}"]
+        lines += ["# HELP cipher_admission_rejected_total Requests rejected by admission control",
+                  "# TYPE cipher_admission_rejected_total counter"]
+        for reason, n in sorted(stats['rejected'].items()):
+            lines.append(f'cipher_admission_rejected_total{{reason="{reason}"}} {n}')
+        return "\n".join(lines) + "\n"
+    
+    def _fits(self, cost) -> bool:
+        # Kalau tidak ada yang berjalan, request yang lolos cek ukuran selalu boleh jalan
+        return self.in_flight == 0 or (self.memory_used + cost.memory <= self.max_memory
+                                       and self.cpu_used + cost.cpu <= self.max_cpu)
+    
+    def _reject(self, reason):
+        with self._cond:
+            self.rejected[reason] += 1
+
+ADMISSION = AdmissionControl(
+    max_memory=app.config["MEMORY_BUDGET"],
+    max_cpu=CPU_BUDGET_PER_CORE * (os.cpu_count() or 1),
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    max_waiting=ADMISSION_MAX_WAITING,
+)
+
+# ===== Background Jobs (file besar) =====
+# Upload besar tidak diproses di worker request: isinya disalin ke file
+# sementara lalu dikerjakan di pool job sendiri. User mendapat job ID untuk
+# cek progress, membatalkan, dan download hasilnya. Kapasitas job (jumlah
+# worker dan antrean) terpisah dari request biasa yang diproses langsung.
+app.config["JOB_THRESHOLD"] = 64 * 1024 * 1024
+JOB_WORKERS = 2
+JOB_MAX_PENDING = 16
+
+def process_cipher_file(f, original_filename, cipher, args, enc=True, params=None):
+    """
+    Enkripsi/dekripsi file upload (stream f). File besar untuk cipher di
+    STREAM_CIPHERS di-stream per chunk, sisanya dibaca ke memory.
+    Returns: (original_filename, iterable chunk hasil)
+    """
+    if streams(cipher, remaining_size(f)):
+        return stream_cipher_file(f, original_filename, cipher, args, enc, params)
+    
+    if cipher == "otp" and hasattr(args[0], "read"):
+        args = (args[0].read(),)
+    if enc:
+        size = remaining_size(f)
+        if inplace_enabled(cipher, size):
+            # Data dibaca langsung ke buffer hasil (plus ruang padding) lalu dienkripsi di tempat
+            buf = bytearray(cipher_output_size(cipher, args, size))
+            read_into(f, memoryview(buf)[:size])
+            result = run_cipher_into(cipher, args, memoryview(buf)[:size], enc, buf)
+        else:
+            with stage("read"):
+                data = f.read()
+            count_bytes("read", len(data))
+            result = run_cipher(cipher, args, data, enc, True)
+        return original_filename, write_cipher_file(original_filename, cipher, args, size,
+                                                    len(result), [result], params)
+    
+    # Header file cipher (nama file asli) tidak ikut dienkripsi
+    header = open_cipher_file(f, cipher, args)
+    if header.version >= 2 and inplace_enabled(cipher, header.cipher_size):
+        buf = bytearray(header.cipher_size)
+        pos = 0
+        for payload in read_frames(f, header):
+            buf[pos:pos + len(payload)] = payload
+            pos += len(payload)
+        result = run_cipher_into(cipher, args, buf, enc, None)
+        return header.filename, [memoryview(result)[:header.size]]
+    if header.version == 1:
+        with stage("read"):
+            data = f.read()
+        count_bytes("read", len(data))
+    else:
+        data = b''.join(read_frames(f, header))
+    result = run_cipher(cipher, args, data, enc, True)
+    if header.size is not None:
+        result = result[:header.size]
+    return header.filename, [result]
+
+def result_filename(original_filename, enc=True) -> str:
+    return original_filename + ".dat" if enc else "DECRYPTED_" + original_filename
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    """Satu job di JobQueue; progress dihitung dari byte input yang sudah dibaca"""
+    def __init__(self, total, labels=(None, None)):
+        self.id = secrets.token_urlsafe(16)
+        self.labels = labels
+        self.total = total
+        self.done = 0
+        self.status = "queued"
+        self.error = None
+        self.filename = None
+        self.token = None
+        self.finished = None
+        self.cancelled = threading.Event()
+        self.future = None
+    
+    def to_dict(self):
+        if self.status == "done":
+            progress = 100.0
+        else:
+            progress = round(100.0 * self.done / self.total, 1) if self.total else 0.0
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progress': progress,
+            'bytes_done': self.done,
+            'bytes_total': self.total,
+            'filename': self.filename,
+            'error': self.error,
+        }
+
+class ProgressFile:
+    """Bungkus file input job: catat posisi baca sebagai progress, dan cek pembatalan"""
+    def __init__(self, f, job):
+        self.f = f
+        self.job = job
+    
+    def read(self, size=-1):
+        if self.job.cancelled.is_set():
+            raise JobCancelled()
+        data = self.f.read(size)
+        self.job.done = self.f.tell()
+        return data
+    
+    def readinto(self, b):
+        # Dipakai jalur in-place (read_into) untuk file di bawah STREAM_THRESHOLD
+        if self.job.cancelled.is_set():
+            raise JobCancelled()
+        n = self.f.readinto(b)
+        self.job.done = self.f.tell()
+        return n
+    
+    def seek(self, *args):
+        return self.f.seek(*args)
+    
+    def tell(self):
+        return self.f.tell()
+
+class JobQueue:
+    """
+    Pool thread untuk job file besar. Hasil job disimpan di result store
+    (RESULTS); job yang sudah selesai dibuang setelah ttl detik.
+    Job baru ditolak kalau sudah ada max_pending job yang antre/berjalan.
+    """
+    def __init__(self, workers, max_pending, ttl):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def submit(self, work, total, cleanup=None, labels=(None, None), cost=NO_COST) -> Job:
+        """
+        Jalankan work(job) di background. work mengembalikan
+        (nama file download, iterable chunk hasil). cleanup() dipanggil
+        setelah job selesai, gagal atau dibatalkan.
+        labels: (cipher, arah) untuk metrics. cost: estimasi untuk ADMISSION,
+        job tetap "queued" sampai budget-nya tersedia.
+        """
+        job = Job(total, labels)
+        with self._lock:
+            self._evict()
+            pending = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise ValueError("Too many queued jobs, please try again later")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="cipher-job")
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, work, cleanup, cost)
+        return job
+    
+    def _run(self, job, work, cleanup, cost):
+        try:
+            if job.cancelled.is_set():
+                raise JobCancelled()
+            with ADMISSION.admit(cost, timeout=None):
+                if job.cancelled.is_set():
+                    raise JobCancelled()
+                job.status = "running"
+                with timing(*job.labels):
+                    job.filename, chunks = work(job)
+                    job.token = RESULTS.put(self._until_cancelled(job, chunks), job.filename)
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.monotonic()
+            if cleanup is not None:
+                cleanup()
+    
+    @staticmethod
+    def _until_cancelled(job, chunks):
+        for chunk in chunks:
+            if job.cancelled.is_set():
+                raise JobCancelled()
+            yield chunk
+    
+    def get(self, job_id):
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id):
+        """Batalkan job yang antre atau berjalan; return job (None kalau tidak ada)"""
+        job = self.get(job_id)
+        if job is not None and job.status in ("queued", "running"):
+            job.cancelled.set()
+            if job.future.cancel():
+                # Belum sempat jalan: _run tidak akan dipanggil
+                job.status = "cancelled"
+                job.finished = time.monotonic()
+        return job
+    
+    def _evict(self):
+        now = time.monotonic()
+        for job_id in [i for i, j in self._jobs.items() if j.finished and j.finished + self.ttl <= now]:
+            del self._jobs[job_id]
+
+JOBS = JobQueue(JOB_WORKERS, JOB_MAX_PENDING, ttl=RESULTS.ttl)
+
+def spool(f):
+    """Salin sisa stream upload ke file sementara (Flask menutup upload setelah request)"""
+    tmp = tempfile.TemporaryFile()
+    shutil.copyfileobj(f, tmp, STREAM_CHUNK)
+    tmp.seek(0)
+    return tmp
+
+def queue_cipher_file(f, original_filename, cipher, args, enc=True, params=None, fmt=None) -> Job:
+    """Antrekan process_cipher_file (process_text_file kalau fmt diisi) untuk upload besar; return Job"""
+    files = [spool(f)]
+    if cipher == "otp" and hasattr(args[0], "read"):
+        files.append(spool(args[0]))
+        args = (files[-1],)
+    total = remaining_size(files[0])
+    
+    def work(job):
+        if fmt is not None:
+            return process_text_file(ProgressFile(files[0], job), original_filename, cipher, args, enc, fmt)
+        name, chunks = process_cipher_file(ProgressFile(files[0], job), original_filename,
+                                           cipher, args, enc, params)
+        return result_filename(name, enc), chunks
+    
+    def cleanup():
+        for tmp in files:
+            tmp.close()
+    
+    try:
+        return JOBS.submit(work, total, cleanup, labels=(cipher, "encrypt" if enc else "decrypt"),
+                           cost=estimate_cost(cipher, total, fmt is None, text_file=fmt is not None))
+    except Exception:
+        cleanup()
+        raise
+
+# ===== Main Route =====
+@app.route("/", methods=["GET","POST"])
+def index():
+    output = None
+    prev_input = None
+    prev_key_shift = prev_key_vig = prev_key_sub = None
+    prev_key_affine_a = prev_key_affine_b = None
+    prev_key_hill = None
+    prev_key_hill_matrix = None
+    prev_key_perm = None
+    prev_key_playfair = None
+    prev_key_otp = None
+    prev_key_pipeline = None
+    ticket = rejected = None
+    
+    if request.method == "POST":
+        cipher = request.form["cipher"]
+        action = request.form["action"]
+        input_type = request.form.get("input_type", "text")
+        fmt = request.form.get("format", "normal")
+        
+        enc = (action == "Encrypt")
+        timer = current_timer()
+        if timer is not None:
+            # Label metrics hanya dari nilai yang dikenal, bukan dari input form mentah
+            timer.cipher = cipher if cipher in PROCESSORS else "unknown"
+            timer.direction = "encrypt" if enc else "decrypt"
+        
+        try:
+            # Determine input source and type
+            # "textfile": upload .txt diproses dengan cipher huruf (mode text), per chunk
+            text_file = (input_type == "textfile")
+            if input_type in ("file", "textfile"):
+                if "file_input" not in request.files:
+                    raise ValueError("No file uploaded")
+                f = request.files["file_input"]
+                if not f or f.filename == "":
+                    raise ValueError("No file selected")
+                
+                original_filename = secure_filename(f.filename)
+                is_binary = not text_file
+                prev_input = None
+                
+            else:
+                data = request.form.get("input_text", "")
+                if not data:
+                    raise ValueError("No text input provided")
+                is_binary = False
+                original_filename = None
+                # Input yang sangat panjang tidak ditulis ulang ke halaman
+                prev_input = data if len(data) <= TEXT_PAGE_SIZE else None
+
+            # Upload sudah di-spool ke disk oleh werkzeug; budget diambil sebelum
+            # key dibaca (pad OTP tidak terpakai kalau request ditolak). File yang
+            # dikerjakan sebagai job mengambil budget-nya sendiri saat job berjalan.
+            upload = is_binary or text_file
+            size = remaining_size(f.stream) if upload else len(data)
+            if not (upload and size >= app.config["JOB_THRESHOLD"]):
+                ticket = ADMISSION.acquire(estimate_cost(cipher, size, is_binary, text_file=text_file))
+
+            # Read key parameters for the chosen cipher
+            file_params = None
+            with stage("key"):
+                if cipher == "shift":
+                    key = int(request.form["shift_key"])
+                    args = (key,)
+                    prev_key_shift = key
+                    
+                elif cipher == "vig":
+                    key = request.form["vig_key"]
+                    args = (key,)
+                    prev_key_vig = key
+
+                elif cipher == "sub":
+                    key = request.form["sub_key"]
+                    args = (key,)
+                    prev_key_sub = key
+
+                elif cipher == "affine":
+                    a = int(request.form["a"]); b = int(request.form["b"])
+                    args = (a, b)
+                    prev_key_affine_a = a
+                    prev_key_affine_b = b
+
+                elif cipher == "hill":
+                    matrix_text = request.form.get("hill_matrix", "").strip()
+                    if matrix_text:
+                        M = parse_matrix(matrix_text)
+                        prev_key_hill_matrix = matrix_text
+                    else:
+                        M = [
+                            [int(request.form["m00"]),int(request.form["m01"])],
+                            [int(request.form["m10"]),int(request.form["m11"])]
+                        ]
+                        prev_key_hill = M
+                    args = (M,)
+
+                elif cipher == "perm":
+                    key_nums = list(map(int, request.form["perm_key"].split()))
+                    args = (key_nums,)
+                    prev_key_perm = " ".join(map(str, key_nums))
+
+                elif cipher == "playfair":
+                    key = request.form["playfair_key"]
+                    args = (key,)
+                    prev_key_playfair = key
+
+                elif cipher == "pipe":
+                    spec = request.form["pipeline_spec"]
+                    args = (parse_pipeline(spec, is_binary),)
+                    prev_key_pipeline = spec
+
+                elif cipher == "otp" and request.form.get("otp_pad", "").strip():
+                    # Pad di server: tidak perlu upload key
+                    pad_id = request.form["otp_pad"].strip()
+                    offset = request.form.get("otp_offset")
+                    if is_binary and not enc:
+                        header, size = cipher_payload_size(f.stream)
+                        # File cipher v2 mencatat pad dan offset yang dipakai saat enkripsi
+                        if not offset and header.params.get("pad") == pad_id:
+                            offset = header.params.get("offset")
+                    elif is_binary:
+                        size = remaining_size(f.stream)
+                    else:
+                        size = count_letters(f.stream) if text_file else len(letters_only(data))
+                    offset, key = otp_pad_key(pad_id, offset, size, enc)
+                    args = (key,)
+                    file_params = {"pad": pad_id, "offset": offset}
+                    if enc:
+                        flash(f"OTP pad '{pad_id}': offset {offset}, {size} bytes. "
+                              f"Simpan offset ini untuk dekripsi.", "info")
+
+                elif cipher == "otp":
+                    kf = request.files.get("otp_key_file")
+                    if is_binary:
+                        if kf and kf.filename:
+                            key = kf.stream
+                        else:
+                            raise ValueError("OTP key file or server pad required for binary mode")
+                    else:
+                        if kf and kf.filename:
+                            key = kf.read().decode("utf-8")
+                        else:
+                            raise ValueError("OTP key file or server pad required")
+                    args = (key,)
+                    prev_key_otp = key if not upload else None
+
+                else:
+                    raise ValueError("Unknown cipher")
+
+            if upload and remaining_size(f.stream) >= app.config["JOB_THRESHOLD"]:
+                # File besar dikerjakan di background, halaman menampilkan progress job
+                job = queue_cipher_file(f.stream, original_filename, cipher, args, enc, file_params,
+                                        fmt if text_file else None)
+                output = {
+                    'type': 'job',
+                    'message': f"File '{original_filename}' sedang diproses di background",
+                    'filename': None,
+                    'token': None,
+                    'job_id': job.id
+                }
+            
+            elif text_file:
+                download_filename, chunks = cached_cipher_file(f.stream, original_filename, cipher,
+                                                               args, enc, file_params, fmt)
+                with stage("store"):
+                    token = RESULTS.put(chunks, download_filename)
+                    page = stored_text_page(token)
+                if page is None:
+                    raise ValueError("Result was dropped from the result store, please process the file again")
+                output = {
                     'type': 'text',
-                    'message': format_output(result, fmt),
+                    'message': page['text'],
+                    'filename': download_filename,
+                    'token': token,
+                    'pages': page['pages']
+                }
+            
+            elif is_binary:
+                original_filename, chunks = cached_cipher_file(f.stream, original_filename, cipher,
+                                                               args, enc, file_params)
+                download_filename = result_filename(original_filename, enc)
+                if enc:
+                    message = f"File '{original_filename}' berhasil dienkripsi!"
+                else:
+                    message = f"File berhasil didekripsi menjadi '{original_filename}'!"
+                
+                # Hasil disimpan di server, halaman hanya membawa token download
+                output = {
+                    'type': 'binary',
+                    'message': message,
+                    'filename': download_filename,
+                    'token': RESULTS.put(chunks, download_filename)
+                }
+                
+            else:
+                # Text output
+                result = cached_run_cipher(cipher, args, data, enc, is_binary)
+                # Hasil lengkap disimpan di result store; halaman hanya memuat halaman pertama,
+                # halaman lain diambil lewat /text_page dan download lewat /save
+                with stage("format"):
+                    token = RESULTS.put((chunk.encode('utf-8') for chunk in format_output(result, fmt)),
+                                        "ciphertext.txt")
+                    page = stored_text_page(token)
+                if page is None:
+                    raise ValueError("Result was dropped from the result store, please process the text again")
+                output = {
+                    'type': 'text',
+                    'message': page['text'],
                     'filename': None,
-                    'data': None
+                    'token': token,
+                    'pages': page['pages']
                 }
 
+        except Overloaded as e:
+            rejected = e
+            flash(str(e), "danger")
         except Exception as e:
             flash(str(e), "danger")
+        finally:
+            if ticket is not None:
+                ticket.release()
     
-    return render_template(
-        "index.html", 
-        output=output,
-        prev_input=prev_input, 
-        prev_key_shift=prev_key_shift,
-        prev_key_vig=prev_key_vig,
-        prev_key_sub=prev_key_sub,
-        prev_key_affine_a=prev_key_affine_a,
-        prev_key_affine_b=prev_key_affine_b,
-        prev_key_hill=prev_key_hill,
-        prev_key_perm=prev_key_perm,
-        prev_key_playfair=prev_key_playfair,
-        prev_key_otp=prev_key_otp
-        )
-
-@app.route("/download_binary", methods=["POST"])
-def download_binary():
-    """Handle binary file downloads"""
+    with stage("render"):
+        page = render_template(
+            "index.html", 
+            output=output,
+            prev_input=prev_input, 
+            prev_key_shift=prev_key_shift,
+            prev_key_vig=prev_key_vig,
+            prev_key_sub=prev_key_sub,
+            prev_key_affine_a=prev_key_affine_a,
+            prev_key_affine_b=prev_key_affine_b,
+            prev_key_hill=prev_key_hill,
+            prev_key_hill_matrix=prev_key_hill_matrix,
+            prev_key_perm=prev_key_perm,
+            prev_key_playfair=prev_key_playfair,
+            prev_key_otp=prev_key_otp,
+            prev_key_pipeline=prev_key_pipeline
+            )
+    if rejected is not None:
+        return page, rejected.status, rejected.headers()
+    return page
+
+TEXT_PAGE_SIZE = 64 * 1024   # byte UTF-8 per halaman hasil text
+
+def read_result_range(entry, start, length) -> bytes:
+    """Potongan [start, start+length) dari entry result store"""
+    if entry['path'] is None:
+        return entry['data'][start:start + length]
+    with open(entry['path'], "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+def read_text_page(entry, page, size=TEXT_PAGE_SIZE) -> dict:
+    """
+    Halaman ke-page dari hasil text (UTF-8) di result store. Batas halaman
+    digeser ke awal karakter berikutnya, jadi karakter multi-byte tidak terpotong
+    dan setiap karakter muncul di tepat satu halaman.
+    """
+    pages = max(1, -(-entry['size'] // size))
+    if not 0 <= page < pages:
+        raise ValueError(f"Page must be between 0 and {pages - 1}")
+    # 3 byte tambahan: sisa karakter UTF-8 terakhir yang melewati batas halaman
+    data = read_result_range(entry, page * size, size + 3)
+    is_continuation = lambda b: b & 0xC0 == 0x80
+    start = 0
+    while start < min(len(data), 3) and is_continuation(data[start]):
+        start += 1
+    end = min(size, len(data))
+    while end < len(data) and is_continuation(data[end]):
+        end += 1
+    return {'page': page, 'pages': pages, 'text': data[start:end].decode('utf-8')}
+
+def stored_text_page(token, page=0):
+    """
+    read_text_page untuk hasil dengan token ini. Returns None kalau hasil sudah
+    expired atau di-evict, termasuk oleh request lain tepat setelah disimpan.
+    """
+    entry = RESULTS.get(token)
+    if entry is None:
+        return None
     try:
-        filename = request.form.get("filename", "result.dat")
-        data_b64 = request.form.get("data", "")
-        
-        if not data_b64:
-            flash("No data to download", "danger")
-            return redirect(url_for("index"))
-        
-        # Decode base64 data
-        binary_data = base64.b64decode(data_b64)
-        bio = io.BytesIO(binary_data)
-        
-        return send_file(bio, as_attachment=True, download_name=filename)
-        
-    except Exception as e:
-        flash(f"Download error: {str(e)}", "danger")
+        return read_text_page(entry, page)
+    except FileNotFoundError:
+        # File spill dihapus (evict) di antara get dan pembacaan
+        return None
+
+def send_result(entry):
+    """Kirim hasil dari result store; hasil di disk dikirim per chunk dari file"""
+    if entry['path']:
+        return send_file(entry['path'], as_attachment=True, download_name=entry['filename'])
+    return send_file(io.BytesIO(entry['data']), as_attachment=True, download_name=entry['filename'])
+
+@app.route("/download_binary", methods=["GET", "POST"])
+def download_binary():
+    """Handle binary file downloads dari result store"""
+    entry = RESULTS.get(request.values.get("token", ""))
+    if entry is None:
+        flash("Result not found or expired, please process the file again", "danger")
         return redirect(url_for("index"))
+    return send_result(entry)
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Status job background: queued/running/done/failed/cancelled dan progress (%)"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    status = job.to_dict()
+    if job.status == "done":
+        status['download_url'] = url_for("job_download", job_id=job.id)
+    return jsonify(status)
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def job_cancel(job_id):
+    job = JOBS.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/download")
+def job_download(job_id):
+    job = JOBS.get(job_id)
+    if job is None or job.status != "done":
+        return jsonify({"error": "Job not found or not finished"}), 404
+    entry = RESULTS.get(job.token)
+    if entry is None:
+        return jsonify({"error": "Result expired"}), 410
+    return send_result(entry)
+
+@app.route("/stats/key_cache")
+def key_cache():
+    """Statistik cache compiled key (hits, misses, currsize, maxsize)"""
+    return jsonify(key_cache_stats())
+
+@app.route("/stats/admission")
+def admission_stats():
+    """Pemakaian budget admission control: memory/CPU yang dipakai, antrean, jumlah ditolak"""
+    return jsonify(ADMISSION.stats())
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """Upload melebihi MAX_CONTENT_LENGTH"""
+    message = f"Upload is larger than the limit of {app.config['MAX_CONTENT_LENGTH'] // MB} MB"
+    if request.path.startswith("/api/"):
+        return api_error(message, 413)
+    flash(message, "danger")
+    return render_template("index.html", output=None), 413
+
+@app.route("/stats/result_cache")
+def result_cache():
+    """Statistik cache hasil: hits, misses, hit_rate, bytes_saved, entries, memory/disk used"""
+    return jsonify(RESULT_CACHE.stats())
+
+_profile_lock = threading.Lock()
+
+@app.before_request
+def start_request_timing():
+    """Timer per request; profiling cProfile kalau header X-Profile berisi secret yang benar"""
+    _timing.timer = StageTimer()
+    secret = app.config["PROFILE_SECRET"]
+    header = request.headers.get("X-Profile")
+    # Hanya satu request yang di-profile pada satu waktu
+    if secret and header and secrets.compare_digest(header, secret) and _profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_profile(response):
+    """Simpan hasil profiling ke PROFILE_DIR (.prof, baca dengan python -m pstats)"""
+    profiler = g.get("profiler")
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint}-{secrets.token_hex(4)}.prof"
+        profiler.dump_stats(os.path.join(app.config["PROFILE_DIR"], name))
+        response.headers["X-Profile-File"] = name
+    return response
+
+@app.teardown_request
+def finish_request_timing(exc):
+    # after_request tidak dijalankan kalau ada exception: profiler dilepas di sini
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+    timer = current_timer()
+    _timing.timer = None
+    if timer is not None:
+        finish_timer(timer)
+
+@app.route("/metrics")
+def metrics():
+    """Histogram waktu per tahap (read, key, cipher, container, store, format, render) dalam format Prometheus"""
+    return app.response_class(METRICS.render() + RESULT_CACHE.render() + ADMISSION.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/text_page")
+def text_page():
+    """Satu halaman hasil text dari result store: {page, pages, text}"""
+    try:
+        page = stored_text_page(request.args.get("token", ""), int(request.args.get("page", 0)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if page is None:
+        return jsonify({"error": "Result not found or expired"}), 404
+    return jsonify(page)
 
 @app.route("/save", methods=["POST"])
 def save():
-    """Save text output to file"""
+    """Save text output to file: hasil di result store (token) dikirim per chunk"""
+    if request.form.get("token"):
+        entry = RESULTS.get(request.form["token"])
+        if entry is None:
+            flash("Result not found or expired, please process the text again", "danger")
+            return redirect(url_for("index"))
+        return send_result(entry)
     data = request.form.get("output", "")
     if not data: 
         return redirect(url_for("index"))
     bio = io.BytesIO(data.encode("utf-8"))
     return send_file(bio, as_attachment=True, download_name="ciphertext.txt")
 
+# ===== REST API =====
+API_CIPHERS = {
+    "shift": "shift",
+    "vigenere": "vig", "vig": "vig",
+    "substitution": "sub", "sub": "sub",
+    "affine": "affine",
+    "hill": "hill",
+    "permutation": "perm", "perm": "perm",
+    "playfair": "playfair",
+    "otp": "otp",
+    "pipeline": "pipe", "pipe": "pipe",
+}
+API_MAX_BATCH_JOBS = 1000
+ANALYZE_MAX_RESTARTS = 64
+ANALYZE_MAX_ROUNDS = 50
+ANALYZE_MAX_TOP = 100
+
+def parse_api_args(cipher, get, is_binary):
+    """
+    Baca parameter key untuk API menjadi args process_*.
+    get(name) mengambil nilai parameter (query string, header, atau JSON).
+    Parameter: key (shift/vigenere/substitution/permutation/playfair/otp),
+    a dan b (affine), matrix (hill, baris dipisah ';'), pipeline (spec
+    parse_pipeline, stage dipisah '|'). OTP mode binary menerima key dalam base64.
+    """
+    def need(name):
+        value = get(name)
+        if value is None or value == "":
+            raise ValueError(f"Missing parameter '{name}'")
+        return value
+    
+    if cipher == "shift":
+        return (int(need("key")),)
+    elif cipher in ("vig", "sub", "playfair"):
+        return (need("key"),)
+    elif cipher == "affine":
+        return (int(need("a")), int(need("b")))
+    elif cipher == "hill":
+        return (parse_matrix(need("matrix")),)
+    elif cipher == "perm":
+        return (list(map(int, need("key").replace(",", " ").split())),)
+    elif cipher == "otp":
+        key = need("key")
+        return (base64.b64decode(key, validate=True) if is_binary else key,)
+    elif cipher == "pipe":
+        return (parse_pipeline(need("pipeline"), is_binary),)
+    raise ValueError("Unknown cipher")
+
+def api_error(message, status=400):
+    return jsonify({"error": message}), status
+
+def overloaded_error(e):
+    """Response API untuk request yang ditolak admission control"""
+    response, status = api_error(str(e), e.status)
+    response.headers.update(e.headers())
+    return response, status
+
+@app.route("/api/v1/<cipher>/<action>", methods=["POST"])
+def api_cipher(cipher, action):
+    """
+    Enkripsi/dekripsi body request mentah.
+    Key dari query string (?key=...) atau header X-Cipher-<Nama> (X-Cipher-Key).
+    Mode binary (default) untuk application/octet-stream, text untuk text/*;
+    bisa dipaksa dengan ?mode=binary|text. Mode text menerima ?format=.
+    OTP bisa memakai pad di server: ?pad=<ID> (encrypt, offset yang dipakai
+    dikirim di header X-Otp-Offset) dan ?pad=<ID>&offset=<N> (decrypt).
+    Encrypt binary dengan ?container=1 (dan ?filename=) menghasilkan file
+    cipher v2; decrypt menerima file v2 dan ?range=<awal>-<akhir> (inklusif)
+    untuk hanya mendekripsi sebagian data asli.
+    ?async=1 (binary) menjalankan job di background dan langsung membalas
+    202 dengan job ID; hasil job selalu berupa file cipher v2.
+    """
+    if cipher not in API_CIPHERS or action not in ("encrypt", "decrypt"):
+        return api_error("Unknown cipher or action", 404)
+    cipher = API_CIPHERS[cipher]
+    
+    def get(name):
+        value = request.args.get(name)
+        return value if value is not None else request.headers.get("X-Cipher-" + name.capitalize())
+    
+    mode = request.args.get("mode") or ("text" if request.mimetype.startswith("text/") else "binary")
+    is_binary = (mode == "binary")
+    enc = (action == "encrypt")
+    pad_offset = None
+    timer = current_timer()
+    if timer is not None:
+        timer.cipher, timer.direction = cipher, action
+    if is_binary and request.args.get("async"):
+        return api_cipher_job(cipher, get, enc)
+    ticket = None
+    try:
+        # Body dibaca utuh ke memory: budget diambil dari Content-Length sebelum dibaca
+        if request.content_length is not None:
+            ticket = ADMISSION.acquire(estimate_cost(cipher, request.content_length, is_binary, buffered=True))
+        with stage("read"):
+            data = request.get_data()
+        count_bytes("read", len(data))
+        if ticket is None:
+            ticket = ADMISSION.acquire(estimate_cost(cipher, len(data), is_binary, buffered=True))
+        if not is_binary:
+            data = data.decode("utf-8")
+        if cipher == "otp" and get("pad"):
+            offset = get("offset")
+            if is_binary and not enc and data.startswith(CONTAINER_MAGIC):
+                header, size = cipher_payload_size(io.BytesIO(data))
+                # File cipher v2 mencatat pad dan offset yang dipakai saat enkripsi
+                if not offset and header.params.get("pad") == get("pad"):
+                    offset = header.params.get("offset")
+            else:
+                size = len(data) if is_binary else len(letters_only(data))
+            pad_offset, key = otp_pad_key(get("pad"), offset, size, enc)
+            args = (key,)
+        else:
+            args = parse_api_args(cipher, get, is_binary)
+        
+        if is_binary and not enc and data.startswith(CONTAINER_MAGIC):
+            f = io.BytesIO(data)
+            if request.args.get("range"):
+                start, _, last = request.args["range"].partition("-")
+                result = decrypt_range(f, cipher, args, int(start), int(last) + 1)
+            else:
+                header = open_cipher_file(f, cipher, args)
+                data = b''.join(read_frames(f, header))
+                result = run_cipher(cipher, args, data, enc, is_binary)[:header.size]
+        else:
+            result = cached_run_cipher(cipher, args, data, enc, is_binary)
+            if is_binary and enc and request.args.get("container"):
+                params = {"pad": get("pad"), "offset": pad_offset} if pad_offset is not None else None
+                result = write_cipher_file(request.args.get("filename", "data"), cipher, args,
+                                           len(data), len(result), [result], params)
+        if is_binary:
+            response = app.response_class(result, mimetype="application/octet-stream")
+        else:
+            result = format_output(result, request.args.get("format", "normal"))
+            response = app.response_class(result, mimetype="text/plain")
+    except Overloaded as e:
+        return overloaded_error(e)
+    except Exception as e:
+        if ticket is not None:
+            ticket.release()
+        if isinstance(e, RequestEntityTooLarge):
+            raise
+        return api_error(str(e))
+    
+    # Hasil tetap di memory sampai response selesai dikirim
+    response.call_on_close(ticket.release)
+    if pad_offset is not None:
+        response.headers["X-Otp-Offset"] = str(pad_offset)
+    return response
+
+def api_cipher_job(cipher, get, enc):
+    """Antrekan body request (binary) sebagai job; body di-spool tanpa dibaca ke memory"""
+    try:
+        body = request.stream
+        if cipher == "otp" and get("pad"):
+            offset = get("offset")
+            if enc:
+                size = request.content_length or 0
+            else:
+                # Panjang key = panjang data asli di header, jadi body perlu di-spool dulu
+                body = spool(request.stream)
+                header, size = cipher_payload_size(body)
+                if not offset and header.params.get("pad") == get("pad"):
+                    offset = header.params.get("offset")
+            pad_offset, key = otp_pad_key(get("pad"), offset, size, enc)
+            args = (key,)
+            params = {"pad": get("pad"), "offset": pad_offset}
+        else:
+            args = parse_api_args(cipher, get, True)
+            params = None
+        filename = secure_filename(request.args.get("filename", "")) or "data"
+        job = queue_cipher_file(body, filename, cipher, args, enc, params)
+    except Exception as e:
+        return api_error(str(e))
+    status = job.to_dict()
+    status['status_url'] = url_for("job_status", job_id=job.id)
+    response = jsonify(status)
+    response.status_code = 202
+    response.headers["Location"] = status['status_url']
+    return response
+
+@app.route("/api/v1/pads/<pad_id>")
+def api_pad(pad_id):
+    """Status satu pad OTP: size, used, remaining (byte). Pad ID tidak pernah didaftar."""
+    try:
+        return jsonify(PADS.stats(pad_id))
+    except ValueError as e:
+        return api_error(str(e), 404)
+
+@app.route("/api/v1/analyze/<cipher>", methods=["POST"])
+def api_analyze(cipher):
+    """
+    Kriptanalisis ciphertext (body text/plain): top-k key kandidat dengan skor
+    dan potongan plaintext, plus analisis frekuensi huruf.
+    Cipher: shift, affine, vigenere, substitution. ?top=5, vigenere ?max_length=,
+    substitution ?restarts=&rounds=.
+    """
+    import analysis  # NumPy + tabel quadgram hanya di-load kalau dipakai
+    
+    # Batas setiap parameter; max_length di atas batas dipotong oleh analysis
+    limits = {"top": ANALYZE_MAX_TOP, "max_length": None,
+              "restarts": ANALYZE_MAX_RESTARTS, "rounds": ANALYZE_MAX_ROUNDS}
+    unknown = sorted(set(request.args) - set(limits))
+    if unknown:
+        return api_error(f"Unknown option '{unknown[0]}' (options: {', '.join(limits)})")
+    options = {}
+    for name, limit in limits.items():
+        if request.args.get(name):
+            try:
+                options[name] = int(request.args[name])
+            except ValueError:
+                return api_error(f"'{name}' must be an integer")
+            if options[name] < 1:
+                return api_error(f"'{name}' must be at least 1")
+            if limit is not None and options[name] > limit:
+                return api_error(f"'{name}' too large (max {limit})")
+    top = options.pop("top", 5)
+    try:
+        # Option untuk breaker lain (mis. restarts untuk shift) ditolak sebelum body dibaca
+        analysis.check_options(cipher, options)
+    except ValueError as e:
+        return api_error(str(e))
+    
+    ticket = None
+    try:
+        # Seluruh body dianalisis di memory: budget diambil sebelum dibaca
+        if request.content_length is not None:
+            ticket = ADMISSION.acquire(estimate_cost(None, request.content_length, False, buffered=True))
+        text = request.get_data(as_text=True)
+        if ticket is None:
+            ticket = ADMISSION.acquire(estimate_cost(None, len(text), False, buffered=True))
+        return jsonify(analysis.analyze(cipher, text, top, **options))
+    except Overloaded as e:
+        return overloaded_error(e)
+    except (ValueError, TypeError) as e:
+        return api_error(str(e))
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+@app.route("/api/v1/batch", methods=["POST"])
+def api_batch():
+    """
+    Jalankan banyak job kecil dalam satu request. Body JSON:
+      {"jobs": [{"cipher": "shift", "action": "encrypt", "mode": "text",
+                 "data": "HELLO", "params": {"key": 3}}, ...]}
+    Mode binary: "data" berupa base64. Response application/octet-stream,
+    untuk setiap job berurutan: [1 byte status: 0 ok, 1 error]
+    [4 bytes panjang][hasil, atau pesan error UTF-8].
+    """
+    try:
+        # Cipher setiap job belum diketahui: dihitung dengan cipher paling berat
+        size = request.content_length if request.content_length is not None else len(request.get_data())
+        ticket = ADMISSION.acquire(estimate_cost(None, size, False, buffered=True))
+    except Overloaded as e:
+        return overloaded_error(e)
+    try:
+        spec = request.get_json(silent=True)
+        jobs = spec.get("jobs") if isinstance(spec, dict) else None
+        if not isinstance(jobs, list):
+            ticket.release()
+            return api_error("Body must be JSON with a 'jobs' list")
+        if len(jobs) > API_MAX_BATCH_JOBS:
+            ticket.release()
+            return api_error(f"Too many jobs (max {API_MAX_BATCH_JOBS})", 413)
+        
+        parts = []
+        for job in jobs:
+            try:
+                if not isinstance(job, dict):
+                    raise ValueError("Job must be an object")
+                cipher = API_CIPHERS.get(job.get("cipher"))
+                action = job.get("action")
+                if cipher is None or action not in ("encrypt", "decrypt"):
+                    raise ValueError("Unknown cipher or action")
+                is_binary = (job.get("mode", "binary") == "binary")
+                params = job.get("params") or {}
+                args = parse_api_args(cipher, lambda name: params.get(name), is_binary)
+            
+                data = job.get("data", "")
+                data = base64.b64decode(data, validate=True) if is_binary else str(data)
+                result = run_cipher(cipher, args, data, action == "encrypt", is_binary)
+                if not is_binary:
+                    result = ''.join(format_output(result, job.get("format", "normal"))).encode("utf-8")
+                status = 0
+            except Exception as e:
+                result, status = str(e).encode("utf-8"), 1
+            parts.append(bytes([status]) + len(result).to_bytes(4, 'big'))
+            parts.append(result)
+    
+        response = app.response_class(parts, mimetype="application/octet-stream")
+        response.headers["X-Batch-Count"] = str(len(jobs))
+    except Exception:
+        # Misalnya body melebihi MAX_CONTENT_LENGTH saat dibaca get_json
+        ticket.release()
+        raise
+    response.call_on_close(ticket.release)
+    return response
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Mode serving async (ASGI) untuk web app, tanpa mengubah route Flask.
+
+Body request dibaca secara async (di-spool ke file sementara kalau besar),
+jadi upload dari client yang lambat tidak memakai worker sama sekali. Setelah
+body lengkap, request diteruskan ke app Flask (process_*, admission control,
+result cache, dst.) di executor dengan jumlah worker terbatas, dan response
+dikirim balik per chunk. Ribuan koneksi lambat hanya memakai event loop,
+sementara kerja cipher dibatasi oleh jumlah worker.
+
+Contoh:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+    CIPHER_ASGI_WORKERS=4 python asgi.py --port 8000
+
+Server ASGI (uvicorn, hypercorn, ...) tidak termasuk requirements.txt;
+install sendiri kalau memakai mode ini.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.wsgi import FileWrapper
+
+import app as cipher_app
+
+WORKERS = int(os.environ.get("CIPHER_ASGI_WORKERS", os.cpu_count() or 1))
+SPOOL_SIZE = 1024 * 1024   # body lebih besar dari ini ditulis ke disk
+_DONE = object()
+
+
+def file_wrapper(f, block_size=None):
+    """wsgi.file_wrapper: send_file dibaca per STREAM_CHUNK, bukan blok 8 KB"""
+    return FileWrapper(f, cipher_app.STREAM_CHUNK)
+
+
+def next_chunk(iterator):
+    # StopIteration tidak bisa melewati Future, jadi akhir iterasi ditandai _DONE
+    return next(iterator, _DONE)
+
+
+class CipherASGI:
+    """Adapter ASGI -> WSGI untuk app Flask dengan executor kerja terbatas"""
+
+    def __init__(self, wsgi_app, workers=WORKERS, spool_size=SPOOL_SIZE):
+        self.wsgi_app = wsgi_app
+        self.workers = workers
+        self.spool_size = spool_size
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cipher-asgi")
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._executor is not None:
+                    self._executor.shutdown(wait=True)
+                    self._executor = None
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def read_body(self, scope, receive):
+        """
+        Spool body request selagi dikirim client (tanpa memakai worker). Body yang melebihi
+        MAX_CONTENT_LENGTH tidak dibaca sampai habis: Flask yang membalas 413.
+        Returns: (file body, panjang untuk CONTENT_LENGTH), atau None kalau client putus.
+        """
+        limit = self.wsgi_app.config.get("MAX_CONTENT_LENGTH")
+        declared = header_value(scope, b"content-length")
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        if limit is not None and declared is not None and int(declared) > limit:
+            return body, int(declared)
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if limit is not None and size > limit:
+                return body, size
+            body.write(chunk)
+            more = message.get("more_body", False)
+        body.seek(0)
+        return body, size
+
+    def environ(self, scope, body, size) -> dict:
+        """Environ WSGI (PEP 3333) dari scope ASGI"""
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": "HTTP/" + scope.get("http_version", "1.1"),
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "CONTENT_LENGTH": str(size),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "wsgi.file_wrapper": file_wrapper,
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_LENGTH":
+                continue
+            key = name if name == "CONTENT_TYPE" else "HTTP_" + name
+            environ[key] = environ[key] + "," + value if key in environ else value
+        return environ
+
+    def call_app(self, environ):
+        """
+        Jalankan app WSGI sampai chunk pertama (di executor).
+        Returns: (status, headers, iterable hasil app, iterator-nya, chunk yang sudah ada)
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started["status"], started["headers"] = status, headers
+            return lambda data: started.setdefault("written", []).append(data)
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            iterator = iter(result)
+            # start_response boleh dipanggil sampai chunk pertama diminta
+            first = next_chunk(iterator)
+        except Exception:
+            if hasattr(result, "close"):
+                result.close()
+            raise
+        chunks = started.get("written", [])
+        if first is not _DONE:
+            chunks.append(first)
+        return started["status"], started["headers"], result, iterator, chunks
+
+    async def http(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        spooled = await self.read_body(scope, receive)
+        if spooled is None:
+            return
+        body, size = spooled
+        result = None
+        try:
+            try:
+                status, headers, result, iterator, chunks = await loop.run_in_executor(
+                    self.executor, self.call_app, self.environ(scope, body, size))
+            except Exception as e:
+                print(f"ASGI request failed: {e!r}", file=sys.stderr)
+                await send({"type": "http.response.start", "status": 500,
+                            "headers": [(b"content-type", b"text/plain")]})
+                await send({"type": "http.response.body", "body": b"Internal Server Error"})
+                return
+            await send({
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+            })
+            for chunk in chunks:
+                if chunk:
+                    await send({"type": "http.response.body", "body": bytes(chunk), "more_body": True})
+            while True:
+                # Chunk berikutnya bisa berisi kerja cipher (hasil streaming): ambil di executor
+                chunk = await loop.run_in_executor(self.executor, next_chunk, iterator)
+                if chunk is _DONE:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": bytes(chunk), "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if result is not None and hasattr(result, "close"):
+                # close() melepas budget admission (call_on_close) dan file hasil
+                await loop.run_in_executor(self.executor, result.close)
+            body.close()
+
+
+def header_value(scope, name):
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+app = CipherASGI(cipher_app.app)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the cipher web app with an ASGI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    opts = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("uvicorn is not installed (pip install uvicorn), or run another ASGI server with asgi:app")
+    uvicorn.run(app, host=opts.host, port=opts.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
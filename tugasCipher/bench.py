@@ -0,0 +1,305 @@
+"""
+Benchmark untuk semua fungsi process_* (mode text dan binary).
+
+Setiap kasus (cipher, mode, ukuran) menjalankan encrypt lalu decrypt pada
+payload sintetis, mengukur throughput (MB/s), peak RSS proses, peak alokasi
+(tracemalloc), dan mengecek hasil decrypt kembali sama dengan input.
+Hasilnya disimpan sebagai JSON supaya bisa dibandingkan antar commit.
+
+Contoh:
+    python bench.py --sizes 1K,1M,16M --output before.json
+    python bench.py --sizes 1K,1M,16M --output after.json --compare before.json
+    python bench.py --cold-start --import-budget-ms 400
+
+--cold-start mengukur waktu `import app` di proses baru (seperti cold start
+serverless) dan gagal kalau median-nya melebihi budget atau kalau import app
+ikut meng-import NumPy.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import app
+
+CIPHERS = ["shift", "vig", "sub", "affine", "hill", "perm", "playfair", "otp"]
+MODES = ["text", "binary"]
+
+# Key contoh yang valid untuk mode text (mod 26) maupun binary (mod 256)
+KEYS = {
+    "shift": (3,),
+    "vig": ("LEMON",),
+    "sub": ("QWERTYUIOPASDFGHJKLZXCVBNM",),
+    "affine": (5, 8),
+    "hill": ([[3, 3], [2, 5]],),
+    "perm": ([3, 1, 4, 2],),
+    "playfair": ("MONARCHY",),
+}
+
+# Kombinasi yang memang tidak bisa kembali persis ke input:
+# - substitution binary memetakan byte 234..255 secara tidak bijektif
+KNOWN_LOSSY = {("sub", "binary")}
+
+# Huruf tanpa J dan X: Playfair tidak menyisipkan/menambah 'X', sehingga
+# hasil decrypt text bisa dibandingkan langsung dengan input
+TEXT_LETTERS = np.frombuffer(b"ABCDEFGHIKLMNOPQRSTUVWYZ", dtype=np.uint8)
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text):
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(n):
+    for unit in ("G", "M", "K"):
+        if n >= UNITS[unit] and n % UNITS[unit] == 0:
+            return f"{n // UNITS[unit]}{unit}"
+    return str(n)
+
+
+def make_text(size, rng):
+    """Huruf acak tanpa huruf kembar berurutan, panjang kelipatan 4 (blok hill/perm)"""
+    size -= size % 4
+    idx = rng.integers(0, len(TEXT_LETTERS), size)
+    # Geser huruf yang sama dengan huruf sebelumnya supaya tidak ada digraph kembar
+    same = np.flatnonzero(idx[1:] == idx[:-1]) + 1
+    while len(same):
+        idx[same] = (idx[same] + 1) % len(TEXT_LETTERS)
+        same = np.flatnonzero(idx[1:] == idx[:-1]) + 1
+    return TEXT_LETTERS[idx].tobytes().decode("ascii")
+
+
+def make_binary(size, rng):
+    return rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+
+
+def make_case_args(cipher, mode, size, rng):
+    """Payload dan args process_* untuk satu kasus"""
+    data = make_text(size, rng) if mode == "text" else make_binary(size, rng)
+    if cipher == "otp":
+        args = (make_text(len(data) + 4, rng) if mode == "text" else make_binary(len(data), rng),)
+    else:
+        args = KEYS[cipher]
+    return data, args
+
+
+def roundtrip_ok(data, decrypted):
+    # Padding (hill/permutation) hanya boleh menambah di belakang
+    return decrypted[:len(data)] == data
+
+
+def run_case(cipher, mode, size, repeat=1, trace_alloc=True, seed=0):
+    """Jalankan satu kasus dan return dict hasil pengukuran"""
+    rng = np.random.default_rng(seed)
+    data, args = make_case_args(cipher, mode, size, rng)
+    process = app.PROCESSORS[cipher]
+    is_binary = (mode == "binary")
+
+    enc_times, dec_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encrypted = process(data, *args, enc=True, is_binary=is_binary)
+        enc_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decrypted = process(encrypted, *args, enc=False, is_binary=is_binary)
+        dec_times.append(time.perf_counter() - start)
+
+    alloc_peak = None
+    if trace_alloc:
+        del encrypted, decrypted
+        tracemalloc.start()
+        encrypted = process(data, *args, enc=True, is_binary=is_binary)
+        decrypted = process(encrypted, *args, enc=False, is_binary=is_binary)
+        alloc_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if (cipher, mode) in KNOWN_LOSSY:
+        roundtrip = "lossy"
+    else:
+        roundtrip = roundtrip_ok(data, decrypted)
+
+    mb = len(data) / (1024 * 1024)
+    enc_best, dec_best = min(enc_times), min(dec_times)
+    # ru_maxrss: kilobyte di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_bytes = rss if sys.platform == "darwin" else rss * 1024
+    return {
+        "cipher": cipher,
+        "mode": mode,
+        "size": len(data),
+        "encrypt_s": enc_best,
+        "decrypt_s": dec_best,
+        "encrypt_mb_s": mb / enc_best if enc_best else None,
+        "decrypt_mb_s": mb / dec_best if dec_best else None,
+        "peak_rss_bytes": rss_bytes,
+        "alloc_peak_bytes": alloc_peak,
+        "roundtrip": roundtrip,
+    }
+
+
+# Modul berat yang seharusnya baru di-import saat dipakai, bukan saat import app
+LAZY_MODULES = ["numpy", "multiprocessing.shared_memory", "concurrent.futures.process"]
+IMPORT_SNIPPET = (
+    "import json, sys, time; t = time.perf_counter(); import app; "
+    "print(json.dumps([time.perf_counter() - t, [m for m in %r if m in sys.modules]]))" % LAZY_MODULES
+)
+
+
+def measure_cold_start(runs):
+    """Median waktu `import app` (detik) di proses baru, dan modul lazy yang ikut ter-import"""
+    times, loaded = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True,
+                             check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        seconds, modules = json.loads(out)
+        times.append(seconds)
+        loaded.update(modules)
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "runs": runs,
+        "eager_modules": sorted(loaded),
+    }
+
+
+def _run_case_star(kwargs):
+    return run_case(**kwargs)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print perbandingan throughput dengan hasil lama; return jumlah regresi"""
+    old = {(r["cipher"], r["mode"], r["size"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for r in results:
+        prev = old.get((r["cipher"], r["mode"], r["size"]))
+        if prev is None or not prev["encrypt_mb_s"] or not r["encrypt_mb_s"]:
+            continue
+        ratio = r["encrypt_mb_s"] / prev["encrypt_mb_s"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  {r['cipher']:<9}{r['mode']:<7}{format_size(r['size']):>6}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def cold_start(opts):
+    result = measure_cold_start(opts.import_runs)
+    result["budget_s"] = opts.import_budget_ms / 1000
+    print(f"import app: median {result['median_s'] * 1000:.1f} ms "
+          f"(min {result['min_s'] * 1000:.1f}, max {result['max_s'] * 1000:.1f}, "
+          f"{result['runs']} runs), budget {opts.import_budget_ms:.0f} ms")
+    ok = True
+    if result["eager_modules"]:
+        print(f"Imported eagerly (should be lazy): {', '.join(result['eager_modules'])}")
+        ok = False
+    if result["median_s"] > result["budget_s"]:
+        print("Over budget")
+        ok = False
+    with open(opts.output, "w") as f:
+        json.dump({"meta": {"commit": git_commit(), "python": platform.python_version()},
+                   "cold_start": result}, f, indent=2)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark process_* ciphers")
+    parser.add_argument("--sizes", default="1K,64K,1M,16M",
+                        help="daftar ukuran payload, misal 1K,1M,1G")
+    parser.add_argument("--ciphers", default=",".join(CIPHERS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="ambil waktu terbaik dari N run")
+    parser.add_argument("--no-alloc", action="store_true", help="lewati pengukuran tracemalloc")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="jalankan semua kasus di proses ini (peak RSS jadi kumulatif)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="file JSON hasil sebelumnya")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="penurunan throughput yang dianggap regresi (default 10%%)")
+    parser.add_argument("--cold-start", action="store_true", help="hanya ukur waktu import app")
+    parser.add_argument("--import-runs", type=int, default=10)
+    parser.add_argument("--import-budget-ms", type=float, default=400.0)
+    opts = parser.parse_args(argv)
+
+    if opts.cold_start:
+        return cold_start(opts)
+
+    cases = [
+        {"cipher": c, "mode": m, "size": parse_size(s),
+         "repeat": opts.repeat, "trace_alloc": not opts.no_alloc}
+        for c in opts.ciphers.split(",")
+        for m in opts.modes.split(",")
+        for s in opts.sizes.split(",")
+    ]
+
+    results = []
+    print(f"{'cipher':<9}{'mode':<7}{'size':>6}  {'enc MB/s':>9}  {'dec MB/s':>9}"
+          f"  {'RSS MB':>7}  {'alloc MB':>8}  roundtrip")
+    pool = None
+    if not opts.no_isolate:
+        # Satu proses baru per kasus supaya peak RSS tidak tercampur
+        pool = multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1)
+    try:
+        for case in cases:
+            r = pool.apply(_run_case_star, (case,)) if pool else run_case(**case)
+            results.append(r)
+            alloc = "-" if r["alloc_peak_bytes"] is None else f"{r['alloc_peak_bytes'] / 2 ** 20:8.1f}"
+            print(f"{r['cipher']:<9}{r['mode']:<7}{format_size(r['size']):>6}"
+                  f"  {r['encrypt_mb_s']:9.1f}  {r['decrypt_mb_s']:9.1f}"
+                  f"  {r['peak_rss_bytes'] / 2 ** 20:7.1f}  {alloc:>8}  {r['roundtrip']}")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(opts.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {opts.output}")
+
+    failed = [r for r in results if r["roundtrip"] is False]
+    if failed:
+        print(f"{len(failed)} case(s) failed the round-trip check")
+    regressions = 0
+    if opts.compare:
+        with open(opts.compare) as f:
+            regressions = compare(results, json.load(f), opts.threshold)
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
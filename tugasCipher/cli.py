@@ -0,0 +1,251 @@
+"""
+Command line untuk enkripsi/dekripsi banyak file sekaligus tanpa lewat Flask.
+
+Memakai engine process_* dan format file cipher v2 yang sama dengan web app:
+file .dat dari CLI bisa didekripsi di web, dan sebaliknya.
+
+Contoh:
+    python cli.py encrypt --cipher vig --key RAHASIA data/ -o encrypted/
+    python cli.py decrypt --cipher vig --key RAHASIA encrypted/ -o restored/
+    python cli.py encrypt --cipher otp --pad otp_key.txt laporan.pdf -o out/
+    python cli.py encrypt --cipher pipeline --pipeline "vig LEMON | perm 3 1 2" data/ -o encrypted/
+    cat file.bin | python cli.py encrypt --cipher shift --key 3 - > file.bin.dat
+
+Folder di-walk secara rekursif dan struktur foldernya dipertahankan di output.
+File yang size dan mtime-nya tidak berubah sejak run terakhir (dengan cipher
+dan key yang sama) dilewati, berdasarkan manifest di folder output.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import app
+
+MANIFEST_NAME = ".cipher-manifest.json"
+
+
+def parse_key_args(opts):
+    """Args process_* dari option command line (nama sama dengan parameter REST API)"""
+    if opts.cipher == "otp":
+        if not (opts.pad or opts.key_file):
+            raise ValueError("OTP needs --pad (server pad store) or --key-file")
+        return ()
+    return app.parse_api_args(opts.cipher, lambda name: getattr(opts, name), True)
+
+
+def otp_args(f, enc, pad=None, key_file=None):
+    """
+    Key OTP untuk satu file: dari pad store (setiap file memakai bagian pad
+    sendiri, offset dicatat di header) atau langsung dari key file (mmap).
+    Returns: (args, params header)
+    """
+    if key_file:
+        with open(key_file, "rb") as kf:
+            key = mmap.mmap(kf.fileno(), 0, access=mmap.ACCESS_READ)
+        return (memoryview(key),), None
+    if enc:
+        offset, key = app.otp_pad_key(pad, None, app.remaining_size(f), True)
+    else:
+        # Panjang key = panjang data asli yang dicatat di header
+        header, size = app.cipher_payload_size(f)
+        if header.params.get("pad") not in (None, pad):
+            raise ValueError(f"File was encrypted with OTP pad '{header.params['pad']}'")
+        offset, key = app.otp_pad_key(pad, header.params.get("offset"), size, False)
+    return (key,), {"pad": pad, "offset": offset}
+
+
+def process_file(src, out_dir, cipher, args, enc, pad=None, key_file=None):
+    """Proses satu file ke out_dir. Dijalankan di worker process."""
+    with open(src, "rb") as f:
+        size = app.remaining_size(f)
+        params = None
+        if cipher == "otp":
+            args, params = otp_args(f, enc, pad, key_file)
+        name, chunks = app.process_cipher_file(f, os.path.basename(src), cipher, args, enc, params)
+
+        # Nama file asli dari header: jangan sampai keluar dari out_dir
+        name = os.path.basename(name)
+        if name in ("", ".", ".."):
+            raise ValueError("Invalid original filename in cipher file")
+        out_path = os.path.join(out_dir, name + ".dat" if enc else name)
+        os.makedirs(out_dir, exist_ok=True)
+        written = 0
+        part = out_path + ".part"
+        try:
+            with open(part, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    written += len(chunk)
+            os.replace(part, out_path)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+    return out_path, size, written
+
+
+def init_worker():
+    # Setiap file sudah diproses di worker sendiri, jadi mode parallel di dalamnya dimatikan
+    app.PARALLEL_WORKERS = 1
+
+
+def iter_sources(sources, pattern, skip_dir):
+    """(path file, folder relatif di output) untuk setiap file di sources"""
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(d for d in dirs
+                                 if os.path.abspath(os.path.join(root, d)) != skip_dir)
+                for name in sorted(files):
+                    if fnmatch.fnmatch(name, pattern):
+                        yield os.path.join(root, name), os.path.relpath(root, source)
+        elif os.path.isfile(source):
+            yield source, "."
+        else:
+            raise ValueError(f"No such file or directory: {source}")
+
+
+def settings_fingerprint(opts, args):
+    """Hash cipher, arah dan key: manifest hanya berlaku untuk setting yang sama"""
+    settings = [opts.action, opts.cipher, repr(args), opts.pad, opts.key_file]
+    return hashlib.blake2b(json.dumps(settings).encode(), digest_size=16).hexdigest()
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(path, manifest):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def run_stdin(opts, args, enc):
+    """Baca stdin, tulis hasil ke stdout (satu file)"""
+    tmp = app.spool(sys.stdin.buffer)
+    try:
+        params = None
+        if opts.cipher == "otp":
+            args, params = otp_args(tmp, enc, opts.pad, opts.key_file)
+        _, chunks = app.process_cipher_file(tmp, opts.name, opts.cipher, args, enc, params)
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+    finally:
+        tmp.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt/decrypt files in bulk with the cipher engines")
+    parser.add_argument("action", choices=["encrypt", "decrypt"])
+    parser.add_argument("sources", nargs="+", help="file atau folder, '-' untuk stdin -> stdout")
+    parser.add_argument("--cipher", required=True, choices=sorted(app.API_CIPHERS))
+    parser.add_argument("--key", help="key (shift/vigenere/substitution/permutation/playfair)")
+    parser.add_argument("--a", help="affine a")
+    parser.add_argument("--b", help="affine b")
+    parser.add_argument("--matrix", help="hill matrix, baris dipisah ';'")
+    parser.add_argument("--pipeline", help="pipeline: stage dipisah '|', mis. \"shift 3 | vig LEMON | perm 3 1 2\"")
+    parser.add_argument("--pad", help="OTP: ID pad di pad store server (OTP_PAD_DIR)")
+    parser.add_argument("--key-file", help="OTP: file key (hanya untuk satu file)")
+    parser.add_argument("-o", "--output", help="folder output")
+    parser.add_argument("--pattern", help="filter nama file (default: * untuk encrypt, *.dat untuk decrypt)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--manifest", help=f"file manifest (default: <output>/{MANIFEST_NAME})")
+    parser.add_argument("--force", action="store_true", help="proses ulang semua file")
+    parser.add_argument("--name", default="stdin", help="nama file asli untuk input dari stdin")
+    opts = parser.parse_args(argv)
+    opts.cipher = app.API_CIPHERS[opts.cipher]
+    enc = (opts.action == "encrypt")
+
+    try:
+        args = parse_key_args(opts)
+        if opts.cipher != "otp":
+            # Validasi key sekali di awal, bukan error yang sama untuk setiap file
+            app.PROCESSORS[opts.cipher](b"", *args, enc=enc, is_binary=True)
+    except Exception as e:
+        parser.error(str(e))
+
+    if opts.sources == ["-"]:
+        return run_stdin(opts, args, enc)
+    if not opts.output:
+        parser.error("--output is required unless reading from stdin")
+    if opts.key_file and (len(opts.sources) > 1 or os.path.isdir(opts.sources[0])):
+        # Satu key file untuk banyak file = pad dipakai ulang
+        parser.error("--key-file can only be used with a single file; use --pad for bulk OTP")
+
+    out_root = os.path.abspath(opts.output)
+    manifest_path = opts.manifest or os.path.join(out_root, MANIFEST_NAME)
+    manifest = {} if opts.force else load_manifest(manifest_path)
+    fingerprint = settings_fingerprint(opts, args)
+    pattern = opts.pattern or ("*" if enc else "*.dat")
+
+    processed = skipped = failed = 0
+    bytes_in = bytes_out = 0
+    start = time.perf_counter()
+    os.makedirs(out_root, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max(opts.workers, 1), initializer=init_worker) as pool:
+        futures = {}
+        for src, rel in iter_sources(opts.sources, pattern, out_root):
+            src = os.path.abspath(src)
+            st = os.stat(src)
+            entry = manifest.get(src)
+            if (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                    and entry["settings"] == fingerprint and os.path.exists(entry["output"])):
+                skipped += 1
+                continue
+            out_dir = os.path.normpath(os.path.join(out_root, rel))
+            fut = pool.submit(process_file, src, out_dir, opts.cipher, args, enc, opts.pad, opts.key_file)
+            futures[fut] = (src, st)
+
+        try:
+            for fut in as_completed(futures):
+                src, st = futures[fut]
+                try:
+                    out_path, size, written = fut.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"FAILED {src}: {e}", file=sys.stderr)
+                    continue
+                processed += 1
+                bytes_in += size
+                bytes_out += written
+                manifest[src] = {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "settings": fingerprint,
+                    "output": out_path,
+                }
+        finally:
+            save_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    rate = bytes_in / (1024 * 1024) / elapsed if elapsed else 0.0
+    print(f"{processed} processed, {skipped} skipped, {failed} failed: "
+          f"{format_bytes(bytes_in)} in, {format_bytes(bytes_out)} out, "
+          f"{elapsed:.2f}s, {rate:.1f} MB/s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
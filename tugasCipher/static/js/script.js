@@ -6,7 +6,7 @@
 /**
  * Toggle between text input and file upload modes
  * @param {string} cipherName - Name of the cipher (e.g., 'shift', 'sub', etc.)
- * @param {string} inputType - Type of input ('text' or 'file')
+ * @param {string} inputType - Type of input ('text', 'file', or 'textfile' for a .txt processed with the letter cipher)
  */
 function toggleInputType(cipherName, inputType) {
   const textArea = document.getElementById(cipherName + '_text_area');
@@ -27,9 +27,9 @@ function toggleInputType(cipherName, inputType) {
     textArea.style.display = 'none';
     fileArea.style.display = 'block';
     
-    // Hide format options for file mode
+    // Format options only apply to text files (binary files are saved as .dat)
     if (formatArea) {
-      formatArea.style.display = 'none';
+      formatArea.style.display = inputType === 'textfile' ? 'block' : 'none';
     }
   }
 }
@@ -38,7 +38,7 @@ function toggleInputType(cipherName, inputType) {
  * Initialize all cipher tabs to text mode when page loads
  */
 function initializeTabs() {
-  const ciphers = ['shift', 'sub', 'affine', 'vig', 'hill', 'perm', 'playfair', 'otp'];
+  const ciphers = ['shift', 'sub', 'affine', 'vig', 'hill', 'perm', 'playfair', 'otp', 'pipe'];
   ciphers.forEach(cipher => {
     toggleInputType(cipher, 'text');
   });
@@ -81,6 +81,84 @@ function setupTabPersistence() {
   });
 }
 
+/**
+ * Poll status job background (file besar) sampai selesai, lalu tampilkan link download
+ */
+function watchJob() {
+  const job = document.getElementById('job');
+  if (!job) {
+    return;
+  }
+  const bar = document.getElementById('job_progress');
+  const statusText = document.getElementById('job_status');
+  const cancelButton = document.getElementById('job_cancel');
+  const downloadLink = document.getElementById('job_download');
+
+  cancelButton.addEventListener('click', function() {
+    fetch(job.dataset.cancelUrl, { method: 'POST' });
+  });
+
+  function poll() {
+    fetch(job.dataset.statusUrl)
+      .then(response => response.json())
+      .then(status => {
+        bar.style.width = status.progress + '%';
+        bar.textContent = status.progress + '%';
+        statusText.textContent = status.error ? status.status + ': ' + status.error : status.status;
+        if (status.status === 'done') {
+          cancelButton.style.display = 'none';
+          downloadLink.href = status.download_url;
+          downloadLink.textContent = 'Download ' + status.filename;
+          downloadLink.style.display = 'inline-block';
+        } else if (status.status === 'failed' || status.status === 'cancelled') {
+          cancelButton.style.display = 'none';
+        } else {
+          setTimeout(poll, 1000);
+        }
+      });
+  }
+  poll();
+}
+
+/**
+ * Hasil text panjang: tampilkan halaman lain dari server saat tombol Prev/Next diklik
+ */
+function setupResultPages() {
+  const pager = document.getElementById('result_pages');
+  if (!pager) {
+    return;
+  }
+  const text = document.getElementById('result_text');
+  const label = document.getElementById('result_page_label');
+  const prevButton = document.getElementById('result_prev');
+  const nextButton = document.getElementById('result_next');
+  const pages = parseInt(pager.dataset.pages, 10);
+  let current = 0;
+
+  function show(page) {
+    prevButton.disabled = nextButton.disabled = true;
+    fetch(pager.dataset.pageUrl + '&page=' + page)
+      .then(response => response.json())
+      .then(result => {
+        if (result.error) {
+          label.textContent = result.error;
+          return;
+        }
+        current = result.page;
+        text.value = result.text;
+        text.scrollTop = 0;
+        label.textContent = 'Page ' + (current + 1) + ' / ' + pages;
+      })
+      .finally(() => {
+        prevButton.disabled = current === 0;
+        nextButton.disabled = current === pages - 1;
+      });
+  }
+
+  prevButton.addEventListener('click', () => show(current - 1));
+  nextButton.addEventListener('click', () => show(current + 1));
+}
+
 /**
  * Initialize the application when DOM is fully loaded
  */
@@ -90,6 +168,12 @@ document.addEventListener('DOMContentLoaded', function() {
   
   // Set up tab persistence
   setupTabPersistence();
+
+  // Follow background job progress, if any
+  watchJob();
+
+  // Paging for long text results
+  setupResultPages();
 });
 
 /**
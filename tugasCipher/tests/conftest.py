@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Test dijalankan dari folder mana pun: app.py, cli.py dan analysis.py ada di folder induk
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
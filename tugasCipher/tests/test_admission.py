@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import app
+
+MB = app.MB
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """Budget kecil (10 MB, 5 detik CPU) dengan antrean singkat"""
+    control = app.AdmissionControl(max_memory=10 * MB, max_cpu=5.0, queue_timeout=0.05, max_waiting=1)
+    monkeypatch.setattr(app, "ADMISSION", control)
+    return control
+
+
+def test_acquire_and_release(admission):
+    ticket = admission.acquire(app.RequestCost(4 * MB, 1.0))
+    assert admission.stats()['memory_used'] == 4 * MB and admission.stats()['in_flight'] == 1
+    ticket.release()
+    ticket.release()   # boleh dipanggil berkali-kali
+    assert admission.stats()['memory_used'] == 0 and admission.stats()['in_flight'] == 0
+
+
+def test_busy_rejected_with_retry_after(admission):
+    with admission.admit(app.RequestCost(8 * MB, 4.0)):
+        with pytest.raises(app.Overloaded) as e:
+            admission.acquire(app.RequestCost(4 * MB, 0.1))
+        assert e.value.status == 429 and int(e.value.headers()["Retry-After"]) >= 1
+        with pytest.raises(app.Overloaded):
+            admission.acquire(app.RequestCost(1 * MB, 2.0))
+    assert admission.stats()['rejected'] == {'timeout': 2}
+    assert admission.stats()['in_flight'] == 0
+
+
+def test_too_large_rejected_with_413(admission):
+    with pytest.raises(app.Overloaded) as e:
+        admission.acquire(app.RequestCost(11 * MB, 0.1))
+    assert e.value.status == 413 and e.value.headers() == {}
+    # CPU dibatasi ke budget: request lama yang sendirian tetap boleh jalan
+    with admission.admit(app.RequestCost(1 * MB, 100.0)) as ticket:
+        assert ticket.cost.cpu == 5.0
+
+
+def test_waiter_admitted_after_release(admission):
+    admission.queue_timeout = 5
+    ticket = admission.acquire(app.RequestCost(8 * MB, 1.0))
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(admission.acquire(app.RequestCost(4 * MB, 1.0))))
+    waiter.start()
+    while admission.stats()['waiting'] == 0:
+        time.sleep(0.001)
+    # Antrean penuh (max_waiting=1): request berikutnya langsung ditolak
+    with pytest.raises(app.Overloaded):
+        admission.acquire(app.RequestCost(4 * MB, 1.0))
+    assert admission.stats()['rejected'] == {'queue_full': 1}
+    ticket.release()
+    waiter.join(5)
+    assert admitted and admission.stats()['queued'] == 1
+    admitted[0].release()
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_api_busy_429(admission, client):
+    with admission.admit(app.RequestCost(9 * MB, 4.0)):
+        r = client.post("/api/v1/shift/encrypt?key=3", data=bytes(1024 * 1024),
+                        content_type="application/octet-stream")
+        assert r.status_code == 429 and int(r.headers["Retry-After"]) >= 1
+        r = client.post("/", data={"cipher": "shift", "action": "Encrypt", "input_type": "text",
+                                   "input_text": "x" * MB, "shift_key": "3"})
+        assert r.status_code == 429 and "Retry-After" in r.headers
+    assert admission.stats()['in_flight'] == 0
+
+
+def test_api_too_large_413(admission, client):
+    r = client.post("/api/v1/hill/encrypt?matrix=3 3; 2 5", data=bytes(4 * MB),
+                    content_type="application/octet-stream")
+    assert r.status_code == 413 and "Retry-After" not in r.headers
+
+
+def test_api_releases_ticket(admission, client):
+    r = client.post("/api/v1/shift/encrypt?key=3", data=b"abc", content_type="application/octet-stream")
+    assert admission.stats()['in_flight'] == 1   # sampai response selesai dikirim
+    r.close()
+    assert admission.stats()['in_flight'] == 0
+    # Error setelah ticket diambil
+    for path in ("/api/v1/shift/encrypt?key=x", "/api/v1/shift/decrypt?key=3"):
+        r = client.post(path, data=app.CONTAINER_MAGIC + b"\x02", content_type="application/octet-stream")
+        assert r.status_code == 400
+        r.close()
+    assert admission.stats()['in_flight'] == 0 and admission.stats()['admitted'] == 3
+
+
+def test_batch_releases_ticket(admission, client):
+    r = client.post("/api/v1/batch", json={"jobs": []})
+    r.close()
+    client.post("/api/v1/batch", data=b"[]", content_type="application/json").close()
+    assert admission.stats()['in_flight'] == 0
+
+
+def test_batch_releases_ticket_when_body_too_large(admission, client, monkeypatch):
+    # Regression: get_json yang gagal (body melebihi MAX_CONTENT_LENGTH) menahan ticket
+    def too_large(self, *args, **kwargs):
+        raise RequestEntityTooLarge()
+    monkeypatch.setattr(app.app.request_class, "get_json", too_large)
+    monkeypatch.setitem(app.app.config, "MAX_CONTENT_LENGTH", 16 * MB)
+    r = client.post("/api/v1/batch", json={"jobs": []})
+    assert r.status_code == 413
+    assert admission.stats()['in_flight'] == 0 and admission.stats()['admitted'] == 1
+
+
+def test_analyze_releases_ticket(admission, client):
+    r = client.post("/api/v1/analyze/shift", data="KHOOR ZRUOG", content_type="text/plain")
+    assert r.status_code == 200
+    r.close()
+    assert admission.stats()['in_flight'] == 0
@@ -0,0 +1,55 @@
+import pytest
+
+import analysis
+import app
+
+PLAIN = ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+         "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+         "incredulity, it was the season of Light, it was the season of Darkness.")
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def analyze(client, cipher, text, query=""):
+    return client.post(f"/api/v1/analyze/{cipher}?{query}", data=text, content_type="text/plain")
+
+
+def test_breaks_shift_and_vigenere(client):
+    r = analyze(client, "shift", app.shift_text(PLAIN, 7), "top=1")
+    assert r.status_code == 200 and r.json["candidates"][0]["key"] == 7
+    r = analyze(client, "vigenere", app.vigenere_text(PLAIN, "LEMON"), "max_length=200000")
+    assert r.status_code == 200 and r.json["candidates"][0]["key"] == "LEMON"
+
+
+@pytest.mark.parametrize("cipher, query, message", [
+    ("shift", "max_length=5", "not supported for 'shift'"),
+    ("affine", "restarts=2", "not supported for 'affine'"),
+    ("vigenere", "rounds=2", "not supported for 'vig'"),
+    ("substitution", "max_length=5", "not supported for 'sub'"),
+    ("shift", "foo=1", "Unknown option 'foo'"),
+    ("substitution", "rounds=51", "too large"),
+    ("substitution", "top=0", "at least 1"),
+    ("shift", "top=x", "must be an integer"),
+])
+def test_rejects_unsupported_options(client, cipher, query, message):
+    r = analyze(client, cipher, PLAIN, query)
+    assert r.status_code == 400 and message in r.json["error"]
+
+
+def test_key_length_is_clamped():
+    codes = analysis.letter_codes(PLAIN * 50)
+    assert max(analysis.key_length_scores(codes, 10 ** 6)) == analysis.KEY_LENGTH_LIMIT
+    assert max(analysis.kasiski(codes, 10 ** 6)) == analysis.KEY_LENGTH_LIMIT
+    assert max(analysis.kasiski(analysis.letter_codes("ABCDABCDAB"), 10 ** 6)) == 5
+
+
+def test_substitution_pool_is_shared_per_worker_count():
+    text = app.substitution(PLAIN, "QWERTYUIOPASDFGHJKLZXCVBNM")
+    analysis.break_substitution(text, 1, restarts=2, rounds=1, workers=2)
+    pool = analysis.climb_pool(2)
+    analysis.break_substitution(text, 1, restarts=2, rounds=1, workers=2)
+    assert analysis.climb_pool(2) is pool
+    assert pool._mp_context.get_start_method() == "spawn"
@@ -0,0 +1,120 @@
+import base64
+import os
+import struct
+from urllib.parse import urlencode
+
+import pytest
+
+import app
+
+CASES = [
+    ("shift", {"key": "3"}),
+    ("vigenere", {"key": "LEMON"}),
+    ("affine", {"a": "5", "b": "8"}),
+    ("hill", {"matrix": "3 3; 2 5"}),
+    ("permutation", {"key": "3 1 2"}),
+    ("playfair", {"key": "MONARCHY"}),
+    ("otp", {"key": base64.b64encode(os.urandom(5000)).decode()}),
+    ("pipeline", {"pipeline": "vig LEMON | perm 3 1 2"}),
+]
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def post(client, cipher, action, params, data, content_type="application/octet-stream"):
+    r = client.post(f"/api/v1/{cipher}/{action}?{urlencode(params)}", data=data, content_type=content_type)
+    body = r.data
+    r.close()   # melepas ticket admission (call_on_close)
+    return r, body
+
+
+@pytest.mark.parametrize("cipher, params", CASES)
+def test_binary_roundtrip(client, cipher, params):
+    data = os.urandom(4097)
+    r, encrypted = post(client, cipher, "encrypt", params, data)
+    assert r.status_code == 200, encrypted
+    r, decrypted = post(client, cipher, "decrypt", params, encrypted)
+    assert r.status_code == 200
+    # Permutation mem-pad blok terakhir dengan byte 0
+    assert decrypted[:len(data)] == data
+
+
+@pytest.mark.parametrize("cipher, params", CASES)
+def test_container_roundtrip_and_range(client, cipher, params):
+    data = os.urandom(4097)
+    r, encrypted = post(client, cipher, "encrypt", {**params, "container": "1", "filename": "x.bin"}, data)
+    assert encrypted.startswith(app.CONTAINER_MAGIC)
+    r, decrypted = post(client, cipher, "decrypt", params, encrypted)
+    assert decrypted == data
+    if cipher != "playfair":
+        r, part = post(client, cipher, "decrypt", {**params, "range": "100-199"}, encrypted)
+        assert part == data[100:200]
+
+
+def test_text_mode(client):
+    r, body = post(client, "vigenere", "encrypt", {"key": "LEMON", "format": "groups"},
+                   "attack at dawn", "text/plain")
+    assert body == b"LXFOP VEFRN HR"
+    r, body = post(client, "vigenere", "decrypt", {"key": "LEMON"}, "LXFOPVEFRNHR", "text/plain")
+    assert body == b"ATTACKATDAWN"
+
+
+def test_key_from_header(client):
+    r = client.post("/api/v1/shift/encrypt", data=b"\x00\x01", headers={"X-Cipher-Key": "2"},
+                    content_type="application/octet-stream")
+    assert r.data == b"\x02\x03"
+    r.close()
+
+
+@pytest.mark.parametrize("path, params, status", [
+    ("/api/v1/nope/encrypt", {}, 404),
+    ("/api/v1/shift/scramble", {"key": "1"}, 404),
+    ("/api/v1/shift/encrypt", {}, 400),
+    ("/api/v1/affine/encrypt", {"a": "2", "b": "1"}, 400),
+])
+def test_errors(client, path, params, status):
+    r = client.post(f"{path}?{urlencode(params)}", data=b"abc", content_type="application/octet-stream")
+    assert r.status_code == status and "error" in r.json
+
+
+def parse_batch(body):
+    results, pos = [], 0
+    while pos < len(body):
+        status, length = body[pos], struct.unpack(">I", body[pos + 1:pos + 5])[0]
+        results.append((status, body[pos + 5:pos + 5 + length]))
+        pos += 5 + length
+    return results
+
+
+def test_batch_roundtrip(client):
+    data = os.urandom(1000)
+    jobs = [
+        {"cipher": "shift", "action": "encrypt", "mode": "text", "data": "HELLO", "params": {"key": 3}},
+        {"cipher": "vigenere", "action": "encrypt", "data": base64.b64encode(data).decode(),
+         "params": {"key": "KEY"}},
+        {"cipher": "unknown", "action": "encrypt", "data": ""},
+        {"cipher": "shift", "action": "encrypt", "data": "not base64!", "params": {"key": 1}},
+    ]
+    r = client.post("/api/v1/batch", json={"jobs": jobs})
+    assert r.status_code == 200 and r.headers["X-Batch-Count"] == "4"
+    results = parse_batch(r.data)
+    r.close()
+    assert results[0] == (0, b"KHOOR")
+    assert results[1][0] == 0 and len(results[1][1]) == len(data)
+    assert results[2][0] == 1 and results[3][0] == 1
+
+    back = {"cipher": "vigenere", "action": "decrypt", "data": base64.b64encode(results[1][1]).decode(),
+            "params": {"key": "KEY"}}
+    r = client.post("/api/v1/batch", json={"jobs": [back]})
+    assert parse_batch(r.data) == [(0, data)]
+    r.close()
+
+
+def test_batch_rejects_bad_body(client):
+    assert client.post("/api/v1/batch", data=b"{not json", content_type="application/json").status_code == 400
+    too_many = {"jobs": [{}] * (app.API_MAX_BATCH_JOBS + 1)}
+    assert client.post("/api/v1/batch", json=too_many).status_code == 413
+    assert app.ADMISSION.stats()["in_flight"] == 0
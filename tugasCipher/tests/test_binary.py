@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import app
+
+LENGTHS = [0, 1, 7, 26, 1000, 4099]
+KEY = "QWERTYUIOPASDFGHJKLZXCVBNM"
+
+
+# Implementasi per byte (versi sebelum engine NumPy) sebagai referensi
+def ref_shift(data, key, enc):
+    return bytes((b + (key if enc else -key)) % 256 for b in data)
+
+def ref_vigenere(data, key, enc):
+    shifts = [int((app.char_to_num(c) / 25) * 255) for c in key.upper()]
+    sign = 1 if enc else -1
+    return bytes((b + sign * shifts[i % len(shifts)]) % 256 for i, b in enumerate(data))
+
+def ref_substitution(data, key, enc):
+    if not enc:
+        reverse = [""] * 26
+        for i, c in enumerate(key):
+            reverse[app.char_to_num(c)] = app.ascii_uppercase[i]
+        key = "".join(reverse)
+    return bytes(((b // 26) * 26 + app.char_to_num(key[b % 26])) % 256 for b in data)
+
+def ref_affine(data, a, b, enc):
+    if enc:
+        return bytes((a * x + b) % 256 for x in data)
+    a_inv = app.mod_inverse(a, 256)
+    return bytes((a_inv * (x - b)) % 256 for x in data)
+
+def ref_permutation(data, key_nums, enc):
+    n = len(key_nums)
+    data = bytes(data) + b"\0" * (-len(data) % n)
+    out = bytearray(len(data))
+    for i in range(0, len(data), n):
+        for j, k in enumerate(key_nums):
+            if enc:
+                out[i + k - 1] = data[i + j]
+            else:
+                out[i + j] = data[i + k - 1]
+    return bytes(out)
+
+def ref_otp(data, key, enc):
+    sign = 1 if enc else -1
+    return bytes((b + sign * key[i]) % 256 for i, b in enumerate(data))
+
+
+CASES = [
+    ("shift", (77,), ref_shift),
+    ("vig", ("LEMON",), ref_vigenere),
+    ("sub", (KEY,), ref_substitution),
+    ("affine", (5, 8), ref_affine),
+    ("perm", ([3, 1, 4, 2],), ref_permutation),
+]
+
+
+@pytest.mark.parametrize("cipher, args, reference", CASES)
+@pytest.mark.parametrize("length", LENGTHS)
+@pytest.mark.parametrize("enc", [True, False])
+def test_matches_bytewise_reference(cipher, args, reference, length, enc):
+    data = os.urandom(length)
+    result = app.PROCESSORS[cipher](data, *args, enc=enc, is_binary=True)
+    assert bytes(result) == reference(data, *args, enc)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_otp_matches_reference(length):
+    data, key = os.urandom(length), os.urandom(length + 5)
+    for enc in (True, False):
+        assert bytes(app.process_otp(data, key, enc=enc, is_binary=True)) == ref_otp(data, key, enc)
+    with pytest.raises(ValueError):
+        app.process_otp(data + b"x" * 6, key, is_binary=True)
+
+
+@pytest.mark.parametrize("cipher, args", [
+    ("shift", (200,)),
+    ("vig", ("KEY",)),
+    ("affine", (5, 8)),
+    ("hill", ([[3, 3], [2, 5]],)),
+    ("hill", ([[6, 24, 1], [13, 16, 10], [20, 17, 15]],)),
+    ("perm", ([3, 1, 2],)),
+    ("playfair", ("MONARCHY",)),
+    ("otp", (bytes(range(256)) * 20,)),
+])
+@pytest.mark.parametrize("length", LENGTHS)
+def test_binary_roundtrip(cipher, args, length):
+    data = os.urandom(length)
+    encrypted = app.PROCESSORS[cipher](data, *args, enc=True, is_binary=True)
+    decrypted = app.PROCESSORS[cipher](bytes(encrypted), *args, enc=False, is_binary=True)
+    # Permutation mem-pad blok terakhir dengan byte 0
+    assert bytes(decrypted)[:length] == data
@@ -0,0 +1,129 @@
+import io
+import os
+
+import pytest
+
+import app
+import cli
+
+
+@pytest.fixture
+def pads(tmp_path, monkeypatch):
+    """Pad store sementara dengan satu pad 'p1' (64 KB)"""
+    directory = tmp_path / "pads"
+    directory.mkdir()
+    (directory / "p1").write_bytes(os.urandom(64 * 1024))
+    # Worker CLI di-fork, jadi ikut memakai pad store ini
+    monkeypatch.setattr(app, "PADS", app.PadStore(str(directory)))
+    return directory
+
+
+def make_tree(root):
+    """Beberapa file di folder bersarang; Returns: {path relatif: isi}"""
+    files = {
+        "a.bin": os.urandom(3000),
+        "docs/b.txt": b"Hello, World\n" * 50,
+        "docs/deep/c.bin": bytes(range(256)) * 8,
+        "empty.bin": b"",
+    }
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return files
+
+
+def test_pad_roundtrip(tmp_path, pads):
+    files = make_tree(tmp_path / "src")
+    assert cli.main(["encrypt", "--cipher", "otp", "--pad", "p1", "--workers", "1",
+                     str(tmp_path / "src"), "-o", str(tmp_path / "enc")]) == 0
+    assert cli.main(["decrypt", "--cipher", "otp", "--pad", "p1", "--workers", "1",
+                     str(tmp_path / "enc"), "-o", str(tmp_path / "dec")]) == 0
+    for rel, data in files.items():
+        assert (tmp_path / "dec" / rel).read_bytes() == data
+    # Setiap file memakai bagian pad sendiri
+    assert app.PADS.stats("p1")["used"] == sum(len(d) for d in files.values())
+
+
+@pytest.mark.parametrize("key_args", [
+    ["--cipher", "vigenere", "--key", "RAHASIA"],
+    ["--cipher", "hill", "--matrix", "3 3; 2 5"],
+    ["--cipher", "pipeline", "--pipeline", "vig LEMON | perm 3 1 2"],
+])
+def test_tree_roundtrip(tmp_path, key_args):
+    files = make_tree(tmp_path / "src")
+    assert cli.main(["encrypt", *key_args, "--workers", "1",
+                     str(tmp_path / "src"), "-o", str(tmp_path / "enc")]) == 0
+    # Struktur folder dipertahankan, file hasil berakhiran .dat
+    for rel in files:
+        assert (tmp_path / "enc" / (rel + ".dat")).is_file()
+    assert cli.main(["decrypt", *key_args, "--workers", "1",
+                     str(tmp_path / "enc"), "-o", str(tmp_path / "dec")]) == 0
+    for rel, data in files.items():
+        assert (tmp_path / "dec" / rel).read_bytes() == data
+
+
+def run_encrypt(tmp_path, capsys, *extra):
+    code = cli.main(["encrypt", "--cipher", "shift", "--key", "3", "--workers", "1", *extra,
+                     str(tmp_path / "src"), "-o", str(tmp_path / "enc")])
+    return code, capsys.readouterr().err
+
+
+def test_manifest_skips_unchanged_files(tmp_path, capsys):
+    files = make_tree(tmp_path / "src")
+    code, err = run_encrypt(tmp_path, capsys)
+    assert code == 0 and f"{len(files)} processed, 0 skipped" in err
+    assert (tmp_path / "enc" / cli.MANIFEST_NAME).is_file()
+    
+    code, err = run_encrypt(tmp_path, capsys)
+    assert code == 0 and f"0 processed, {len(files)} skipped" in err
+    
+    # File yang berubah (atau output-nya hilang) diproses ulang, sisanya dilewati
+    (tmp_path / "src" / "a.bin").write_bytes(b"changed")
+    os.remove(tmp_path / "enc" / "docs" / "b.txt.dat")
+    code, err = run_encrypt(tmp_path, capsys)
+    assert code == 0 and f"2 processed, {len(files) - 2} skipped" in err
+    
+    # Key lain = setting lain: manifest lama tidak berlaku
+    code = cli.main(["encrypt", "--cipher", "shift", "--key", "4", "--workers", "1",
+                     str(tmp_path / "src"), "-o", str(tmp_path / "enc")])
+    assert code == 0 and f"{len(files)} processed, 0 skipped" in capsys.readouterr().err
+    
+    code, err = run_encrypt(tmp_path, capsys, "--force")
+    assert code == 0 and f"{len(files)} processed, 0 skipped" in err
+
+
+def test_manifest_resumes_after_failure(tmp_path, capsys):
+    (tmp_path / "enc").mkdir(parents=True)
+    (tmp_path / "enc" / "good.bin.dat").write_bytes(
+        b"".join(app.process_cipher_file(io.BytesIO(b"data"), "good.bin", "shift", (3,), True)[1]))
+    (tmp_path / "enc" / "bad.bin.dat").write_bytes(b"not a cipher file")
+    args = ["decrypt", "--cipher", "shift", "--key", "3", "--workers", "1",
+            str(tmp_path / "enc"), "-o", str(tmp_path / "dec")]
+    assert cli.main(args) == 1
+    assert "1 processed, 0 skipped, 1 failed" in capsys.readouterr().err
+    # Run berikutnya hanya mencoba ulang file yang gagal
+    assert cli.main(args) == 1
+    assert "0 processed, 1 skipped, 1 failed" in capsys.readouterr().err
+    assert (tmp_path / "dec" / "good.bin").read_bytes() == b"data"
+
+
+def run_stdin(monkeypatch, capsysbinary, argv, data):
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data)))
+    assert cli.main(argv) == 0
+    return capsysbinary.readouterr().out
+
+
+def test_stdin_stdout_roundtrip(monkeypatch, capsysbinary):
+    data = os.urandom(5000)
+    key = ["--cipher", "affine", "--a", "5", "--b", "8"]
+    encrypted = run_stdin(monkeypatch, capsysbinary, ["encrypt", *key, "--name", "x.bin", "-"], data)
+    assert encrypted.startswith(app.CONTAINER_MAGIC)
+    assert run_stdin(monkeypatch, capsysbinary, ["decrypt", *key, "-"], encrypted) == data
+
+
+def test_stdin_pad_roundtrip(monkeypatch, capsysbinary, pads):
+    data = os.urandom(5000)
+    key = ["--cipher", "otp", "--pad", "p1"]
+    encrypted = run_stdin(monkeypatch, capsysbinary, ["encrypt", *key, "-"], data)
+    assert run_stdin(monkeypatch, capsysbinary, ["decrypt", *key, "-"], encrypted) == data
@@ -0,0 +1,94 @@
+import io
+import os
+
+import pytest
+
+import app
+
+CASES = [
+    ("shift", (3,)),
+    ("vig", ("LEMON",)),
+    ("affine", (5, 8)),
+    ("hill", ([[3, 3], [2, 5]],)),
+    ("perm", ([3, 1, 4, 2],)),
+    ("otp", (os.urandom(5000),)),
+]
+
+
+def encrypt(data, cipher, args, frame_size=100, params=None):
+    """File cipher v2 dengan frame kecil, supaya data terbagi ke banyak frame"""
+    result = app.run_cipher(cipher, args, data, True, True)
+    return app.create_cipher_file("data.bin", result, cipher, len(data), frame_size, params)
+
+
+def decrypt(blob, cipher, args):
+    name, chunks = app.process_cipher_file(io.BytesIO(blob), "", cipher, args, False)
+    return name, b''.join(chunks)
+
+
+@pytest.mark.parametrize("cipher, args", CASES)
+def test_roundtrip(cipher, args):
+    data = os.urandom(1001)
+    name, chunks = app.process_cipher_file(io.BytesIO(data), "data.bin", cipher, args, True,
+                                           {"note": "x"})
+    blob = b''.join(chunks)
+    header = app.read_cipher_header(io.BytesIO(blob))
+    assert (header.version, header.cipher, header.filename, header.size) == (2, cipher, "data.bin", 1001)
+    assert header.params["note"] == "x"
+    assert decrypt(blob, cipher, args) == ("data.bin", data)
+
+
+def test_header_roundtrip():
+    header = app.container_header("ä.txt", "vig", 10, 12, 64, {"block": 3})
+    parsed = app.read_cipher_header(io.BytesIO(header + b"rest"))
+    assert parsed == app.CipherHeader(2, "vig", {"block": 3}, "ä.txt", 10, 12, 64)
+
+
+@pytest.mark.parametrize("cut", [5, 30, 60, 200, 1])
+def test_truncated_file_rejected(cut):
+    blob = encrypt(os.urandom(1000), "vig", ("LEMON",))
+    with pytest.raises(ValueError, match="truncated"):
+        decrypt(blob[:-cut], "vig", ("LEMON",))
+
+
+def test_corrupted_header_and_frame():
+    blob = bytearray(encrypt(os.urandom(1000), "shift", (3,)))
+    header_end = len(app.container_header("data.bin", "shift", 1000, 1000, 100))
+    corrupt = bytes(blob[:8]) + b"X" + bytes(blob[9:])
+    with pytest.raises(ValueError, match="header is corrupted"):
+        decrypt(corrupt, "shift", (3,))
+    blob[header_end + app.FRAME_HEAD.size + 5] ^= 1
+    with pytest.raises(ValueError, match="CRC mismatch"):
+        decrypt(bytes(blob), "shift", (3,))
+
+
+def test_wrong_cipher_rejected():
+    blob = encrypt(os.urandom(100), "shift", (3,))
+    with pytest.raises(ValueError, match="'shift' cipher"):
+        decrypt(blob, "vig", ("LEMON",))
+
+
+@pytest.mark.parametrize("cipher, args", CASES)
+@pytest.mark.parametrize("start, end", [(0, 1000), (0, 1), (99, 101), (150, 480), (950, 2000), (500, 500)])
+def test_decrypt_range(cipher, args, start, end):
+    data = os.urandom(1000)
+    blob = encrypt(data, cipher, args)
+    assert app.decrypt_range(io.BytesIO(blob), cipher, args, start, end) == data[start:end]
+
+
+def test_decrypt_range_needs_v2():
+    legacy = (8).to_bytes(4, "big") + b"data.bin" + app.run_cipher("shift", (3,), b"abc", True, True)
+    with pytest.raises(ValueError, match="v2"):
+        app.decrypt_range(io.BytesIO(legacy), "shift", (3,), 0, 2)
+    with pytest.raises(ValueError, match="range decryption"):
+        app.decrypt_range(io.BytesIO(legacy), "playfair", ("KEY",), 0, 2)
+
+
+@pytest.mark.parametrize("cipher, args", CASES)
+def test_legacy_file_still_readable(cipher, args):
+    data = os.urandom(1000)
+    encrypted = app.run_cipher(cipher, args, data, True, True)
+    legacy = (7).to_bytes(4, "big") + b"old.bin" + encrypted
+    name, result = decrypt(legacy, cipher, args)
+    assert name == "old.bin" and result[:len(data)] == data
+    assert app.extract_from_cipher_file(legacy) == ("old.bin", encrypted)
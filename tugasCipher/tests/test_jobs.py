@@ -0,0 +1,147 @@
+import io
+import itertools
+import threading
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    # Job untuk file di bawah STREAM_THRESHOLD: diproses lewat jalur in-place (readinto)
+    config = {k: app.app.config[k] for k in ("JOB_THRESHOLD", "STREAM_THRESHOLD")}
+    app.app.config.update(JOB_THRESHOLD=1024, STREAM_THRESHOLD=1024 * 1024)
+    yield app.app.test_client()
+    app.app.config.update(config)
+
+
+def wait(client, job_id):
+    for _ in range(200):
+        status = client.get(f"/jobs/{job_id}").json
+        if status["status"] not in ("queued", "running"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.parametrize("cipher, key", [("shift", "3"), ("vigenere", "KEY"), ("perm", "3 1 2")])
+def test_inplace_job_roundtrip(client, cipher, key):
+    data = bytes(range(256)) * 400
+    r = client.post(f"/api/v1/{cipher}/encrypt?key={key}&async=1", data=data)
+    assert r.status_code == 202
+    status = wait(client, r.json["id"])
+    assert status["status"] == "done", status["error"]
+    assert status["bytes_done"] == len(data)
+    encrypted = client.get(status["download_url"]).data
+    
+    r = client.post(f"/api/v1/{cipher}/decrypt?key={key}&async=1", data=encrypted)
+    status = wait(client, r.json["id"])
+    assert status["status"] == "done", status["error"]
+    assert client.get(status["download_url"]).data == data
+
+
+def test_progress_file_readinto_cancelled():
+    job = app.Job(10)
+    f = app.ProgressFile(io.BytesIO(b"0123456789"), job)
+    buf = bytearray(4)
+    assert f.readinto(buf) == 4 and job.done == 4
+    job.cancelled.set()
+    with pytest.raises(app.JobCancelled):
+        f.readinto(buf)
+
+
+@pytest.fixture
+def queue():
+    jobs = app.JobQueue(workers=1, max_pending=2, ttl=60)
+    yield jobs
+    jobs._executor.shutdown(wait=True)
+
+
+def blocking_work(started, release):
+    """work() yang menghasilkan chunk terus sampai release di-set"""
+    def work(job):
+        def chunks():
+            started.set()
+            while not release.is_set():
+                yield b"x"
+                time.sleep(0.01)
+        return "out.bin", chunks()
+    return work
+
+
+def test_cancel_running_and_queued_job(queue):
+    started, release = threading.Event(), threading.Event()
+    cleaned = []
+    running = queue.submit(blocking_work(started, release), 10, cleanup=lambda: cleaned.append(1))
+    queued = queue.submit(blocking_work(threading.Event(), release), 10)
+    assert started.wait(5)
+    assert (running.status, queued.status) == ("running", "queued")
+    
+    assert queue.cancel(queued.id).status == "cancelled"
+    queue.cancel(running.id)
+    running.future.result(5)
+    assert running.status == "cancelled" and running.token is None
+    assert cleaned == [1]
+    # Job yang sudah selesai tidak berubah lagi
+    assert queue.cancel(running.id).status == "cancelled"
+    assert queue.cancel("missing") is None
+
+
+def test_max_pending(queue):
+    started, release = threading.Event(), threading.Event()
+    for _ in range(2):
+        queue.submit(blocking_work(started, release), 10)
+    with pytest.raises(ValueError, match="Too many queued jobs"):
+        queue.submit(blocking_work(started, release), 10)
+    release.set()
+
+
+def test_failed_job_reports_error(queue):
+    def work(job):
+        raise ValueError("boom")
+    job = queue.submit(work, 10)
+    job.future.result(5)
+    assert job.to_dict()["status"] == "failed" and job.to_dict()["error"] == "boom"
+
+
+def test_finished_jobs_expire(queue):
+    job = queue.submit(lambda job: ("out.bin", [b"data"]), 4)
+    job.future.result(5)
+    assert queue.get(job.id) is job
+    job.finished -= queue.ttl
+    assert queue.get(job.id) is None
+
+
+def test_api_failed_job(client):
+    r = client.post("/api/v1/shift/decrypt?key=3&async=1", data=b"not a cipher file" * 100)
+    status = wait(client, r.json["id"])
+    assert status["status"] == "failed" and status["error"]
+    assert "download_url" not in status
+    assert client.get(f"/jobs/{status['id']}/download").status_code == 404
+
+
+def test_api_cancel_job(client, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    original = app.process_cipher_file
+    
+    def slow(*args, **kwargs):
+        name, chunks = original(*args, **kwargs)
+        return name, itertools.chain(blocking_work(started, release)(None)[1], chunks)
+    monkeypatch.setattr(app, "process_cipher_file", slow)
+    
+    r = client.post("/api/v1/shift/encrypt?key=3&async=1", data=bytes(4096))
+    assert started.wait(5)
+    assert client.post(f"/jobs/{r.json['id']}/cancel").json["status"] in ("running", "cancelled")
+    assert wait(client, r.json["id"])["status"] == "cancelled"
+
+
+@pytest.mark.parametrize("method, path", [
+    ("get", "/jobs/missing"),
+    ("post", "/jobs/missing/cancel"),
+    ("get", "/jobs/missing/download"),
+])
+def test_unknown_job(client, method, path):
+    r = getattr(client, method)(path)
+    assert r.status_code == 404 and "error" in r.json
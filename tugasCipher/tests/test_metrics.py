@@ -0,0 +1,62 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def profiling(tmp_path, monkeypatch):
+    """Profiling aktif dengan secret 's3cret', hasil .prof ke tmp_path"""
+    monkeypatch.setitem(app.app.config, "PROFILE_SECRET", "s3cret")
+    monkeypatch.setitem(app.app.config, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_profile_written(profiling):
+    client = app.app.test_client()
+    r = client.get("/stats/admission", headers={"X-Profile": "s3cret"})
+    assert (profiling / r.headers["X-Profile-File"]).is_file()
+    assert "X-Profile-File" not in client.get("/stats/admission", headers={"X-Profile": "wrong"}).headers
+    assert not app._profile_lock.locked()
+
+
+@pytest.mark.parametrize("propagate", [True, False])
+def test_profile_lock_released_after_exception(profiling, monkeypatch, propagate):
+    # Regression: after_request tidak jalan kalau exception di-propagate, lock profiling tertahan
+    def broken():
+        raise RuntimeError("boom")
+    monkeypatch.setitem(app.app.view_functions, "key_cache", broken)
+    monkeypatch.setitem(app.app.config, "PROPAGATE_EXCEPTIONS", propagate)
+    client = app.app.test_client()
+    if propagate:
+        with pytest.raises(RuntimeError):
+            client.get("/stats/key_cache", headers={"X-Profile": "s3cret"})
+    else:
+        assert client.get("/stats/key_cache", headers={"X-Profile": "s3cret"}).status_code == 500
+    assert not app._profile_lock.locked()
+    assert "X-Profile-File" in client.get("/stats/admission", headers={"X-Profile": "s3cret"}).headers
+
+
+def test_label_value_escaping():
+    assert app.label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+    timer = app.StageTimer('x"y', "encrypt")
+    timer.seconds["cipher"] = 0.002
+    timer.bytes["read"] = 10
+    metrics = app.Metrics()
+    metrics.record(timer)
+    text = metrics.render()
+    assert 'cipher_stage_bytes_total{stage="read",cipher="x\\"y",direction="encrypt"} 10' in text
+    assert 'cipher_stage_seconds_bucket{stage="cipher",cipher="x\\"y",direction="encrypt",le="0.005"} 1' in text
+    assert 'le="+Inf"} 1' in text
+
+
+def test_unknown_cipher_label(monkeypatch):
+    monkeypatch.setattr(app, "METRICS", app.Metrics())
+    client = app.app.test_client()
+    client.post("/", data={"cipher": 'evil"}\nx', "action": "Encrypt", "input_type": "text",
+                           "input_text": "hello"})
+    client.post("/", data={"cipher": "shift", "action": "Encrypt", "input_type": "text",
+                           "input_text": "hello", "shift_key": "3"})
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'cipher="unknown",direction="encrypt"' in text
+    assert 'cipher="shift",direction="encrypt"' in text
+    assert "evil" not in text
@@ -0,0 +1,118 @@
+import os
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def pads(tmp_path, monkeypatch):
+    """Pad store sementara dengan pad 'p1' (4 KB binary) dan 't1' (huruf A-Z)"""
+    directory = tmp_path / "pads"
+    directory.mkdir()
+    (directory / "p1").write_bytes(os.urandom(4096))
+    (directory / "t1").write_bytes(bytes(65 + b % 26 for b in os.urandom(4096)))
+    store = app.PadStore(str(directory))
+    monkeypatch.setattr(app, "PADS", store)
+    return store
+
+
+def test_reserve_never_reuses(pads):
+    offset1, key1 = pads.reserve("p1", 100)
+    offset2, key2 = pads.reserve("p1", 50)
+    assert (offset1, offset2) == (0, 100)
+    assert pads.stats("p1") == {'size': 4096, 'used': 150, 'remaining': 3946}
+    # Offset terpakai disimpan di file state, juga untuk instance baru
+    other = app.PadStore(pads.directory)
+    assert other.reserve("p1", 10)[0] == 150
+    assert bytes(other.view("p1", 100, 50)) == bytes(key2)
+
+
+def test_reserve_rejects_exhausted_pad(pads):
+    pads.reserve("p1", 4000)
+    with pytest.raises(ValueError, match="only 96 unused bytes"):
+        pads.reserve("p1", 100)
+    assert pads.stats("p1")['used'] == 4000
+
+
+def test_view_limited_to_used_range(pads):
+    pads.reserve("p1", 100)
+    assert len(pads.view("p1", 0, 100)) == 100
+    for offset, length in [(50, 51), (100, 1), (-1, 10), (0, -1)]:
+        with pytest.raises(ValueError, match="out of range"):
+            pads.view("p1", offset, length)
+
+
+@pytest.mark.parametrize("pad_id", ["", "../p1", ".offsets.json", "missing"])
+def test_invalid_pad_id(pads, pad_id):
+    with pytest.raises(ValueError):
+        pads.reserve(pad_id, 1)
+
+
+def post(client, action, params, data, content_type="application/octet-stream"):
+    r = client.post(f"/api/v1/otp/{action}?{urlencode(params)}", data=data, content_type=content_type)
+    r.get_data()   # body dibaca dulu: container dikirim sebagai generator
+    r.close()
+    return r
+
+
+def test_api_pad_roundtrip(pads):
+    client = app.app.test_client()
+    data = os.urandom(1000)
+    first = post(client, "encrypt", {"pad": "p1"}, data)
+    second = post(client, "encrypt", {"pad": "p1"}, data)
+    assert first.status_code == 200
+    assert (first.headers["X-Otp-Offset"], second.headers["X-Otp-Offset"]) == ("0", "1000")
+    assert first.data != second.data
+    back = post(client, "decrypt", {"pad": "p1", "offset": "1000"}, second.data)
+    assert back.data == data
+    # Offset di luar bagian yang sudah dipakai ditolak
+    assert post(client, "decrypt", {"pad": "p1", "offset": "1500"}, second.data).status_code == 400
+
+
+def test_api_pad_text_roundtrip(pads):
+    client = app.app.test_client()
+    r = post(client, "encrypt", {"pad": "t1"}, "attack at dawn", "text/plain")
+    back = post(client, "decrypt", {"pad": "t1", "offset": r.headers["X-Otp-Offset"]}, r.data, "text/plain")
+    assert back.data == b"ATTACKATDAWN"
+
+
+def test_api_pad_container_records_offset(pads):
+    client = app.app.test_client()
+    data = os.urandom(300)
+    pads.reserve("p1", 10)
+    r = post(client, "encrypt", {"pad": "p1", "container": "1"}, data)
+    assert r.headers["X-Otp-Offset"] == "10"
+    # Offset dibaca dari header container
+    assert post(client, "decrypt", {"pad": "p1"}, r.data).data == data
+
+
+def test_pad_stats_endpoint(pads):
+    client = app.app.test_client()
+    pads.reserve("p1", 10)
+    assert client.get("/api/v1/pads/p1").json == {'size': 4096, 'used': 10, 'remaining': 4086}
+    assert client.get("/api/v1/pads/missing").status_code == 404
+    # Pad ID tidak pernah didaftar
+    assert client.get("/api/v1/pads").status_code == 404
+
+
+def test_api_pad_job_roundtrip(pads):
+    client = app.app.test_client()
+    data = os.urandom(2000)
+
+    def run(action, body):
+        r = client.post(f"/api/v1/otp/{action}?pad=p1&async=1", data=body,
+                        content_type="application/octet-stream")
+        assert r.status_code == 202, r.json
+        for _ in range(200):
+            status = client.get(r.json["status_url"]).json
+            if status["status"] not in ("queued", "running"):
+                break
+            time.sleep(0.05)
+        assert status["status"] == "done", status["error"]
+        return client.get(status["download_url"]).data
+
+    # Job menulis file cipher v2; dekripsi membaca offset pad dari header
+    assert run("decrypt", run("encrypt", data)) == data
@@ -0,0 +1,60 @@
+import io
+import os
+
+import pytest
+
+import app
+
+PIPELINE = app.parse_pipeline("vig LEMON | perm 3 1 2 | hill 3 3; 2 5", True)
+CASES = [
+    ("shift", (3,)),
+    ("vig", ("LEMON",)),
+    ("sub", ("QWERTYUIOPASDFGHJKLZXCVBNM",)),
+    ("affine", (5, 8)),
+    ("hill", ([[3, 3], [2, 5]],)),
+    ("perm", ([3, 1, 4, 2],)),
+    ("otp", (os.urandom(300000),)),
+    ("pipe", (PIPELINE,)),
+]
+
+
+@pytest.fixture(scope="module")
+def parallel():
+    """Mode parallel dengan 3 worker dan threshold kecil, supaya data test dibagi ke pool"""
+    saved = app.PARALLEL_WORKERS, app.PARALLEL_THRESHOLD, app.PARALLEL_WINDOW
+    app.PARALLEL_WORKERS, app.PARALLEL_THRESHOLD, app.PARALLEL_WINDOW = 3, 1000, 64 * 1024
+    yield
+    with app._pool_lock:
+        if app._pool is not None:
+            app._pool.shutdown()
+            app._pool = None
+    app.PARALLEL_WORKERS, app.PARALLEL_THRESHOLD, app.PARALLEL_WINDOW = saved
+
+
+@pytest.mark.parametrize("cipher, args", CASES)
+@pytest.mark.parametrize("enc", [True, False])
+def test_parallel_equals_serial(parallel, cipher, args, enc):
+    # Panjang ganjil: bagian per worker dan blok terakhir tidak sejajar
+    data = os.urandom(250001)
+    assert bytes(app.parallel_binary(data, cipher, args, enc)) == bytes(app.apply_binary(data, cipher, args, enc))
+    # Posisi awal di tengah file (key vigenere/pipeline bergeser)
+    assert (bytes(app.parallel_binary(data, cipher, args, enc, pos=7))
+            == bytes(app.apply_binary(data, cipher, args, enc, pos=7)))
+
+
+def test_parallel_streamed_file_roundtrip(parallel):
+    data = os.urandom(300000)
+    saved = app.app.config["STREAM_THRESHOLD"]
+    app.app.config["STREAM_THRESHOLD"] = 0
+    try:
+        _, chunks = app.process_cipher_file(io.BytesIO(data), "p.bin", "vig", ("LEMON",), True)
+        encrypted = b"".join(bytes(c) for c in chunks)
+        _, chunks = app.process_cipher_file(io.BytesIO(encrypted), "p.bin.dat", "vig", ("LEMON",), False)
+        assert b"".join(bytes(c) for c in chunks) == data
+    finally:
+        app.app.config["STREAM_THRESHOLD"] = saved
+
+
+def test_otp_key_too_short(parallel):
+    with pytest.raises(ValueError):
+        app.parallel_binary(os.urandom(5000), "otp", (os.urandom(4000),))
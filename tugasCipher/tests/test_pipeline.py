@@ -0,0 +1,64 @@
+import io
+import os
+
+import pytest
+
+import app
+
+SPECS = [
+    "hill 3 3; 2 5 | vig LEMON | perm 3 1 2",
+    "perm 3 1 2 | hill 3 3; 2 5 | perm 2 1",
+    "shift 3 | perm 4 1 3 2 | sub QWERTYUIOPASDFGHJKLZXCVBNM",
+]
+BINARY_SPECS = [
+    "hill 3 3; 2 5 | vig LEMON | perm 3 1 2",
+    "shift 3 | affine 5 8 | vig KEY | shift 200",
+    "perm 4 1 3 2 | affine 7 3",
+]
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_text_pipeline_roundtrip_keeps_only_x_padding(spec):
+    stages = app.parse_pipeline(spec, False)
+    encrypted = app.pipeline_text("Hello, World", stages)
+    assert len(encrypted) % app.pipeline_text_block(stages) == 0
+    # Padding 'X' dari enkripsi tetap di akhir hasil dekripsi, tanpa huruf sampah
+    decrypted = app.pipeline_text(encrypted, stages, enc=False)
+    assert decrypted.rstrip("X") == "HELLOWORLD"
+    assert len(decrypted) == len(encrypted)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_streamed_text_pipeline_matches_pipeline_text(spec):
+    stages = app.parse_pipeline(spec, False)
+    encrypted = app.pipeline_text("Hello, World", stages)
+    assert "".join(app.stream_pipeline_text(iter(["Hello, ", "World"]), stages)) == encrypted
+    decrypted = "".join(app.stream_pipeline_text(iter([encrypted[:5], encrypted[5:]]), stages, enc=False))
+    assert decrypted == app.pipeline_text(encrypted, stages, enc=False)
+
+
+@pytest.mark.parametrize("spec", BINARY_SPECS)
+def test_binary_pipeline_roundtrip(spec):
+    stages = app.parse_pipeline(spec, True)
+    data = bytes(range(256)) * 8 + os.urandom(1001)
+    encrypted = app.run_cipher("pipe", (stages,), data, True, True)
+    assert app.run_cipher("pipe", (stages,), encrypted, False, True)[:len(data)] == data
+    
+    name, chunks = app.process_cipher_file(io.BytesIO(data), "x.bin", "pipe", (stages,))
+    assert b"".join(app.process_cipher_file(io.BytesIO(b"".join(chunks)), "", "pipe", (stages,), False)[1]) == data
+
+
+def test_sub_rejected_in_binary_pipeline():
+    spec = "vig LEMON | sub QWERTYUIOPASDFGHJKLZXCVBNM"
+    with pytest.raises(ValueError, match="binary pipeline"):
+        app.parse_pipeline(spec, True)
+    assert app.pipeline_names(app.parse_pipeline(spec, False)) == ["vig", "sub"]
+    
+    client = app.app.test_client()
+    r = client.post("/api/v1/pipeline/encrypt", query_string={"pipeline": spec}, data=b"abc",
+                    content_type="application/octet-stream")
+    assert r.status_code == 400 and "binary pipeline" in r.json["error"]
+    r = client.post("/api/v1/pipeline/encrypt", query_string={"pipeline": spec}, data="hello",
+                    content_type="text/plain")
+    assert r.status_code == 200
+    r.close()
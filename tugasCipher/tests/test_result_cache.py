@@ -0,0 +1,127 @@
+import io
+import os
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return app.ResultCache(max_memory=100, max_disk=250, max_item=200, spill_size=50,
+                           directory=str(tmp_path))
+
+
+def put(cache, key, data, chunk=30):
+    chunks = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+    assert b''.join(cache.tee(key, chunks, key + ".bin")) == data
+
+
+def get(cache, key):
+    hit = cache.get(key)
+    return None if hit is None else (hit[0], b''.join(hit[1]))
+
+
+def test_hit_and_miss(cache):
+    assert cache.get("a") is None
+    put(cache, "a", b"x" * 40)
+    assert get(cache, "a") == ("a.bin", b"x" * 40)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['bytes_saved']) == (1, 1, 0.5, 40)
+    assert "cipher_result_cache_hits_total 1" in cache.render()
+
+
+def test_memory_lru_eviction(cache):
+    put(cache, "a", b"a" * 40)
+    put(cache, "b", b"b" * 40)
+    get(cache, "a")
+    put(cache, "c", b"c" * 40)
+    # b paling lama tidak dipakai
+    assert cache.get("b") is None
+    assert get(cache, "a")[1] == b"a" * 40 and get(cache, "c")[1] == b"c" * 40
+    assert cache.stats()['memory_used'] == 80
+
+
+def test_large_results_spill_to_disk(cache, tmp_path):
+    data = os.urandom(120)
+    put(cache, "big", data)
+    assert cache.stats()['disk_used'] == 120 and cache.stats()['memory_used'] == 0
+    assert len(list(tmp_path.iterdir())) == 1
+    assert get(cache, "big")[1] == data
+    # Disk tier juga LRU; file entry yang dibuang dihapus
+    put(cache, "big2", os.urandom(120))
+    put(cache, "big3", os.urandom(120))
+    assert cache.get("big") is None
+    assert cache.stats()['disk_used'] == 240
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_disk_hit_survives_eviction(cache):
+    data = os.urandom(120)
+    put(cache, "big", data)
+    hit = cache.get("big")
+    put(cache, "big2", os.urandom(120))
+    put(cache, "big3", os.urandom(120))
+    assert b''.join(hit[1]) == data
+
+
+def test_oversized_and_incomplete_not_cached(cache, tmp_path):
+    put(cache, "huge", os.urandom(300))
+    assert cache.get("huge") is None
+    
+    def failing():
+        yield b"x" * 60
+        raise ValueError("boom")
+    with pytest.raises(ValueError):
+        b''.join(cache.tee("broken", failing()))
+    assert cache.get("broken") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_equivalent_keys_share_entry():
+    digest = b"\0" * 32
+    assert app.cache_key(digest, "shift", (29,), True, False) == app.cache_key(digest, "shift", (3,), True, False)
+    assert app.cache_key(digest, "shift", (29,), True, True) != app.cache_key(digest, "shift", (3,), True, True)
+    assert app.cache_key(digest, "vig", ("key",), True, False) == app.cache_key(digest, "vig", ("KEY",), True, False)
+    assert app.cache_key(digest, "vig", ("KEY",), True, False) != app.cache_key(digest, "vig", ("KEY",), False, False)
+    with pytest.raises(ValueError):
+        app.normalized_key("otp", (b"key",), True)
+
+
+@pytest.fixture
+def result_cache(tmp_path, monkeypatch):
+    cache = app.ResultCache(max_memory=1 << 20, max_disk=1 << 20, max_item=1 << 20, spill_size=1 << 19,
+                            directory=str(tmp_path))
+    monkeypatch.setattr(app, "RESULT_CACHE", cache)
+    return cache
+
+
+def test_cached_run_cipher(result_cache):
+    data = os.urandom(1000)
+    first = app.cached_run_cipher("vig", ("LEMON",), data, True, True)
+    assert app.cached_run_cipher("vig", ("lemon",), data, True, True) == first
+    assert app.cached_run_cipher("shift", (29,), "HELLO", True, False) == "KHOOR"
+    assert app.cached_run_cipher("shift", (3,), "HELLO", True, False) == "KHOOR"
+    assert (result_cache.stats()['hits'], result_cache.stats()['entries']) == (2, 2)
+
+
+def test_otp_never_cached(result_cache):
+    data = os.urandom(100)
+    for key in (os.urandom(100), os.urandom(100)):
+        assert app.cached_run_cipher("otp", (key,), data, True, True) == app.run_cipher("otp", (key,), data, True, True)
+    name, chunks = app.cached_cipher_file(io.BytesIO(data), "x.bin", "otp", (os.urandom(100),))
+    b''.join(chunks)
+    assert result_cache.stats()['entries'] == 0 and result_cache.stats()['misses'] == 0
+
+
+def test_cached_cipher_file(result_cache):
+    data = os.urandom(1000)
+    name, chunks = app.cached_cipher_file(io.BytesIO(data), "x.bin", "shift", (3,))
+    first = b''.join(chunks)
+    name, chunks = app.cached_cipher_file(io.BytesIO(data), "x.bin", "shift", (259,))
+    assert b''.join(chunks) == first and result_cache.stats()['hits'] == 1
+    # Nama file ada di header, jadi nama lain adalah entry lain
+    name, chunks = app.cached_cipher_file(io.BytesIO(data), "y.bin", "shift", (3,))
+    assert b''.join(chunks) != first
+    
+    assert app.app.test_client().get("/stats/result_cache").json['hits'] == 1
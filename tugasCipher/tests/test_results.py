@@ -0,0 +1,96 @@
+import os
+import time
+
+import pytest
+
+import app
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def store(tmp_path):
+    return app.ResultStore(max_memory=25, max_disk=25, ttl=60, spill_size=10, directory=str(tmp_path))
+
+
+def test_small_results_stay_in_memory(store):
+    token = store.put([b"abc", b"def"], "x.bin")
+    entry = store.get(token)
+    assert entry["data"] == b"abcdef" and entry["path"] is None
+    assert entry["filename"] == "x.bin" and entry["size"] == 6
+    assert store.get("unknown") is None
+
+
+def test_large_results_spill_to_disk(store):
+    token = store.put([b"0123456789", b"abcdef"], "big.bin")
+    entry = store.get(token)
+    assert entry["data"] is None
+    with open(entry["path"], "rb") as f:
+        assert f.read() == b"0123456789abcdef"
+    assert app.read_result_range(entry, 8, 4) == b"89ab"
+
+
+def test_lru_eviction_in_memory(store):
+    first = store.put([b"a" * 10], "1")
+    second = store.put([b"b" * 10], "2")
+    store.get(first)   # first jadi yang paling baru dipakai
+    third = store.put([b"c" * 10], "3")
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+
+
+def test_disk_eviction_removes_file(store):
+    first = store.put([b"a" * 20], "1")
+    path = store.get(first)["path"]
+    store.put([b"b" * 20], "2")
+    assert store.get(first) is None
+    assert not os.path.exists(path)
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    store = app.ResultStore(max_memory=MB, max_disk=MB, ttl=0.05, spill_size=10, directory=str(tmp_path))
+    small = store.put([b"abc"], "s")
+    big = store.put([b"x" * 100], "b")
+    path = store.get(big)["path"]
+    time.sleep(0.1)
+    assert store.get(small) is None and store.get(big) is None
+    assert not os.path.exists(path)
+
+
+def test_failed_put_removes_spill_file(store, tmp_path):
+    def chunks():
+        yield b"x" * 20
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        store.put(chunks(), "bad")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_download_by_token(client):
+    token = app.RESULTS.put([b"\x00\x01binary"], "r.bin")
+    r = client.get(f"/download_binary?token={token}")
+    assert r.status_code == 200 and r.data == b"\x00\x01binary"
+    assert "r.bin" in r.headers["Content-Disposition"]
+    assert client.get("/download_binary?token=nope").status_code == 302
+
+
+def test_result_evicted_right_after_put(client, monkeypatch):
+    # Setiap hasil langsung di-evict: halaman menampilkan error, bukan TypeError
+    monkeypatch.setattr(app.RESULTS, "max_memory", 0)
+    r = client.post("/", data={"cipher": "shift", "shift_key": "3", "action": "Encrypt",
+                               "input_type": "text", "input_text": "hello world"})
+    assert r.status_code == 200
+    assert b"dropped from the result store" in r.data
+
+
+def test_spill_file_removed_before_page_is_read(tmp_path, monkeypatch):
+    store = app.ResultStore(max_memory=MB, max_disk=MB, ttl=60, spill_size=1, directory=str(tmp_path))
+    monkeypatch.setattr(app, "RESULTS", store)
+    token = store.put([b"HELLO WORLD"], "t.txt")
+    os.remove(store.get(token)["path"])
+    assert app.stored_text_page(token) is None
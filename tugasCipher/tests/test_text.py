@@ -0,0 +1,129 @@
+import random
+import string
+
+import numpy as np
+import pytest
+
+import app
+
+KEY = "QWERTYUIOPASDFGHJKLZXCVBNM"
+
+
+# Versi per karakter (sebelum translate table / NumPy) sebagai referensi
+def ref_shift(text, key, enc=True):
+    return "".join(app.num_to_char(app.char_to_num(c) + (key if enc else -key)) if c.isalpha() else c
+                   for c in text.upper())
+
+def ref_vigenere(text, key, enc=True):
+    out, j = [], 0
+    for c in text.upper():
+        if c.isalpha():
+            k = app.char_to_num(key[j % len(key)])
+            out.append(app.num_to_char(app.char_to_num(c) + (k if enc else -k)))
+            j += 1
+        else:
+            out.append(c)
+    return "".join(out)
+
+def ref_substitution(text, key, enc=True):
+    table = dict(zip(string.ascii_uppercase, key)) if enc else dict(zip(key, string.ascii_uppercase))
+    return "".join(table.get(c, c) for c in text.upper())
+
+def ref_affine(text, a, b, enc=True):
+    if enc:
+        return "".join(app.num_to_char(a * app.char_to_num(c) + b) if c.isalpha() else c for c in text.upper())
+    a_inv = app.mod_inverse(a, 26)
+    return "".join(app.num_to_char(a_inv * (app.char_to_num(c) - b)) if c.isalpha() else c for c in text.upper())
+
+def ref_hill(text, M, enc=True):
+    t = "".join(c for c in text.upper() if c.isalpha())
+    t += "X" * (len(t) % 2)
+    if not enc:
+        det_inv = app.mod_inverse(int(round(np.linalg.det(M))) % 26, 26)
+        M = (det_inv * np.array([[M[1][1], -M[0][1]], [-M[1][0], M[0][0]]])) % 26
+    out = []
+    for i in range(0, len(t), 2):
+        w = np.dot(M, [app.char_to_num(t[i]), app.char_to_num(t[i + 1])]) % 26
+        out += [app.num_to_char(int(w[0])), app.num_to_char(int(w[1]))]
+    return "".join(out)
+
+def ref_permutation(text, key_nums, enc=True):
+    t = "".join(c for c in text.upper() if c.isalpha())
+    n = len(key_nums)
+    t += "X" * (-len(t) % n)
+    out = []
+    for i in range(0, len(t), n):
+        block = [""] * n
+        for j, k in enumerate(key_nums):
+            if enc:
+                block[k - 1] = t[i + j]
+            else:
+                block[j] = t[i + k - 1]
+        out.append("".join(block))
+    return "".join(out)
+
+def ref_otp(text, key, enc=True):
+    t = [c for c in text.upper() if c.isalpha()]
+    k = [c for c in key.upper() if c.isalpha()]
+    sign = 1 if enc else -1
+    return "".join(app.num_to_char(app.char_to_num(c) + sign * app.char_to_num(k[i])) for i, c in enumerate(t))
+
+def ref_format(text, fmt):
+    if fmt == "nospace":
+        return "".join(text.split())
+    if fmt == "groups":
+        clean = "".join(text.split())
+        return " ".join(clean[i:i + 5] for i in range(0, len(clean), 5))
+    return text
+
+
+def random_text(seed):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters * 3 + string.digits + " .,!?\n\t-"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 500)))
+
+
+CASES = [
+    ("shift", (3,), ref_shift),
+    ("shift", (55,), ref_shift),
+    ("vig", ("LEMON",), ref_vigenere),
+    ("sub", (KEY,), ref_substitution),
+    ("affine", (5, 8), ref_affine),
+    ("hill", ([[3, 3], [2, 5]],), ref_hill),
+    ("perm", ([3, 1, 4, 2],), ref_permutation),
+]
+
+
+@pytest.mark.parametrize("cipher, args, reference", CASES)
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("enc", [True, False])
+def test_matches_reference(cipher, args, reference, seed, enc):
+    text = random_text(seed)
+    assert app.PROCESSORS[cipher](text, *args, enc=enc, is_binary=False) == reference(text, *args, enc)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_otp_matches_reference(seed):
+    text = random_text(seed)
+    key = "".join(random.Random(seed).choice(string.ascii_uppercase) for _ in range(600))
+    for enc in (True, False):
+        assert app.otp(text, key, enc) == ref_otp(text, key, enc)
+
+
+def test_known_vectors():
+    assert app.vigenere_text("ATTACK AT DAWN", "LEMON") == "LXFOPV EF RNHR"
+    assert app.affine("affine cipher", 5, 8) == "IHHWVC SWFRCP"
+    assert app.shift_text("Hello, World!", 3) == "KHOOR, ZRUOG!"
+
+
+@pytest.mark.parametrize("fmt", ["normal", "nospace", "groups"])
+@pytest.mark.parametrize("seed", range(5))
+def test_format_output_matches_reference(fmt, seed):
+    text = random_text(seed) * 20
+    for chunk_size in (1, 7, 4096):
+        assert "".join(app.format_output(text, fmt, chunk_size)) == ref_format(text, fmt)
+
+
+def test_rejects_non_ascii_letters():
+    with pytest.raises(ValueError):
+        app.shift_text("Ünïcode", 3)
@@ -0,0 +1,71 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    """Result store sementara; hasil di atas 100 KB di disk"""
+    store = app.ResultStore(max_memory=1 << 20, max_disk=1 << 20, ttl=60, spill_size=100 * 1024,
+                            directory=str(tmp_path))
+    monkeypatch.setattr(app, "RESULTS", store)
+    return store
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def pages_of(entry, size):
+    first = app.read_text_page(entry, 0, size)
+    return [first] + [app.read_text_page(entry, i, size) for i in range(1, first['pages'])]
+
+
+@pytest.mark.parametrize("text", ["A" * 20, "AB" * 10 + "Z", "é" * 15, "aé€😀" * 7, "😀"])
+@pytest.mark.parametrize("size", [1, 4, 5, 7])
+def test_pages_cover_text_once(text, size):
+    data = text.encode("utf-8")
+    entry = {'data': data, 'path': None, 'size': len(data)}
+    pages = pages_of(entry, size)
+    assert len(pages) == -(-len(data) // size)
+    # Karakter multi-byte tidak terpotong dan tidak muncul dua kali
+    assert ''.join(p['text'] for p in pages) == text
+
+
+def test_empty_result_has_one_page():
+    entry = {'data': b"", 'path': None, 'size': 0}
+    assert app.read_text_page(entry, 0) == {'page': 0, 'pages': 1, 'text': ""}
+
+
+def test_text_page_endpoint(results, client):
+    text = "ÄBC" * 50000   # 200 KB: 4 halaman, disimpan di disk
+    token = results.put([text.encode("utf-8")], None)
+    assert results.get(token)['path'] is not None
+    first = client.get(f"/text_page?token={token}").json
+    assert (first['page'], first['pages']) == (0, 4)
+    texts = [first['text']] + [client.get(f"/text_page?token={token}&page={i}").json['text'] for i in (1, 2, 3)]
+    assert ''.join(texts) == text
+
+
+@pytest.mark.parametrize("page", ["-1", "4", "x", "1.5"])
+def test_text_page_out_of_range(results, client, page):
+    token = results.put([b"A" * (200 * 1024)], None)
+    r = client.get(f"/text_page?token={token}&page={page}")
+    assert r.status_code == 400 and "error" in r.json
+
+
+def test_text_page_unknown_token(results, client):
+    assert client.get("/text_page?token=missing").status_code == 404
+    assert client.get("/text_page").status_code == 404
+
+
+def test_text_result_paged_in_form(results, client):
+    text = "HELLO" * 30000
+    r = client.post("/", data={"cipher": "shift", "action": "Encrypt", "input_type": "text",
+                               "input_text": text, "shift_key": "3"})
+    assert r.status_code == 200
+    token = r.get_data(as_text=True).split('name="token" value="')[1].split('"')[0]
+    first = client.get(f"/text_page?token={token}").json
+    assert first['pages'] == 3
+    assert ''.join(client.get(f"/text_page?token={token}&page={i}").json['text'] for i in range(3)) == "KHOOR" * 30000